@@ -0,0 +1,39 @@
+"""Add llm_cache table
+
+Revision ID: 3a9d52c1e7b4
+Revises: c6de243cef31
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9d52c1e7b4'
+down_revision: Union[str, Sequence[str], None] = 'c6de243cef31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('llm_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('model_name', sa.String(length=255), nullable=False),
+    sa.Column('temperature', sa.Float(), nullable=True),
+    sa.Column('output', sa.Text(), nullable=False),
+    sa.Column('hit_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_llm_cache_expires_at'), 'llm_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_llm_cache_expires_at'), table_name='llm_cache')
+    op.drop_table('llm_cache')
@@ -0,0 +1,28 @@
+"""Add final_state column to workflows
+
+Revision ID: 4e6a8c0b2d91
+Revises: 9b3d5f7a1c20
+Create Date: 2026-10-19 18:12:40.527316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e6a8c0b2d91'
+down_revision: Union[str, Sequence[str], None] = '9b3d5f7a1c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('workflows', sa.Column('final_state', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('workflows', 'final_state')
@@ -0,0 +1,30 @@
+"""Add task column to generations
+
+Revision ID: 7c41e0b9d2a6
+Revises: 3a9d52c1e7b4
+Create Date: 2026-10-19 11:03:27.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41e0b9d2a6'
+down_revision: Union[str, Sequence[str], None] = '3a9d52c1e7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('generations', sa.Column('task', sa.String(length=50), nullable=True))
+    op.create_index(op.f('ix_generations_task'), 'generations', ['task'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_generations_task'), table_name='generations')
+    op.drop_column('generations', 'task')
@@ -0,0 +1,115 @@
+"""Compress large JSON payload columns
+
+Revision ID: b7d1f3a5c8e2
+Revises: 4e6a8c0b2d91
+Create Date: 2026-10-19 19:40:13.682051
+
+nodes.state_data/input_data, workflows.final_itinerary/final_state, generations.full_prompt를
+압축 바이트 컬럼(src/database.py의 CompressedJSON)으로 바꾸고 기존 행을 zlib으로 채움
+"""
+import json
+import os
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d1f3a5c8e2'
+down_revision: Union[str, Sequence[str], None] = '4e6a8c0b2d91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (테이블, 컬럼, 기존 타입)
+COLUMNS = [
+    ('nodes', 'state_data', sa.JSON()),
+    ('nodes', 'input_data', sa.JSON()),
+    ('workflows', 'final_itinerary', sa.JSON()),
+    ('workflows', 'final_state', sa.JSON()),
+    ('generations', 'full_prompt', sa.Text()),
+]
+BATCH_SIZE = 500
+MIN_BYTES = 256  # 이보다 작은 값은 압축하지 않음 (CompressedJSON과 같은 형식: 1바이트 코덱 + 본문)
+
+
+def _encode(value):
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if len(raw) < MIN_BYTES:
+        return b"\x00" + raw
+    return b"\x01" + zlib.compress(raw, 6)
+
+
+_zstd_decompressors = None
+
+
+def _zstd_decompress(body):
+    """프레임의 사전 ID로 DB_COMPRESSION_DICT(쉼표 구분) 중 압축에 쓴 사전을 골라 해제"""
+    global _zstd_decompressors
+    import zstandard
+    if _zstd_decompressors is None:
+        _zstd_decompressors = {0: zstandard.ZstdDecompressor()}
+        for path in os.getenv('DB_COMPRESSION_DICT', '').split(','):
+            if path.strip():
+                with open(path.strip(), 'rb') as f:
+                    dictionary = zstandard.ZstdCompressionDict(f.read())
+                _zstd_decompressors[dictionary.dict_id()] = zstandard.ZstdDecompressor(dict_data=dictionary)
+    dict_id = zstandard.get_frame_parameters(body).dict_id
+    if dict_id not in _zstd_decompressors:
+        raise ValueError(f'zstd payload was compressed with dictionary {dict_id}, set DB_COMPRESSION_DICT to downgrade')
+    return _zstd_decompressors[dict_id].decompress(body)
+
+
+def _decode(data):
+    data = bytes(data)
+    codec, body = data[0], data[1:]
+    if codec == 0x01:
+        body = zlib.decompress(body)
+    elif codec == 0x02:
+        body = _zstd_decompress(body)
+    return json.loads(body)
+
+
+def _copy(table_name, source, source_type, target, target_type, convert):
+    """source 컬럼 값을 변환해 target 컬럼에 배치 단위로 기록 (id 순서로 이어서 읽음)"""
+    bind = op.get_bind()
+    table = sa.table(table_name, sa.column('id', sa.String()), sa.column(source, source_type),
+                     sa.column(target, target_type))
+    update = (
+        table.update()
+        .where(table.c.id == sa.bindparam('row_id'))
+        .values({target: sa.bindparam('payload')})
+    )
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c[source])
+            .where(table.c[source].isnot(None), table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(update, [{'row_id': row_id, 'payload': convert(value)} for row_id, value in rows])
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name, column, old_type in COLUMNS:
+        op.add_column(table_name, sa.Column(f'{column}_compressed', sa.LargeBinary(), nullable=True))
+        _copy(table_name, column, old_type, f'{column}_compressed', sa.LargeBinary(), _encode)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f'{column}_compressed', new_column_name=column)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name, column, old_type in COLUMNS:
+        op.add_column(table_name, sa.Column(f'{column}_plain', old_type, nullable=True))
+        _copy(table_name, column, sa.LargeBinary(), f'{column}_plain', old_type, _decode)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f'{column}_plain', new_column_name=column)
@@ -0,0 +1,68 @@
+"""Add feedback_labels table
+
+Revision ID: d4a7c2e9f1b3
+Revises: b7d1f3a5c8e2
+Create Date: 2026-10-19 21:12:40.518204
+
+피드백 분류기 학습 데이터를 generations 본문(full 추적 수준에서만 기록) 대신 별도 테이블에 보관하고,
+기존 generations의 피드백 분류 기록을 옮겨 담음
+"""
+import re
+import uuid
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c2e9f1b3'
+down_revision: Union[str, Sequence[str], None] = 'b7d1f3a5c8e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTION_PATTERN = re.compile(r"(refine_food|refine_cafe|refine_region|complete)")
+BACKFILL_LIMIT = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    feedback_labels = op.create_table('feedback_labels',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('workflow_id', sa.String(length=36), nullable=True),
+    sa.Column('feedback', sa.Text(), nullable=False),
+    sa.Column('action', sa.String(length=50), nullable=False),
+    sa.Column('source', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_feedback_labels_workflow_id'), 'feedback_labels', ['workflow_id'], unique=False)
+    op.create_index(op.f('ix_feedback_labels_created_at'), 'feedback_labels', ['created_at'], unique=False)
+
+    # 기존 피드백 분류 LLM 호출 기록 (시스템 프롬프트에 "ACTION:" 형식 안내가 있는 생성 기록)
+    generations = sa.table('generations', sa.column('workflow_id', sa.String()), sa.column('system_prompt', sa.Text()),
+                           sa.column('user_prompt', sa.Text()), sa.column('output', sa.Text()),
+                           sa.column('error_message', sa.Text()), sa.column('created_at', sa.DateTime()))
+    rows = op.get_bind().execute(
+        sa.select(generations.c.workflow_id, generations.c.user_prompt, generations.c.output, generations.c.created_at)
+        .where(generations.c.system_prompt.like('%ACTION:%'))
+        .where(generations.c.error_message.is_(None))
+        .order_by(generations.c.created_at.desc())
+        .limit(BACKFILL_LIMIT)
+    ).fetchall()
+    labels = []
+    for workflow_id, feedback, output, created_at in rows:
+        match = ACTION_PATTERN.search(output or '')
+        if feedback and match:
+            labels.append({'id': str(uuid.uuid4()), 'workflow_id': workflow_id, 'feedback': feedback,
+                           'action': match.group(1), 'source': 'llm', 'created_at': created_at or datetime.utcnow()})
+    if labels:
+        op.bulk_insert(feedback_labels, labels)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_feedback_labels_created_at'), table_name='feedback_labels')
+    op.drop_index(op.f('ix_feedback_labels_workflow_id'), table_name='feedback_labels')
+    op.drop_table('feedback_labels')
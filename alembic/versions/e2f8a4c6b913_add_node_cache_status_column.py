@@ -0,0 +1,30 @@
+"""Add cache_status column to nodes
+
+Revision ID: e2f8a4c6b913
+Revises: 7c41e0b9d2a6
+Create Date: 2026-10-19 13:42:10.518236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f8a4c6b913'
+down_revision: Union[str, Sequence[str], None] = '7c41e0b9d2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('nodes', sa.Column('cache_status', sa.String(length=20), nullable=True))
+    op.create_index(op.f('ix_nodes_cache_status'), 'nodes', ['cache_status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_nodes_cache_status'), table_name='nodes')
+    op.drop_column('nodes', 'cache_status')
@@ -1,16 +1,27 @@
-from langchain_community.chat_models import ChatOllama
-from langgraph.checkpoint.memory import MemorySaver
 from dotenv import load_dotenv
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, AsyncIterator, Tuple
+import asyncio
+import json
+import os
+import time
+import uuid
 
 from kakao_client import KakaoMapClient
 from time_calculator import TimeCalculator
-from models import TimeSettings
+from models import Location, TimeSettings
 from state import TripState
 from nodes import TripNodes
+from place_index import place_entry
+from place_store import state_place_ids
+from events import new_event_log, events_since, last_seq
 from graph import build_trip_graph
-from database import init_db
-from db_logger import DatabaseLogger
+from database import init_db, init_async_db
+from db_logger import AsyncDatabaseLogger
+from db_writer import get_db_writer, shutdown_db_writers
+from tracing import TraceSampler, higher_level, parse_trace_level
+from llm_backend import LLMBackendPool
+from checkpointer import get_checkpoint_config, open_checkpointer, close_checkpointer
 
 load_dotenv()
 
@@ -18,14 +29,28 @@ load_dotenv()
 class TripPlannerAgent:
     """여행 계획 에이전트"""
 
-    def __init__(self):
-        self.llm = ChatOllama(
-            model="llama3.2",
-            temperature=0.7,
-        )
+    # state 장소 ID 목록 키 -> 응답 카테고리 이름
+    PLACE_KEYS = {
+        "activity_places": "activities",
+        "dining_places": "dining",
+        "cafe_places": "cafes",
+        "drinking_places": "bars"
+    }
+
+    def __init__(self, checkpoint_backend: Optional[str] = None, checkpoint_url: Optional[str] = None,
+                 model_routes: Optional[dict] = None):
+        # 여러 Ollama 엔드포인트에 분산 (OLLAMA_ENDPOINTS, OLLAMA_NUM_PARALLEL)
+        self.llm = LLMBackendPool.from_env(default_model="llama3.2", temperature=0.7)
         self.kakao_client = KakaoMapClient()
         self.time_calc = TimeCalculator()
-        self.memory = MemorySaver()
+
+        # 체크포인트 저장소 (memory 외 백엔드는 이벤트 루프가 필요하므로 setup()에서 생성)
+        self.checkpoint_backend, self.checkpoint_url = get_checkpoint_config(checkpoint_backend, checkpoint_url)
+        self.memory = None
+        self._checkpoint_resource = None
+        self._setup_lock = asyncio.Lock()
+        self.graph = None
+        self._classifier_training: Optional[asyncio.Task] = None  # 피드백 분류기 학습 (첫 setup()에서 시작)
         
         # 데이터베이스 초기화
         try:
@@ -34,37 +59,94 @@ class TripPlannerAgent:
         except Exception as e:
             print(f"[WARNING] Database initialization failed: {e}")
             self.engine = None
+        # 요청 처리 중 조회용 비동기 엔진 (DB_ASYNC=false거나 드라이버가 없으면 별도 스레드에서 동기 엔진 사용)
+        self.async_engine = None
+        if self.engine and os.getenv("DB_ASYNC", "true").lower() != "false":
+            try:
+                self.async_engine = init_async_db()
+            except Exception as e:
+                print(f"[WARNING] Async database engine unavailable, using worker threads: {e}")
+        # 노드/LLM 로그 write-behind 큐 (엔진별로 하나)
+        self.db_writer = get_db_writer(self.engine) if self.engine else None
+        # HIL 응답 전에 큐에 쌓인 기록을 기다리는 최대 시간 (큐가 밀려 있어도 응답이 늦어지지 않도록)
+        self.handoff_flush_timeout = float(os.getenv("DB_LOG_HANDOFF_TIMEOUT", "2"))
+        # 진행 중인 워크플로우별 로거 (그래프 config의 db_logger로 노드에 전달, HIL 대기 중에도 유지)
+        self._run_loggers: "OrderedDict[str, AsyncDatabaseLogger]" = OrderedDict()
+        self._user_ids = {}  # username -> users.id
+        # 요청별 DB 추적 수준 샘플링 (TRACE_SAMPLE_RATES, X-Trace-Level 헤더)
+        self.trace_sampler = TraceSampler()
         
         # 노드 및 그래프 초기화
-        self.nodes = TripNodes(self.llm, self.kakao_client, self.time_calc, self.engine)
-        self.graph = build_trip_graph(self.nodes, self.memory)
+        # 작업별 모델 라우팅 (인자 > LLM_MODEL_ROUTES 환경 변수(JSON) > 기본값)
+        if model_routes is None and os.getenv("LLM_MODEL_ROUTES"):
+            model_routes = json.loads(os.getenv("LLM_MODEL_ROUTES"))
+        self.nodes = TripNodes(self.llm, self.kakao_client, self.time_calc, self.engine, model_routes=model_routes,
+                               async_engine=self.async_engine)
+        if self.checkpoint_backend == "memory":
+            from langgraph.checkpoint.memory import MemorySaver
+            self.memory = MemorySaver()
+            self.graph = build_trip_graph(self.nodes, self.memory)
 
-    async def plan_trip(
-            self,
-            user_input: str,
-            session_id: Optional[str] = None,
-            time_settings: Optional[TimeSettings] = None
-    ) -> dict:
-        """여행 계획 실행"""
-        # 워크플로우 ID 생성 (이것이 곧 thread_id가 됨)
-        import uuid
-        workflow_id = str(uuid.uuid4())
-        
-        config = {"configurable": {"thread_id": workflow_id}}
-        # 초기 상태이므로 로드할 필요 없음 (항상 새로 시작)
-        
-        initial_state: TripState = {
+    async def setup(self):
+        """공유 체크포인트 저장소 연결 및 그래프 컴파일, 피드백 분류기 학습 시작 (여러 번 호출해도 안전)"""
+        if self._classifier_training is None:
+            # 학습 데이터 조회가 끝날 때까지는 기본 예시로 분류 (서버 시작을 기다리게 하지 않음)
+            self._classifier_training = asyncio.create_task(self.nodes.train_feedback_classifier())
+        if self.graph is not None:
+            return
+
+        async with self._setup_lock:
+            if self.graph is not None:
+                return
+            self.memory, self._checkpoint_resource = await open_checkpointer(
+                self.checkpoint_backend, self.checkpoint_url
+            )
+            self.graph = build_trip_graph(self.nodes, self.memory)
+            print(f"[INFO] Checkpoint store ready: {self.checkpoint_backend}")
+
+    async def warm_up(self):
+        """라우팅에 쓰이는 모델을 미리 로드하고, 설정 시 주기적 keep-warm 시작
+
+        - OLLAMA_PRELOAD=false: 미리 로드하지 않음
+        - OLLAMA_KEEP_WARM_INTERVAL: keep-warm 주기(초, 0이면 사용 안 함)
+        """
+        if os.getenv("OLLAMA_PRELOAD", "true").lower() == "false":
+            return
+        models = [route.get("model", self.llm.default_model) for route in self.nodes.model_routes.values()]
+        await self.llm.warm_up(models)
+        self.llm.start_keep_warm(float(os.getenv("OLLAMA_KEEP_WARM_INTERVAL", "0")))
+
+    async def aclose(self):
+        """keep-warm 중지, 남은 DB 로그 기록 및 체크포인트 저장소, 비동기 DB 연결 종료"""
+        await self.llm.stop_keep_warm()
+        if self._classifier_training is not None and not self._classifier_training.done():
+            self._classifier_training.cancel()
+        await asyncio.to_thread(shutdown_db_writers)
+        if self.async_engine is not None:
+            await self.async_engine.dispose()
+        await close_checkpointer(self._checkpoint_resource)
+        self._checkpoint_resource = None
+
+    def _create_initial_state(self, user_input: str, time_settings: Optional[TimeSettings],
+                              starting_point: Optional[Location] = None) -> TripState:
+        """초기 상태 생성"""
+        return {
             "user_input": user_input,
             "input_type": None,
             "parsed_location": None,
-            "starting_point": None,
+            "starting_point": starting_point,
             "activity_places": [],
             "dining_places": [],
             "cafe_places": [],
             "drinking_places": [],
+            "place_distances": {},
             "final_itinerary": [],
+            "candidate_pools": {},
+            "selected_places": {},
+            "shown_places": {},
+            "refine_stage": None,
             "search_radius": 2000,
-            "progress_messages": [],
+            "event_log": new_event_log(),
             "needs_refinement": False,
             "user_activity_preference": None,
             "user_food_preference": None,
@@ -72,18 +154,36 @@ class TripPlannerAgent:
             "next_action": None,
             "time_settings": time_settings,
             "user_intent": None,
-            "workflow_id": None
+            "workflow_id": None,
+            "trace_level": None
         }
-        
+
+    async def _start_run(
+            self,
+            user_input: str,
+            time_settings: Optional[TimeSettings] = None,
+            starting_point: Optional[Location] = None,
+            trace_level: Optional[str] = None
+    ) -> Tuple[str, dict, TripState]:
+        """워크플로우 ID 발급, 초기 상태 생성 및 DB 시작 기록 (trace_level: 요청 헤더로 강제한 추적 수준)"""
+        await self.setup()
+
+        # 워크플로우 ID 생성 (이것이 곧 thread_id가 됨)
+        workflow_id = str(uuid.uuid4())
+        config = {"configurable": {"thread_id": workflow_id}}
+        # 초기 상태이므로 로드할 필요 없음 (항상 새로 시작)
+        initial_state = self._create_initial_state(user_input, time_settings, starting_point)
+        initial_state["trace_level"] = self.trace_sampler.choose(trace_level)
+
         # DB에 워크플로우 시작 기록
         if self.engine:
             try:
-                logger = DatabaseLogger(self.engine)
-                # 여기서는 사용자 구분이 모호하므로 임시 유저 사용 (TODO: 로그인 연동 필요)
-                user = logger.get_or_create_user(username="anonymous")
-                workflow = logger.start_workflow(user.id, initial_state, workflow_id=workflow_id, session_id=workflow_id)
+                logger = self._new_logger(initial_state["trace_level"])
+                user_id = await self._user_id(logger)
+                workflow = logger.start_workflow(user_id, initial_state, workflow_id=workflow_id, session_id=workflow_id)
                 initial_state["workflow_id"] = workflow_id
-                logger.close()
+                self._remember_run_logger(workflow_id, logger)
+                config["configurable"]["db_logger"] = logger
                 print(f"[DB] Workflow started with ID: {workflow.id}")
             except Exception as e:
                 import traceback
@@ -91,126 +191,145 @@ class TripPlannerAgent:
                 print(f"[ERROR] Failed to log workflow start: {e}")
         else:
             initial_state["workflow_id"] = workflow_id
-        
-        await self.graph.ainvoke(initial_state, config)
-        
-        # 상태 조회
-        final_state = await self.graph.aget_state(config)
 
-        if final_state.next:
-            # 워크플로우 상태 업데이트 (대기 중)
-            if self.engine:
-                try:
-                    logger = DatabaseLogger(self.engine)
-                    logger.current_workflow_id = final_state.values.get("workflow_id")
-                    logger.complete_workflow(final_state.values, status="awaiting_input")
-                    logger.close()
-                except Exception as e:
-                    print(f"[ERROR] Failed to log workflow status update: {e}")
+        return workflow_id, config, initial_state
 
-            return {
-                "status": "awaiting_user_input",
-                "pending_step": final_state.next,
-                "itinerary": {
-                    "locations": {
-                        "activities": [loc.dict() for loc in final_state.values.get("activity_places", [])],
-                        "dining": [loc.dict() for loc in final_state.values.get("dining_places", [])],
-                        "cafes": [loc.dict() for loc in final_state.values.get("cafe_places", [])],
-                        "bars": [loc.dict() for loc in final_state.values.get("drinking_places", [])]
-                    },
-                    "schedule": [item.dict() for item in final_state.values.get("final_itinerary", [])]
-                },
-                "progress": final_state.values.get("progress_messages", []),
-                "session_id": workflow_id,
-                "workflow_id": workflow_id
-            }
+    def _new_logger(self, trace_level: Optional[str]) -> AsyncDatabaseLogger:
+        return AsyncDatabaseLogger(self.engine, self.async_engine, writer=self.db_writer, trace_level=trace_level)
 
-        # 워크플로우 완료 기록
-        if self.engine:
-            try:
-                logger = DatabaseLogger(self.engine)
-                logger.current_workflow_id = final_state.values.get("workflow_id")
-                logger.complete_workflow(final_state.values)
-                logger.close()
-                print(f"[DB] Workflow completed")
-            except Exception as e:
-                print(f"[ERROR] Failed to log workflow completion: {e}")
+    async def _user_id(self, logger: AsyncDatabaseLogger) -> int:
+        """워크플로우 소유 사용자 ID (프로세스에서 한 번만 조회)"""
+        # 여기서는 사용자 구분이 모호하므로 임시 유저 사용 (TODO: 로그인 연동 필요)
+        user_id = self._user_ids.get("anonymous")
+        if user_id is None:
+            user = await logger.aget_or_create_user(username="anonymous")
+            user_id = self._user_ids["anonymous"] = user.id
+        return user_id
 
-        return {
-            "status": "completed",
-            "itinerary": {
-                "input": {
-                    "original": final_state.values.get("user_input"),
-                    "type": final_state.values.get("input_type"),
-                    "parsed": final_state.values.get("parsed_location")
-                },
-                "locations": {
-                    "starting_point": final_state.values.get("starting_point").dict() if final_state.values.get(
-                        "starting_point") else None,
-                    "activities": [loc.dict() for loc in final_state.values.get("activity_places", [])],
-                    "dining": [loc.dict() for loc in final_state.values.get("dining_places", [])],
-                    "cafes": [loc.dict() for loc in final_state.values.get("cafe_places", [])],
-                    "bars": [loc.dict() for loc in final_state.values.get("drinking_places", [])]
-                },
-                "schedule": [item.dict() for item in final_state.values.get("final_itinerary", [])]
-            },
-            "progress": final_state.values.get("progress_messages", []),
-            "progress": final_state.values.get("progress_messages", []),
-            "session_id": workflow_id,
-            "workflow_id": workflow_id
-        }
+    async def _resume_run(self, workflow_id: str, feedback_content: str,
+                          trace_level: Optional[str] = None) -> Optional[Tuple[dict, int]]:
+        """HIL 대기 중인 세션에 피드백 반영 후 (config, 재개 시점 이벤트 커서) 반환. 진행 중인 세션이 없으면 None
+
+        trace_level이 주어지면 세션의 추적 수준을 그 이상으로 올립니다.
+        """
+        await self.setup()
 
-    async def provide_user_feedback(self, workflow_id: str, feedback_content: str) -> dict:
-        """사용자 피드백 제공 (workflow_id를 thread_id로 사용)"""
         # workflow_id 자체가 thread_id
         config = {"configurable": {"thread_id": workflow_id}}
 
         current_state = await self.graph.aget_state(config)
         if not current_state.next:
-            return {"status": "error", "message": "진행 중인 세션이 없습니다"}
+            return None
 
         next_node = current_state.next[0] if isinstance(current_state.next, tuple) else current_state.next
 
+        updates = {}
         if next_node == "discover_activity_places":
-            await self.graph.aupdate_state(config, {"user_activity_preference": feedback_content})
+            updates["user_activity_preference"] = feedback_content
         elif next_node == "discover_dining_places":
-            await self.graph.aupdate_state(config, {"user_food_preference": feedback_content})
+            updates["user_food_preference"] = feedback_content
         elif next_node == "validate_itinerary_quality":
-            await self.graph.aupdate_state(config, {"user_feedback": feedback_content})
+            updates["user_feedback"] = feedback_content
 
-        await self.graph.ainvoke(None, config)
+        forced_level = parse_trace_level(trace_level)
+        if forced_level:
+            updates["trace_level"] = higher_level(current_state.values.get("trace_level"), forced_level)
+        if updates:
+            await self.graph.aupdate_state(config, updates)
+
+        # 다른 워커가 찾은 장소는 노드가 하나씩 조회하지 않도록 한 번에 미리 읽어 둠
+        await self.nodes.place_store.aprefetch(state_place_ids(current_state.values))
+
+        if self.engine:
+            try:
+                logger = await self._run_logger(workflow_id, current_state.values)
+                logger.set_trace_level(forced_level)
+                config["configurable"]["db_logger"] = logger
+            except Exception as e:
+                print(f"[ERROR] Failed to resume workflow logger: {e}")
+
+        return config, last_seq(current_state.values.get("event_log"))
+
+    MAX_RUN_LOGGERS = 1000  # 보관할 진행 중 워크플로우 로거 수 (오래 대기한 세션부터 정리)
+
+    def _remember_run_logger(self, workflow_id: str, logger: AsyncDatabaseLogger):
+        self._run_loggers[workflow_id] = logger
+        self._run_loggers.move_to_end(workflow_id)
+        while len(self._run_loggers) > self.MAX_RUN_LOGGERS:
+            _, stale = self._run_loggers.popitem(last=False)
+            stale.close()
+
+    async def _run_logger(self, workflow_id: str, values: dict) -> AsyncDatabaseLogger:
+        """워크플로우 실행 동안 유지되는 로거 (이 워커에 없으면 DB의 노드 실행 순서에서 이어서 기록)"""
+        logger = self._run_loggers.get(workflow_id)
+        if logger is None:
+            logger = self._new_logger(values.get("trace_level"))
+            await logger.aresume_workflow(workflow_id, values, await self._user_id(logger))
+        self._remember_run_logger(workflow_id, logger)
+        return logger
+
+    async def _log_workflow_status(self, values: dict, status: str = "completed"):
+        """워크플로우 상태 업데이트 기록 (대기 상태가 아니면 워크플로우 로거 정리)"""
+        if not self.engine:
+            return
+        workflow_id = values.get("workflow_id")
+        try:
+            if status == "awaiting_input":
+                logger = self._run_loggers.get(workflow_id)
+            else:
+                logger = self._run_loggers.pop(workflow_id, None)
+            if logger is None:
+                logger = self._new_logger(values.get("trace_level"))
+                logger.current_workflow_id = workflow_id
+            logger.complete_workflow(values, status=status)
+            if status == "awaiting_input":
+                # 다른 워커가 이어받을 수 있도록 응답 전에 노드/장소 기록을 마침 (최대 DB_LOG_HANDOFF_TIMEOUT초)
+                flushed = await asyncio.to_thread(self.db_writer.flush, self.handoff_flush_timeout)
+                if not flushed:
+                    print(f"[DB] Writer flush timed out after {self.handoff_flush_timeout}s, "
+                          f"responding with {len(self.db_writer)} records still queued")
+            else:
+                await logger.aclose()
+            print(f"[DB] Workflow {status}")
+        except Exception as e:
+            print(f"[ERROR] Failed to log workflow status ({status}): {e}")
+
+    @staticmethod
+    def _event_fields(values: dict, cursor: int = 0) -> dict:
+        """응답에 포함할 cursor 이후 이벤트 (progress는 기존 클라이언트용 메시지 목록)"""
+        events, new_cursor, truncated = events_since(values.get("event_log"), cursor)
+        return {
+            "progress": [event["message"] for event in events],
+            "events": events,
+            "cursor": new_cursor,
+            "events_truncated": truncated
+        }
+
+    async def _finish_run(self, config: dict, workflow_id: str, cursor: int = 0) -> dict:
+        """그래프 실행 종료 후 상태 조회, DB 기록 및 응답 생성 (이벤트는 cursor 이후만 포함)"""
         final_state = await self.graph.aget_state(config)
+        # 응답에 넣을 장소 중 메모리에 없는 것을 미리 읽어 둠
+        await self.nodes.place_store.aprefetch(state_place_ids(final_state.values))
 
         if final_state.next:
+            # 워크플로우 상태 업데이트 (대기 중)
+            await self._log_workflow_status(final_state.values, status="awaiting_input")
             return {
                 "status": "awaiting_user_input",
                 "pending_step": final_state.next,
                 "itinerary": {
-                    "locations": {
-                        "activities": [loc.dict() for loc in final_state.values.get("activity_places", [])],
-                        "dining": [loc.dict() for loc in final_state.values.get("dining_places", [])],
-                        "cafes": [loc.dict() for loc in final_state.values.get("cafe_places", [])],
-                        "bars": [loc.dict() for loc in final_state.values.get("drinking_places", [])]
-                    },
+                    "locations": await self._serialize_locations(final_state.values),
                     "schedule": [item.dict() for item in final_state.values.get("final_itinerary", [])]
                 },
-                "progress": final_state.values.get("progress_messages", []),
-                "progress": final_state.values.get("progress_messages", []),
+                **self._event_fields(final_state.values, cursor),
                 "session_id": workflow_id,
                 "workflow_id": workflow_id
             }
 
-        # 워크플로우 완료 기록 (피드백 후)
-        if self.engine:
-            try:
-                logger = DatabaseLogger(self.engine)
-                logger.current_workflow_id = final_state.values.get("workflow_id")
-                # 피드백 후 완료되었으면 completed, 아니면 유지 (여기서는 완료된 경우만 진입)
-                logger.complete_workflow(final_state.values)
-                logger.close()
-            except Exception as e:
-                print(f"[ERROR] Failed to log workflow completion (feedback): {e}")
+        # 워크플로우 완료 기록
+        await self._log_workflow_status(final_state.values)
 
+        locations = await self._serialize_locations(final_state.values)
         return {
             "status": "completed",
             "itinerary": {
@@ -222,15 +341,154 @@ class TripPlannerAgent:
                 "locations": {
                     "starting_point": final_state.values.get("starting_point").dict() if final_state.values.get(
                         "starting_point") else None,
-                    "activities": [loc.dict() for loc in final_state.values.get("activity_places", [])],
-                    "dining": [loc.dict() for loc in final_state.values.get("dining_places", [])],
-                    "cafes": [loc.dict() for loc in final_state.values.get("cafe_places", [])],
-                    "bars": [loc.dict() for loc in final_state.values.get("drinking_places", [])]
+                    **locations
                 },
                 "schedule": [item.dict() for item in final_state.values.get("final_itinerary", [])]
             },
-            "progress": final_state.values.get("progress_messages", []),
-            "progress": final_state.values.get("progress_messages", []),
+            **self._event_fields(final_state.values, cursor),
             "session_id": workflow_id,
             "workflow_id": workflow_id
-        }
\ No newline at end of file
+        }
+
+    async def _serialize_locations(self, values: dict) -> dict:
+        """카테고리별 장소 목록 직렬화 (state의 장소 ID를 여기서 Location으로 조회)"""
+        return {
+            label: [loc.dict() for loc in await self.nodes.load_places(values, key)]
+            for key, label in self.PLACE_KEYS.items()
+        }
+
+    async def plan_trip(
+            self,
+            user_input: str,
+            session_id: Optional[str] = None,
+            time_settings: Optional[TimeSettings] = None,
+            starting_point: Optional[Location] = None,
+            trace_level: Optional[str] = None
+    ) -> dict:
+        """여행 계획 실행 (trace_level: DB 추적 수준 강제, 없으면 샘플링)"""
+        workflow_id, config, initial_state = await self._start_run(user_input, time_settings, starting_point,
+                                                                   trace_level)
+        await self.graph.ainvoke(initial_state, config)
+        return await self._finish_run(config, workflow_id)
+
+    async def autocomplete_places(self, query: str, limit: int = 10) -> dict:
+        """장소명 자동완성 (인덱스에 없을 때만 Kakao 키워드 검색 후 인덱스에 추가)"""
+        start = time.perf_counter()
+        suggestions = self.nodes.place_index.search(query, limit)
+        source = "index"
+
+        if not suggestions and query.strip():
+            try:
+                places = await self.kakao_client.search_places(query.strip(), size=min(limit, 15))
+            except Exception as e:
+                print(f"[WARNING] Autocomplete Kakao search failed: {e}")
+                places = []
+            self.nodes.place_index.add_places(places)
+            suggestions = [place_entry(place) for place in places[:limit]]
+            source = "kakao"
+
+        return {
+            "query": query,
+            "source": source,
+            "suggestions": suggestions,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    async def provide_user_feedback(self, workflow_id: str, feedback_content: str,
+                                    trace_level: Optional[str] = None) -> dict:
+        """사용자 피드백 제공 (workflow_id를 thread_id로 사용, 응답에는 이번 실행의 이벤트만 포함)"""
+        resumed = await self._resume_run(workflow_id, feedback_content, trace_level)
+        if resumed is None:
+            return {"status": "error", "message": "진행 중인 세션이 없습니다"}
+
+        config, cursor = resumed
+        await self.graph.ainvoke(None, config)
+        return await self._finish_run(config, workflow_id, cursor)
+
+    async def get_events(self, workflow_id: str, after: int = 0) -> Optional[dict]:
+        """after 커서 이후 이벤트 조회 (세션이 없으면 None)"""
+        await self.setup()
+        state = await self.graph.aget_state({"configurable": {"thread_id": workflow_id}})
+        if not state.values:
+            return None
+
+        events, cursor, truncated = events_since(state.values.get("event_log"), after)
+        return {
+            "workflow_id": workflow_id,
+            "status": "awaiting_user_input" if state.next else "completed",
+            "events": events,
+            "cursor": cursor,
+            "events_truncated": truncated
+        }
+
+    async def stream_plan_trip(
+            self,
+            user_input: str,
+            session_id: Optional[str] = None,
+            time_settings: Optional[TimeSettings] = None,
+            starting_point: Optional[Location] = None,
+            trace_level: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """여행 계획 실행 (노드 단위 스트리밍)
+
+        (event, data) 튜플을 노드가 끝날 때마다 내보내고 마지막에 plan_trip과 같은 응답을 "result"로 보냅니다.
+        """
+        workflow_id, config, initial_state = await self._start_run(user_input, time_settings, starting_point,
+                                                                   trace_level)
+        yield "session", {"workflow_id": workflow_id, "session_id": workflow_id}
+
+        async for event in self._stream_graph(initial_state, config):
+            yield event
+
+        yield "result", await self._finish_run(config, workflow_id)
+
+    async def stream_user_feedback(self, workflow_id: str, feedback_content: str,
+                                   trace_level: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+        """사용자 피드백 제공 (노드 단위 스트리밍)"""
+        resumed = await self._resume_run(workflow_id, feedback_content, trace_level)
+        if resumed is None:
+            yield "error", {"status": "error", "message": "진행 중인 세션이 없습니다"}
+            return
+
+        # 재개 시점 이전 이벤트는 이미 클라이언트가 받았으므로 제외
+        config, cursor = resumed
+        async for event in self._stream_graph(None, config, cursor):
+            yield event
+
+        yield "result", await self._finish_run(config, workflow_id, cursor)
+
+    async def _stream_graph(
+            self,
+            graph_input: Optional[TripState],
+            config: dict,
+            cursor: int = 0
+    ) -> AsyncIterator[Tuple[str, dict]]:
+        """graph.astream 업데이트를 progress / places / itinerary 이벤트로 변환"""
+        last_places = {}
+
+        async for update in self.graph.astream(graph_input, config, stream_mode="updates"):
+            for node_name, values in update.items():
+                # 인터럽트 등 상태 변경이 없는 업데이트
+                if not isinstance(values, dict):
+                    continue
+
+                if values.get("event_log") is not None:
+                    events, cursor, _ = events_since(values["event_log"], cursor)
+                    for event in events:
+                        yield "progress", {"node": event["node"] or node_name, "message": event["message"],
+                                           "type": event["type"], "seq": event["seq"]}
+
+                for key, label in self.PLACE_KEYS.items():
+                    place_ids = values.get(key)
+                    if place_ids is None:
+                        continue
+                    if last_places.get(key, []) != place_ids:
+                        last_places[key] = place_ids
+                        places = await self.nodes.load_places(values, key)
+                        yield "places", {"node": node_name, "category": label, "places": [loc.dict() for loc in places]}
+
+                if node_name == "generate_itinerary" and values.get("final_itinerary"):
+                    yield "itinerary", {
+                        "node": node_name,
+                        "schedule": [item.dict() for item in values["final_itinerary"]]
+                    }
@@ -0,0 +1,161 @@
+"""
+JSON 페이로드 압축 벤치마크
+nodes/workflows/generations의 큰 JSON 값을 코덱별로 저장했을 때의 바이트 수와 인코딩/디코딩, DB 쓰기/읽기 시간 비교
+
+    python benchmark_compression.py                          # 합성 샘플, 메모리 SQLite
+    python benchmark_compression.py --source-db $DATABASE_URL # 실제 기록을 샘플로 사용
+    python benchmark_compression.py --source-db $DATABASE_URL --train-dict payload.dict  # zstd 공유 사전 학습
+"""
+import argparse
+import json
+import random
+import time
+from typing import Any, List, Optional
+
+from sqlalchemy import Column, Integer, JSON, LargeBinary, MetaData, Table, create_engine, insert, select
+
+from database import PayloadCodec, get_session, Node, Workflow, Generation
+
+
+def synthetic_samples(count: int = 200) -> List[Any]:
+    """state 스냅샷/일정과 비슷한 구조의 합성 샘플"""
+    rng = random.Random(42)
+    regions = ["홍대", "성수", "강남", "이태원", "을지로", "연남동"]
+    categories = ["음식점 > 한식 > 육류,고기", "음식점 > 카페", "문화,예술 > 전시관", "음식점 > 술집 > 호프,요리주점"]
+    samples = []
+    for i in range(count):
+        region = rng.choice(regions)
+        places = [
+            {
+                "id": str(rng.randint(10 ** 7, 10 ** 9)),
+                "name": f"{region} {rng.choice(['맛집', '카페', '갤러리', '펍'])} {j}",
+                "category": rng.choice(categories),
+                "address": f"서울 마포구 {region}로 {rng.randint(1, 200)}",
+                "x": 126.9 + rng.random() * 0.1,
+                "y": 37.5 + rng.random() * 0.1,
+                "phone": f"02-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+                "place_url": f"http://place.map.kakao.com/{rng.randint(10 ** 7, 10 ** 9)}",
+            }
+            for j in range(rng.randint(3, 15))
+        ]
+        samples.append({
+            "user_input": f"{region} 근처에서 데이트",
+            "final_itinerary": [
+                {"order": k + 1, "start_time": f"{14 + k}:00", "location": place, "notes": "이동 10분"}
+                for k, place in enumerate(places[:5])
+            ],
+            "candidate_pools": {"dining": [p["id"] for p in places]},
+            "event_log": {"next_seq": i, "events": [
+                {"seq": i, "type": "progress", "node": "discover_dining_places", "message": f"✓ {region} 식당 {len(places)}개"}
+            ]},
+        })
+    return samples
+
+
+def db_samples(db_url: str, limit: int) -> List[Any]:
+    """기존 기록에서 샘플 수집 (CompressedJSON이 풀어서 돌려준 값)"""
+    session = get_session(create_engine(db_url))
+    try:
+        samples = []
+        for column in (Node.state_data, Node.input_data, Workflow.final_state, Workflow.final_itinerary,
+                       Generation.full_prompt):
+            rows = session.query(column).filter(column.isnot(None)).limit(limit).all()
+            samples.extend(row[0] for row in rows)
+        return samples
+    finally:
+        session.close()
+
+
+def train_dictionary(samples: List[Any], path: str, size: int):
+    import zstandard
+
+    data = [json.dumps(s, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8") for s in samples]
+    dictionary = zstandard.train_dictionary(size, data)
+    with open(path, "wb") as f:
+        f.write(dictionary.as_bytes())
+    print(f"[BENCH] Trained {len(dictionary.as_bytes())} byte dictionary from {len(data)} samples -> {path}")
+
+
+def bench_codec(name: str, codec: Optional[PayloadCodec], samples: List[Any]) -> dict:
+    """코덱 하나의 크기, 인코딩/디코딩 시간, 메모리 SQLite 쓰기/읽기 시간 (codec=None이면 JSON 컬럼)"""
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    table = Table("payloads", metadata, Column("id", Integer, primary_key=True),
+                  Column("payload", JSON if codec is None else LargeBinary))
+    metadata.create_all(engine)
+
+    start = time.perf_counter()
+    if codec is None:
+        stored = samples
+        sizes = [len(json.dumps(s, default=str).encode("utf-8")) for s in samples]
+    else:
+        stored = [codec.encode(s) for s in samples]
+        sizes = [len(b) for b in stored]
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(table), [{"id": i, "payload": p} for i, p in enumerate(stored)])
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        rows = [row[0] for row in conn.execute(select(table.c.payload))]
+    read_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if codec is not None:
+        rows = [codec.decode(bytes(r)) for r in rows]
+    decode_s = time.perf_counter() - start
+
+    n = len(samples)
+    return {
+        "codec": name,
+        "bytes": sum(sizes),
+        "encode_us": encode_s / n * 1e6,
+        "decode_us": decode_s / n * 1e6,
+        "write_us": write_s / n * 1e6,
+        "read_us": read_s / n * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source-db", help="샘플을 읽을 DB URL (생략하면 합성 샘플)")
+    parser.add_argument("--limit", type=int, default=500, help="컬럼별 최대 샘플 수")
+    parser.add_argument("--train-dict", help="zstd 공유 사전을 학습해 저장할 경로 (DB_COMPRESSION_DICT로 사용)")
+    parser.add_argument("--dict-size", type=int, default=16384)
+    args = parser.parse_args()
+
+    samples = db_samples(args.source_db, args.limit) if args.source_db else synthetic_samples()
+    if not samples:
+        print("[BENCH] No samples")
+        return
+    print(f"[BENCH] {len(samples)} samples ({'db' if args.source_db else 'synthetic'})")
+
+    codecs = [
+        ("json (plain)", None),
+        ("zlib-1", PayloadCodec("zlib", level=1)),
+        ("zlib-6", PayloadCodec("zlib", level=6)),
+        ("zlib-9", PayloadCodec("zlib", level=9)),
+    ]
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        print("[BENCH] zstandard not installed, skipping zstd")
+    else:
+        codecs.append(("zstd-3", PayloadCodec("zstd", level=3, dict_path="")))
+        if args.train_dict:
+            train_dictionary(samples, args.train_dict, args.dict_size)
+            codecs.append(("zstd-3+dict", PayloadCodec("zstd", level=3, dict_path=args.train_dict)))
+
+    results = [bench_codec(name, codec, samples) for name, codec in codecs]
+    baseline = results[0]["bytes"]
+    print(f"{'codec':<14}{'bytes':>12}{'ratio':>8}{'enc µs':>10}{'dec µs':>10}{'write µs':>10}{'read µs':>10}")
+    for r in results:
+        print(f"{r['codec']:<14}{r['bytes']:>12,}{baseline / r['bytes']:>8.2f}{r['encode_us']:>10.1f}"
+              f"{r['decode_us']:>10.1f}{r['write_us']:>10.1f}{r['read_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+체크포인트 저장소 선택
+멀티 워커(uvicorn --workers N) 환경에서 모든 워커가 같은 세션(workflow_id)을
+이어서 실행할 수 있도록 LangGraph 체크포인터를 공유 저장소로 교체
+"""
+import os
+from typing import Optional, Tuple, Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+# 지원하는 백엔드
+# - memory: 프로세스 내 메모리 (단일 워커 전용, 기본값)
+# - sqlite: 로컬 파일 공유 (같은 머신의 여러 워커, WAL 모드 + busy_timeout으로 동시 기록 대기)
+# - postgres: Neon/PostgreSQL 공유 (여러 머신)
+CHECKPOINT_BACKENDS = ("memory", "sqlite", "postgres")
+
+DEFAULT_SQLITE_PATH = "checkpoints.sqlite"
+
+
+def psycopg_conninfo(url: str) -> str:
+    """SQLAlchemy 형식 URL(postgresql+psycopg2://, postgresql+asyncpg://)을 psycopg 연결 문자열로 변환
+
+    드라이버 접미사를 떼고, asyncpg용 ssl= 파라미터는 libpq의 sslmode=로 바꿈
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.split("+", 1)[0]
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if any(key == "ssl" for key, _ in query) and not any(key == "sslmode" for key, _ in query):
+        query = [("sslmode" if key == "ssl" else key, value) for key, value in query]
+    return urlunsplit((scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
+def get_checkpoint_config(backend: Optional[str] = None, url: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """환경 변수에서 체크포인트 백엔드 설정 읽기
+
+    Args:
+        backend: 백엔드 이름. None이면 CHECKPOINT_BACKEND 사용
+        url: 연결 문자열. None이면 CHECKPOINT_URL (postgres는 DATABASE_URL까지) 사용
+
+    Returns:
+        (backend, url)
+    """
+    backend = (backend or os.getenv("CHECKPOINT_BACKEND", "memory")).lower()
+    if backend not in CHECKPOINT_BACKENDS:
+        raise ValueError(
+            f"Unknown CHECKPOINT_BACKEND '{backend}'. "
+            f"Choose one of: {', '.join(CHECKPOINT_BACKENDS)}"
+        )
+
+    url = url or os.getenv("CHECKPOINT_URL")
+    if backend == "sqlite" and not url:
+        url = DEFAULT_SQLITE_PATH
+    elif backend == "postgres" and not url:
+        url = os.getenv("DATABASE_URL")
+        if not url:
+            raise ValueError("CHECKPOINT_URL or DATABASE_URL must be set for the postgres checkpoint backend")
+
+    return backend, url
+
+
+async def open_checkpointer(backend: str, url: Optional[str] = None) -> Tuple[BaseCheckpointSaver, Any]:
+    """체크포인터 생성 및 테이블 준비
+
+    비동기 체크포인터는 실행 중인 이벤트 루프가 필요하므로
+    서버 시작(lifespan) 또는 첫 요청 시점에 호출해야 합니다.
+
+    Returns:
+        (checkpointer, 종료 시 닫아야 할 리소스 또는 None)
+    """
+    if backend == "memory":
+        return MemorySaver(), None
+
+    if backend == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        # sqlite:///path 형태도 허용
+        path = url.replace("sqlite:///", "", 1) if url.startswith("sqlite:///") else url
+        # 여러 워커가 같은 파일에 기록하므로 WAL 모드로 읽기/쓰기를 분리하고 잠금 시 바로 실패하지 않고 대기
+        busy_timeout = float(os.getenv("CHECKPOINT_SQLITE_BUSY_TIMEOUT", "30"))
+        conn = await aiosqlite.connect(path, timeout=busy_timeout)
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        return saver, conn
+
+    if backend == "postgres":
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+        pool = AsyncConnectionPool(
+            conninfo=psycopg_conninfo(url),
+            max_size=int(os.getenv("CHECKPOINT_POOL_SIZE", "5")),
+            open=False,
+            kwargs={
+                "autocommit": True,
+                "prepare_threshold": 0,  # Neon(pgbouncer) 호환
+                "row_factory": dict_row,
+            },
+        )
+        await pool.open()
+        saver = AsyncPostgresSaver(pool)
+        await saver.setup()
+        return saver, pool
+
+    raise ValueError(f"Unknown checkpoint backend: {backend}")
+
+
+async def close_checkpointer(resource: Any):
+    """open_checkpointer가 반환한 리소스 정리"""
+    if resource is None:
+        return
+    try:
+        await resource.close()
+    except Exception as e:
+        print(f"[WARNING] Failed to close checkpoint store: {e}")
@@ -1,13 +1,126 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import json
+import os
 import uuid
+import zlib
 
 Base = declarative_base()
 
 
+# 압축 JSON 페이로드 형식: 1바이트 코덱 + 본문
+CODEC_RAW = 0x00  # 압축하지 않은 JSON (작은 값)
+CODEC_ZLIB = 0x01
+CODEC_ZSTD = 0x02  # 공유 사전을 쓴 경우 사전 ID는 zstd 프레임 헤더에 기록됨
+
+
+class PayloadCodec:
+    """JSON 값 <-> 압축 바이트 (DB_COMPRESSION: zlib(기본) / zstd / none)
+
+    zstd는 zstandard 패키지가 있어야 하며, DB_COMPRESSION_DICT로 학습한 공유 사전 파일을 지정할 수 있습니다
+    (benchmark_compression.py --train-dict로 생성). 읽을 때는 행마다 기록된 코덱으로 풀기 때문에 설정을 바꿔도 기존 행은 그대로 읽힙니다.
+    사전은 압축 방식과 관계없이 읽기용으로 항상 로드하고 zstd 프레임의 사전 ID로 골라 쓰므로,
+    사전을 교체할 때는 "새사전,이전사전"처럼 쉼표로 나열하면 됩니다 (첫 번째 사전으로 압축).
+    """
+
+    def __init__(self, method: Optional[str] = None, level: Optional[int] = None,
+                 min_bytes: Optional[int] = None, dict_path: Optional[str] = None):
+        self.method = (method or os.getenv("DB_COMPRESSION", "zlib")).lower()
+        self.min_bytes = min_bytes if min_bytes is not None else int(os.getenv("DB_COMPRESSION_MIN_BYTES", "256"))
+        dict_path = dict_path if dict_path is not None else os.getenv("DB_COMPRESSION_DICT", "")
+        self.dict_paths = [path.strip() for path in dict_path.split(",") if path.strip()]
+        self.level = level or int(os.getenv("DB_COMPRESSION_LEVEL", "3" if self.method == "zstd" else "6"))
+        self._compressor = None
+        self._decompressors: Optional[Dict[int, Any]] = None  # 사전 ID(0 = 사전 없음) -> ZstdDecompressor
+
+        if self.method == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                print("[WARNING] zstandard is not installed, falling back to zlib compression")
+                self.method = "zlib"
+                self.level = 6
+            else:
+                dictionaries = self._load_dictionaries(zstandard)
+                self._compressor = zstandard.ZstdCompressor(level=self.level, dict_data=dictionaries[0] if dictionaries else None)
+
+    def _load_dictionaries(self, zstandard) -> List[Any]:
+        dictionaries = []
+        for path in self.dict_paths:
+            with open(path, "rb") as f:
+                dictionaries.append(zstandard.ZstdCompressionDict(f.read()))
+        return dictionaries
+
+    def _zstd_decompress(self, body: bytes) -> bytes:
+        # zstd 행을 읽으려면 zstandard(와 압축에 쓴 사전)가 필요
+        import zstandard
+        if self._decompressors is None:
+            decompressors = {0: zstandard.ZstdDecompressor()}
+            for dictionary in self._load_dictionaries(zstandard):
+                decompressors[dictionary.dict_id()] = zstandard.ZstdDecompressor(dict_data=dictionary)
+            self._decompressors = decompressors
+        dict_id = zstandard.get_frame_parameters(body).dict_id
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            raise ValueError(f"zstd payload was compressed with dictionary {dict_id}, add it to DB_COMPRESSION_DICT")
+        return decompressor.decompress(body)
+
+    def encode(self, value: Any) -> bytes:
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        if self.method == "none" or len(raw) < self.min_bytes:
+            return bytes([CODEC_RAW]) + raw
+        if self.method == "zstd":
+            return bytes([CODEC_ZSTD]) + self._compressor.compress(raw)
+        return bytes([CODEC_ZLIB]) + zlib.compress(raw, self.level)
+
+    def decode(self, data: bytes) -> Any:
+        codec, body = data[0], data[1:]
+        if codec == CODEC_ZLIB:
+            body = zlib.decompress(body)
+        elif codec == CODEC_ZSTD:
+            body = self._zstd_decompress(body)
+        elif codec != CODEC_RAW:
+            raise ValueError(f"Unknown payload codec: {codec}")
+        return json.loads(body)
+
+
+_payload_codec: Optional[PayloadCodec] = None
+
+
+def get_payload_codec() -> PayloadCodec:
+    global _payload_codec
+    if _payload_codec is None:
+        _payload_codec = PayloadCodec()
+    return _payload_codec
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON 값을 압축 바이트(bytea/BLOB)로 저장하는 컬럼 타입 (ORM에서는 JSON 컬럼과 똑같이 사용)"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return get_payload_codec().encode(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # 마이그레이션 전 JSON/Text 컬럼 (create_all로 만든 기존 개발용 DB)
+            try:
+                return json.loads(value)
+            except ValueError:
+                return value
+        return get_payload_codec().decode(bytes(value))
+
+
 class User(Base):
     """사용자 테이블"""
     __tablename__ = 'users'
@@ -49,7 +162,8 @@ class Workflow(Base):
     search_radius = Column(Integer, default=2000)
     
     # 최종 결과
-    final_itinerary = Column(JSON, nullable=True)  # List[ScheduleItem]
+    final_itinerary = Column(CompressedJSON, nullable=True)  # List[ScheduleItem]
+    final_state = Column(CompressedJSON, nullable=True)  # 종료/HIL 대기 시점의 전체 state 스냅샷 (노드에는 변경분만 저장)
     
     # 타임스탬프
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -82,11 +196,12 @@ class Node(Base):
     
     # 노드별 State 저장 (JSON)
     # 각 노드에서 생성/수정된 state 데이터를 저장
-    state_data = Column(JSON, nullable=True)  # 노드 실행 후의 전체 state 또는 변경된 부분
+    state_data = Column(CompressedJSON, nullable=True)  # 노드가 바꾼 부분 ({"format": "patch", "ops": JSON Patch})
     
     # 노드 입력/출력
-    input_data = Column(JSON, nullable=True)  # 노드 입력 데이터
+    input_data = Column(CompressedJSON, nullable=True)  # 직전 노드 완료 이후 바뀐 입력 (없으면 NULL, 형식은 state_data와 같음)
     output_data = Column(JSON, nullable=True)  # 노드 출력 데이터
+    cache_status = Column(String(20), nullable=True, index=True)  # 노드 캐시 결과 (hit, miss, bypass)
     
     # 에러 정보
     error_message = Column(Text, nullable=True)
@@ -115,11 +230,12 @@ class Generation(Base):
     # 모델 정보
     model_name = Column(String(255), nullable=False)  # llama3.2, gpt-4 등
     model_provider = Column(String(100), nullable=True)  # ollama, openai 등
+    task = Column(String(50), nullable=True, index=True)  # intent, keyword_expansion, feedback_classification 등
     
     # 프롬프트 정보
     system_prompt = Column(Text, nullable=True)
     user_prompt = Column(Text, nullable=False)
-    full_prompt = Column(Text, nullable=True)  # 전체 프롬프트 (디버깅용)
+    full_prompt = Column(CompressedJSON, nullable=True)  # 전체 프롬프트 (디버깅용)
     
     # 생성 결과
     output = Column(Text, nullable=False)
@@ -151,6 +267,58 @@ class Generation(Base):
         return f"<Generation(id={self.id}, model='{self.model_name}', workflow_id={self.workflow_id})>"
 
 
+class LLMCacheEntry(Base):
+    """LLM 응답 캐시 테이블 (워커 간 공유)"""
+    __tablename__ = 'llm_cache'
+
+    cache_key = Column(String(64), primary_key=True)  # sha256(모델, temperature, 정규화된 프롬프트)
+    model_name = Column(String(255), nullable=False)
+    temperature = Column(Float, nullable=True)
+    output = Column(Text, nullable=False)
+    hit_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<LLMCacheEntry(key={self.cache_key[:12]}, model='{self.model_name}')>"
+
+
+class Place(Base):
+    """장소 저장소 테이블 (state에는 장소 ID만 저장, 워커 간 공유)"""
+    __tablename__ = 'places'
+
+    id = Column(String(64), primary_key=True)  # Kakao 장소 ID (ID가 없는 장소는 "local:" 해시)
+    name = Column(String(255), nullable=False)
+    category = Column(String(255), nullable=True)
+    address = Column(String(255), nullable=True)
+    x = Column(Float, nullable=False)
+    y = Column(Float, nullable=False)
+    phone = Column(String(50), nullable=True)
+    place_url = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<Place(id={self.id}, name='{self.name}')>"
+
+
+class FeedbackLabel(Base):
+    """피드백 분류 학습 데이터 (LLM이 판단한 피드백 -> action, 추적 수준과 관계없이 기록)"""
+    __tablename__ = 'feedback_labels'
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    workflow_id = Column(String(36), nullable=True, index=True)  # off 수준이면 workflows 행이 없을 수 있어 FK 없음
+    feedback = Column(Text, nullable=False)
+    action = Column(String(50), nullable=False)
+    source = Column(String(20), nullable=False, default="llm")
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<FeedbackLabel(action='{self.action}', feedback='{self.feedback[:20]}')>"
+
+
 # 데이터베이스 초기화 함수
 def init_db(db_url: Optional[str] = None):
     """데이터베이스 초기화
@@ -195,6 +363,90 @@ def get_session(engine):
     return Session()
 
 
+# 동기 드라이버 -> 비동기 드라이버 (요청 처리 중 조회/기록용)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(db_url: str) -> str:
+    """DATABASE_URL을 비동기 드라이버 URL로 변환 (asyncpg는 sslmode 대신 ssl, channel_binding 미지원)"""
+    from sqlalchemy.engine import make_url
+
+    url = make_url(db_url)
+    driver = ASYNC_DRIVERS.get(url.drivername)
+    if driver is None:
+        return db_url  # 이미 비동기 드라이버
+    url = url.set(drivername=driver)
+    if driver == "postgresql+asyncpg":
+        query = dict(url.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        url = url.set(query=query)
+    return url.render_as_string(hide_password=False)
+
+
+def init_async_db(db_url: Optional[str] = None):
+    """비동기 엔진 생성 (테이블 생성/마이그레이션은 init_db, alembic에서 처리)
+
+    Args:
+        db_url: 데이터베이스 URL. None이면 DATABASE_ASYNC_URL, 없으면 DATABASE_URL을 변환해서 사용
+
+    Returns:
+        SQLAlchemy AsyncEngine (드라이버가 설치되어 있지 않으면 ImportError)
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from dotenv import load_dotenv
+
+    if db_url is None:
+        load_dotenv()
+        db_url = os.getenv("DATABASE_ASYNC_URL") or os.getenv("DATABASE_URL")
+        if not db_url:
+            raise ValueError("DATABASE_URL environment variable is not set.")
+    db_url = async_database_url(db_url)
+
+    if db_url.startswith("sqlite"):
+        return create_async_engine(db_url, echo=False)
+    # PostgreSQL 연결 풀 설정 (init_db와 동일)
+    return create_async_engine(
+        db_url,
+        echo=False,
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=10
+    )
+
+
+def get_async_session(engine):
+    """비동기 세션 생성 (commit 후에도 객체 속성을 다시 조회하지 않음)"""
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    return AsyncSession(engine, expire_on_commit=False)
+
+
+async def run_session(fn: Callable, *args, async_engine=None, engine=None):
+    """fn(session, *args)를 이벤트 루프를 막지 않고 실행
+
+    비동기 엔진이 있으면 AsyncSession.run_sync로(동기 ORM 코드를 비동기 드라이버 위에서 실행),
+    없으면 동기 엔진 세션으로 별도 스레드에서 실행합니다. fn은 세션 안에서 필요한 값을 모두 읽어서 반환해야 합니다.
+    """
+    if async_engine is not None:
+        async with get_async_session(async_engine) as session:
+            return await session.run_sync(fn, *args)
+
+    def run():
+        session = get_session(engine)
+        try:
+            return fn(session, *args)
+        finally:
+            session.close()
+
+    return await asyncio.to_thread(run)
+
+
 # 편의 함수들
 def create_user(session, username: str, email: Optional[str] = None) -> User:
     """사용자 생성"""
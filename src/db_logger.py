@@ -1,17 +1,31 @@
 """
 데이터베이스 로깅 헬퍼
 워크플로우 실행 중 state와 LLM 생성 기록을 자동으로 DB에 저장
+기록은 db_writer의 write-behind 큐를 거쳐 백그라운드에서 모아서 저장 (호출하는 노드는 DB 왕복을 기다리지 않음)
+워크플로우 실행 하나에 로거 하나를 유지하며, 노드 행과 그 노드의 LLM 생성 기록은 노드가 끝날 때 한 번에 기록
+노드의 input_data/state_data에는 직전 기록 이후 바뀐 부분(JSON Patch)만 저장하고, 전체 state는 워크플로우 종료/대기 시
+workflows.final_state에 저장. 특정 노드의 전체 state는 get_node_state()로 복원
+기록 범위는 추적 수준(tracing.py)을 따르며, 노드 에러가 나면 full로 올려 그때까지 보류한 기록과 함께 저장
+요청 처리 경로에서는 조회를 비동기 엔진으로 실행하는 AsyncDatabaseLogger 사용
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Optional, Dict, Any, Deque, Tuple
+import asyncio
 import json
+import uuid
 from contextlib import contextmanager
 
+from sqlalchemy import func
+
 from database import (
-    get_session, 
+    get_session, run_session,
     User, Workflow, Node, Generation,
-    create_user, create_workflow, create_node, create_generation
+    create_user
 )
+from db_writer import DatabaseWriter, get_db_writer
+from state_patch import make_patch, apply_patch
+from tracing import TRACE_FULL, TRACE_NODES, TRACE_WORKFLOW, higher_level, parse_trace_level, trace_at_least
 from state import TripState
 from models import TimeSettings, UserIntent, ScheduleItem
 
@@ -19,27 +33,79 @@ from models import TimeSettings, UserIntent, ScheduleItem
 class DatabaseLogger:
     """워크플로우 실행을 데이터베이스에 기록하는 헬퍼 클래스"""
     
-    def __init__(self, engine):
+    MAX_HELD_ROWS = 200  # 추적 수준이 낮아 보류 중인 노드/생성 기록 수 (에러 시 기록)
+    
+    def __init__(self, engine, writer: Optional[DatabaseWriter] = None, trace_level: Optional[str] = None):
         self.engine = engine
-        self.session = get_session(engine)
+        self.session = get_session(engine)  # 조회 전용 (기록은 writer 큐로)
+        self.writer = writer if writer is not None else get_db_writer(engine)  # 빈 큐는 len() == 0이라 or로 고르면 안 됨
         self.current_workflow_id: Optional[str] = None
         self.current_user_id: Optional[int] = None
         self.node_execution_order = 0
+        # 실행 중인 노드 ID -> {"values": 노드 행, "generations": 노드 안에서 생긴 LLM 생성 기록}
+        self._open_nodes: Dict[str, Dict[str, Any]] = {}
+        # 마지막으로 기록한 state (직렬화된 형태, 다음 노드 기록의 패치 기준. None이면 다음 기록은 전체 스냅샷)
+        self._last_state: Optional[Dict[str, Any]] = {}
+        self.trace_level = parse_trace_level(trace_level) or TRACE_FULL
+        self._pending_workflow: Optional[Dict[str, Any]] = None  # off 수준이라 아직 기록하지 않은 워크플로우 행
+        self._held: Deque[Tuple[Any, Dict[str, Any]]] = deque(maxlen=self.MAX_HELD_ROWS)
         
     def close(self):
-        """세션 종료"""
+        """끝나지 않은 노드를 running 상태로 기록하고 세션 종료"""
+        for node_id in list(self._open_nodes):
+            self._write_node(self._open_nodes.pop(node_id))
         self.session.close()
     
     def get_or_create_user(self, username: str, email: Optional[str] = None) -> User:
         """사용자 가져오기 또는 생성"""
-        user = self.session.query(User).filter_by(username=username).first()
-        if not user:
-            user = create_user(self.session, username, email)
+        user = self._query_user(self.session, username, email)
         self.current_user_id = user.id
         return user
     
-    def start_workflow(self, user_id: int, state: TripState, session_id: str = None, workflow_id: str = None) -> Workflow:
-        """워크플로우 시작 기록"""
+    @staticmethod
+    def _query_user(session, username: str, email: Optional[str] = None) -> User:
+        user = session.query(User).filter_by(username=username).first()
+        if not user:
+            user = create_user(session, username, email)
+        user.id  # commit으로 만료된 속성을 세션이 닫히기 전에 다시 로드
+        return user
+    
+    def _traced(self, level: str) -> bool:
+        return trace_at_least(self.trace_level, level)
+    
+    def set_trace_level(self, level: Optional[str]):
+        """추적 수준 올리기 (낮추지는 않음). 새 수준에 해당하는 보류 기록을 바로 기록"""
+        level = higher_level(self.trace_level, parse_trace_level(level))
+        if level == self.trace_level:
+            return
+        was_full = self._traced(TRACE_FULL)
+        self.trace_level = level
+        
+        if self._traced(TRACE_WORKFLOW) and self._pending_workflow:
+            self.writer.insert(Workflow, self._pending_workflow, critical=True)
+            self._pending_workflow = None
+        if self._traced(TRACE_NODES):
+            while self._held:
+                model, values = self._held.popleft()
+                self.writer.insert(model, values)
+        if self._traced(TRACE_FULL) and not was_full:
+            # 그동안 state를 기록하지 않았으므로 다음 기록은 전체 스냅샷
+            self._last_state = None
+    
+    def _emit(self, model, values: Dict[str, Any], critical: bool = False):
+        """노드/생성 기록 (nodes 수준 미만이면 에러에 대비해 보류)"""
+        if self._traced(TRACE_NODES):
+            written = self.writer.insert(model, values, critical=critical)
+            if not written and model is Node and (values.get("input_data") or values.get("state_data")):
+                # 버려진 행의 패치가 빠지면 이후 패치를 적용할 수 없으므로 다음 기록은 전체 스냅샷
+                self._last_state = None
+        else:
+            self._held.append((model, values))
+    
+    @staticmethod
+    def _workflow_values(user_id: int, state: TripState, session_id: Optional[str],
+                         workflow_id: Optional[str]) -> Dict[str, Any]:
+        """state에서 워크플로우 행 값 구성"""
         # state에서 필요한 정보 추출
         time_settings_dict = None
         if state.get("time_settings"):
@@ -55,84 +121,148 @@ class DatabaseLogger:
             ui = state["user_intent"]
             user_intent_dict = ui.model_dump()
         
-        workflow = create_workflow(
-            self.session,
-            user_id=user_id,
-            user_input=state.get("user_input", ""),
-            input_type=state.get("input_type"),
-            session_id=session_id,
-            workflow_id=workflow_id,
-            time_settings=time_settings_dict,
-            user_intent=user_intent_dict,
-            search_radius=state.get("search_radius", 2000),
-            status="running"
-        )
+        now = datetime.utcnow()
+        values = {
+            "id": workflow_id or str(uuid.uuid4()),
+            "user_id": user_id,
+            "user_input": state.get("user_input", ""),
+            "input_type": state.get("input_type"),
+            "session_id": session_id,
+            "time_settings": time_settings_dict,
+            "user_intent": user_intent_dict,
+            "search_radius": state.get("search_radius", 2000),
+            "status": "running",
+            "created_at": now,
+            "updated_at": now
+        }
+        return values
+    
+    def start_workflow(self, user_id: int, state: TripState, session_id: str = None, workflow_id: str = None) -> Workflow:
+        """워크플로우 시작 기록"""
+        values = self._workflow_values(user_id, state, session_id, workflow_id)
+        if self._traced(TRACE_WORKFLOW):
+            # 노드/생성 기록이 참조하므로 큐가 가득 차도 버리지 않음
+            self.writer.insert(Workflow, values, critical=True)
+        else:
+            self._pending_workflow = values
+        workflow = Workflow(**values)
         
         self.current_workflow_id = workflow.id
         self.node_execution_order = 0
+        self._last_state = {}
         return workflow
     
+    def resume_workflow(self, workflow_id: str, state: Optional[TripState] = None, user_id: Optional[int] = None):
+        """다른 프로세스가 시작한 워크플로우를 이어서 기록 (노드 실행 순서를 DB에서 이어받음)
+
+        워크플로우 행이 없으면(off 수준으로 시작) state와 user_id로 행을 만들어 두었다가 수준이 오르면 기록합니다.
+        """
+        self.writer.flush()
+        self._resume(workflow_id, *self._query_resume(self.session, workflow_id), state, user_id)
+    
+    @staticmethod
+    def _query_resume(session, workflow_id: str) -> Tuple[Optional[int], bool]:
+        """(마지막 노드 실행 순서, 워크플로우 행 존재 여부)"""
+        last_order = (
+            session.query(func.max(Node.execution_order))
+            .filter(Node.workflow_id == workflow_id)
+            .scalar()
+        )
+        exists = session.query(Workflow.id).filter(Workflow.id == workflow_id).first() is not None
+        return last_order, exists
+    
+    def _resume(self, workflow_id: str, last_order: Optional[int], exists: bool, state: Optional[TripState],
+                user_id: Optional[int]):
+        self.current_workflow_id = workflow_id
+        self.node_execution_order = last_order or 0
+        if not exists and state is not None and user_id is not None:
+            self._pending_workflow = self._workflow_values(user_id, state, workflow_id, workflow_id)
+        # 다음 기록은 전체 스냅샷 (HIL 대기 중 노드 밖에서 바뀐 state(이벤트 등)는 노드 패치에 없으므로
+        # final_state를 기준으로 삼으면 복원 결과가 달라짐)
+        self._last_state = None
+    
+    def _state_patch(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """직전 기록 대비 변경분 (바뀐 게 없으면 None, 기준이 없으면 전체 스냅샷). 이후 기록의 기준 state 갱신"""
+        serialized = self._serialize_state(state)
+        base, self._last_state = self._last_state, serialized
+        if base is None:
+            return {"format": "snapshot", "state": serialized}
+        ops = make_patch(base, serialized)
+        return {"format": "patch", "ops": ops} if ops else None
+    
     def log_node_start(self, node_name: str, node_type: str, 
                        input_data: Optional[Dict[str, Any]] = None) -> Node:
-        """노드 실행 시작 기록"""
+        """노드 실행 시작 (노드 행은 완료/실패 시 한 번에 기록)"""
         if not self.current_workflow_id:
             raise ValueError("Workflow not started. Call start_workflow first.")
         
         self.node_execution_order += 1
         
-        if input_data:
-            input_data = self._serialize_state(input_data)
+        if input_data and self._traced(TRACE_FULL):
+            # 직전 노드 완료 이후 바뀐 부분 (HIL 응답 반영 등, 대부분 None)
+            input_data = self._state_patch(input_data)
+        else:
+            input_data = None
         
-        node = create_node(
-            self.session,
-            workflow_id=self.current_workflow_id,
-            node_name=node_name,
-            node_type=node_type,
-            execution_order=self.node_execution_order,
-            status="running",
-            started_at=datetime.utcnow(),
-            input_data=input_data
-        )
+        values = {
+            "id": str(uuid.uuid4()),
+            "workflow_id": self.current_workflow_id,
+            "node_name": node_name,
+            "node_type": node_type,
+            "execution_order": self.node_execution_order,
+            "status": "running",
+            "started_at": datetime.utcnow(),
+            "input_data": input_data
+        }
+        self._open_nodes[values["id"]] = {"values": values, "generations": []}
         
-        return node
+        return Node(**values)
     
     def log_node_complete(self, node_id: str, state: TripState, 
-                         output_data: Optional[Dict[str, Any]] = None):
-        """노드 실행 완료 기록"""
-        node = self.session.query(Node).filter_by(id=node_id).first()
-        if not node:
-            return
+                         output_data: Optional[Dict[str, Any]] = None,
+                         cache_status: Optional[str] = None):
+        """노드 실행 완료 기록 (cache_status: 노드 캐시 hit/miss/bypass)"""
+        # 노드가 바꾼 부분만 저장 (큐에 들어간 뒤 state가 바뀌어도 영향 없도록 지금 직렬화)
+        state_data = None
+        if self._traced(TRACE_FULL):
+            state_data = self._state_patch(state) or {"format": "patch", "ops": []}
         
-        # state를 JSON 직렬화 가능한 형태로 변환
-        state_data = self._serialize_state(state)
-        
-        node.status = "completed"
-        node.completed_at = datetime.utcnow()
-        node.state_data = state_data
-        node.output_data = output_data
-        
-        if node.started_at:
-            duration = (node.completed_at - node.started_at).total_seconds() * 1000
-            node.duration_ms = int(duration)
-        
-        self.session.commit()
+        self._finish_node(node_id, {
+            "status": "completed",
+            "state_data": state_data,
+            "output_data": output_data,
+            "cache_status": cache_status
+        })
     
-    def log_node_error(self, node_id: str, error_message: str, traceback: Optional[str] = None):
-        """노드 실행 에러 기록"""
-        node = self.session.query(Node).filter_by(id=node_id).first()
-        if not node:
+    def log_node_error(self, node_id: str, error_message: str, traceback: Optional[str] = None,
+                       state: Optional[TripState] = None):
+        """노드 실행 에러 기록 (추적 수준을 full로 올리고 에러 시점 state 저장)"""
+        self.set_trace_level(TRACE_FULL)
+        self._finish_node(node_id, {
+            "status": "failed",
+            "state_data": self._state_patch(state) if state is not None else None,
+            "error_message": error_message,
+            "error_traceback": traceback
+        }, critical=True)
+    
+    def _finish_node(self, node_id: str, values: Dict[str, Any], critical: bool = False):
+        """노드 행을 완료 값과 함께 한 번에 기록 (이 로거가 시작하지 않은 노드는 기존 행 update)"""
+        values["completed_at"] = datetime.utcnow()
+        open_node = self._open_nodes.pop(node_id, None)
+        if open_node is None:
+            self.writer.update(Node, node_id, values, critical=critical)
             return
         
-        node.status = "failed"
-        node.completed_at = datetime.utcnow()
-        node.error_message = error_message
-        node.error_traceback = traceback
-        
-        if node.started_at:
-            duration = (node.completed_at - node.started_at).total_seconds() * 1000
-            node.duration_ms = int(duration)
-        
-        self.session.commit()
+        row = open_node["values"]
+        values["duration_ms"] = int((values["completed_at"] - row["started_at"]).total_seconds() * 1000)
+        row.update(values)
+        self._write_node(open_node, critical)
+    
+    def _write_node(self, open_node: Dict[str, Any], critical: bool = False):
+        # 생성 기록이 노드를 참조하므로 노드 행 먼저
+        self._emit(Node, open_node["values"], critical=critical)
+        for generation in open_node["generations"]:
+            self._emit(Generation, generation)
     
     def log_node_skip(self, node_name: str, node_type: str, reason: str):
         """노드 스킵 기록"""
@@ -141,17 +271,18 @@ class DatabaseLogger:
         
         self.node_execution_order += 1
         
-        node = create_node(
-            self.session,
-            workflow_id=self.current_workflow_id,
-            node_name=node_name,
-            node_type=node_type,
-            execution_order=self.node_execution_order,
-            status="skipped",
-            started_at=datetime.utcnow(),
-            completed_at=datetime.utcnow(),
-            output_data={"skip_reason": reason}
-        )
+        now = datetime.utcnow()
+        self._emit(Node, {
+            "id": str(uuid.uuid4()),
+            "workflow_id": self.current_workflow_id,
+            "node_name": node_name,
+            "node_type": node_type,
+            "execution_order": self.node_execution_order,
+            "status": "skipped",
+            "started_at": now,
+            "completed_at": now,
+            "output_data": {"skip_reason": reason}
+        })
     
     def log_generation(self, model_name: str, user_prompt: str, output: str,
                       node_id: Optional[str] = None,
@@ -162,35 +293,40 @@ class DatabaseLogger:
                       max_tokens: Optional[int] = None,
                       latency_ms: Optional[int] = None,
                       **kwargs) -> Generation:
-        """LLM 생성 기록"""
+        """LLM 생성 기록 (full 수준이 아니면 프롬프트/응답 본문은 저장하지 않음)"""
         if not self.current_workflow_id:
             raise ValueError("Workflow not started. Call start_workflow first.")
         
-        generation = create_generation(
-            self.session,
-            workflow_id=self.current_workflow_id,
-            node_id=node_id,
-            model_name=model_name,
-            model_provider=model_provider,
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            output=output,
-            parsed_output=parsed_output,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            latency_ms=latency_ms,
+        if not self._traced(TRACE_FULL):
+            system_prompt, user_prompt, output, parsed_output = None, "", "", None
+            kwargs.pop("full_prompt", None)
+        
+        values = {
+            "id": str(uuid.uuid4()),
+            "workflow_id": self.current_workflow_id,
+            "node_id": node_id,
+            "model_name": model_name,
+            "model_provider": model_provider,
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "output": output,
+            "parsed_output": parsed_output,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "latency_ms": latency_ms,
+            "created_at": datetime.utcnow(),
             **kwargs
-        )
+        }
+        if node_id in self._open_nodes:
+            self._open_nodes[node_id]["generations"].append(values)
+        else:
+            self._emit(Generation, values)
         
-        return generation
+        return Generation(**values)
     
     def complete_workflow(self, state: TripState, status: str = "completed"):
         """워크플로우 완료 기록"""
-        if not self.current_workflow_id:
-            return
-        
-        workflow = self.session.query(Workflow).filter_by(id=self.current_workflow_id).first()
-        if not workflow:
+        if not self.current_workflow_id or not self._traced(TRACE_WORKFLOW):
             return
         
         # 최종 일정 저장
@@ -198,29 +334,73 @@ class DatabaseLogger:
         if state.get("final_itinerary"):
             final_itinerary = [item.model_dump() for item in state["final_itinerary"]]
         
-        workflow.status = status
-        workflow.completed_at = datetime.utcnow()
-        workflow.final_itinerary = final_itinerary
+        now = datetime.utcnow()
+        values = {
+            "status": status,
+            "completed_at": now,
+            "updated_at": now,
+            "final_itinerary": final_itinerary
+        }
+        if self._traced(TRACE_FULL):
+            values["final_state"] = self._serialize_state(state)  # 전체 state 스냅샷
         
         # 최종 state 업데이트
         if state.get("user_intent"):
-            workflow.user_intent = state["user_intent"].model_dump()
+            values["user_intent"] = state["user_intent"].model_dump()
         
-        self.session.commit()
+        self.writer.update(Workflow, self.current_workflow_id, values, critical=True)
     
     def fail_workflow(self, error_message: str):
         """워크플로우 실패 기록"""
         if not self.current_workflow_id:
             return
+        self.set_trace_level(TRACE_FULL)
         
-        workflow = self.session.query(Workflow).filter_by(id=self.current_workflow_id).first()
-        if not workflow:
-            return
-        
-        workflow.status = "failed"
-        workflow.completed_at = datetime.utcnow()
+        now = datetime.utcnow()
+        self.writer.update(Workflow, self.current_workflow_id, {
+            "status": "failed",
+            "completed_at": now,
+            "updated_at": now
+        }, critical=True)
+    
+    @staticmethod
+    def _apply_node(state: Dict[str, Any], data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """노드의 input_data/state_data 적용 (형식이 없는 예전 기록은 전체 state로 취급)"""
+        if not data:
+            return state
+        if data.get("format") == "patch":
+            return apply_patch(state, data["ops"])
+        if data.get("format") == "snapshot":
+            return dict(data["state"])
+        return dict(data)
+    
+    @classmethod
+    def _query_replay(cls, session, workflow_id: str, until_order: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """첫 노드부터 패치를 적용한 state (until_order 노드까지)"""
+        query = session.query(Node).filter(Node.workflow_id == workflow_id)
+        if until_order is not None:
+            query = query.filter(Node.execution_order <= until_order)
+        nodes = query.order_by(Node.execution_order).all()
+        if not nodes:
+            return None
         
-        self.session.commit()
+        state: Dict[str, Any] = {}
+        for node in nodes:
+            state = cls._apply_node(state, node.input_data)
+            state = cls._apply_node(state, node.state_data)
+        return state
+    
+    def get_node_state(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """노드 실행 직후의 전체 state 복원 (직렬화된 형태)"""
+        self.writer.flush()
+        return self._query_node_state(self.session, node_id)
+    
+    @classmethod
+    def _query_node_state(cls, session, node_id: str) -> Optional[Dict[str, Any]]:
+        node = session.query(Node).filter_by(id=node_id).first()
+        if not node:
+            return None
+        return cls._query_replay(session, node.workflow_id, node.execution_order)
     
     def _serialize_state(self, state: TripState) -> Dict[str, Any]:
         """TripState를 JSON 직렬화 가능한 딕셔너리로 변환"""
@@ -240,6 +420,9 @@ class DatabaseLogger:
             elif hasattr(value, 'model_dump'):
                 # Pydantic 모델
                 serialized[key] = value.model_dump()
+            elif isinstance(value, dict):
+                # 단계별 후보/선택 장소 등 중첩 딕셔너리
+                serialized[key] = self._serialize_state(value)
             else:
                 # 기타 (dict 등)
                 try:
@@ -264,8 +447,13 @@ class DatabaseLogger:
     
     def get_workflow_history(self, user_id: int, limit: int = 10):
         """사용자의 워크플로우 히스토리 조회"""
+        self.writer.flush()  # 큐에 남은 기록까지 포함해서 조회
+        return self._query_history(self.session, user_id, limit)
+    
+    @staticmethod
+    def _query_history(session, user_id: int, limit: int = 10):
         workflows = (
-            self.session.query(Workflow)
+            session.query(Workflow)
             .filter_by(user_id=user_id)
             .order_by(Workflow.created_at.desc())
             .limit(limit)
@@ -275,12 +463,65 @@ class DatabaseLogger:
     
     def get_workflow_details(self, workflow_id: str):
         """워크플로우 상세 정보 조회 (노드 포함)"""
-        workflow = self.session.query(Workflow).filter_by(id=workflow_id).first()
+        self.writer.flush()
+        return self._query_details(self.session, workflow_id)
+    
+    @staticmethod
+    def _query_details(session, workflow_id: str):
+        workflow = session.query(Workflow).filter_by(id=workflow_id).first()
         if not workflow:
             return None
         
+        # 세션 안에서 관계를 읽어 둠 (비동기 세션은 닫힌 뒤 지연 로딩 불가)
         return {
             "workflow": workflow,
-            "nodes": workflow.nodes,
-            "generations": workflow.generations
+            "nodes": list(workflow.nodes),
+            "generations": list(workflow.generations)
         }
+
+
+class AsyncDatabaseLogger(DatabaseLogger):
+    """이벤트 루프에서 쓰는 DatabaseLogger (요청 처리 경로용)
+
+    조회는 비동기 엔진(async_engine, 없으면 별도 스레드의 동기 세션)으로 하고 기록은 DatabaseLogger와 같은 writer 큐로 보내므로
+    이벤트 루프에서 동기 DB IO가 일어나지 않음. 노드가 호출하는 log_* 메서드는 메모리와 큐만 다루므로 그대로 사용
+    """
+    
+    def __init__(self, engine, async_engine=None, writer: Optional[DatabaseWriter] = None,
+                 trace_level: Optional[str] = None):
+        super().__init__(engine, writer=writer, trace_level=trace_level)
+        self.async_engine = async_engine
+    
+    async def _run(self, fn, *args):
+        return await run_session(fn, *args, async_engine=self.async_engine, engine=self.engine)
+    
+    async def aclose(self):
+        """끝나지 않은 노드를 running 상태로 기록 (동기 세션은 쓰지 않으므로 닫을 때 IO 없음)"""
+        self.close()
+    
+    async def aget_or_create_user(self, username: str, email: Optional[str] = None) -> User:
+        """사용자 가져오기 또는 생성"""
+        user = await self._run(self._query_user, username, email)
+        self.current_user_id = user.id
+        return user
+    
+    async def aresume_workflow(self, workflow_id: str, state: Optional[TripState] = None,
+                               user_id: Optional[int] = None):
+        """resume_workflow의 비동기 버전"""
+        await asyncio.to_thread(self.writer.flush)
+        self._resume(workflow_id, *await self._run(self._query_resume, workflow_id), state, user_id)
+    
+    async def aget_node_state(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """노드 실행 직후의 전체 state 복원 (직렬화된 형태)"""
+        await asyncio.to_thread(self.writer.flush)
+        return await self._run(self._query_node_state, node_id)
+    
+    async def aget_workflow_history(self, user_id: int, limit: int = 10):
+        """사용자의 워크플로우 히스토리 조회"""
+        await asyncio.to_thread(self.writer.flush)
+        return await self._run(self._query_history, user_id, limit)
+    
+    async def aget_workflow_details(self, workflow_id: str):
+        """워크플로우 상세 정보 조회 (노드 포함)"""
+        await asyncio.to_thread(self.writer.flush)
+        return await self._run(self._query_details, workflow_id)
@@ -0,0 +1,244 @@
+"""
+DB 로그 write-behind 큐
+DatabaseLogger의 insert/update(와 PlaceStore의 장소 행)를 프로세스 내 큐에 넣고 백그라운드 스레드가 모아서 적은 수의 트랜잭션으로 기록
+(노드 코드가 DB 왕복 시간만큼 이벤트 루프를 막지 않음). 기록은 동기 엔진으로 이벤트 루프와 분리된 스레드에서 실행
+
+- 큐 길이는 DB_LOG_QUEUE_MAX로 제한. 가득 차면 새 기록은 버림. DB_LOG_OVERFLOW=block이면 노드가 기록 전에
+  await backpressure()로 빈 자리를 잠시 기다림 (대기는 스레드에서 하므로 이벤트 루프는 막지 않음)
+- 워크플로우 행처럼 다른 기록이 참조하는 기록(critical)은 큐가 가득 차도 버리지 않음
+- 종료 시 flush()/close()로 남은 기록을 모두 기록 (프로세스 종료 시 atexit에서도 호출)
+"""
+import asyncio
+import atexit
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from database import get_session
+
+OVERFLOW_DROP = "drop"  # 새 기록을 버림 (노드 코드는 기다리지 않음)
+OVERFLOW_BLOCK = "block"  # backpressure()에서 최대 DB_LOG_BLOCK_TIMEOUT초 동안 빈 자리를 기다림 (그래도 가득 차면 버림)
+
+
+class WriteOp:
+    """큐에 들어가는 기록 하나 (insert: 새 행, update: id로 찾은 행의 컬럼 변경, merge: 없으면 insert 있으면 update)"""
+    __slots__ = ("kind", "model", "row_id", "values", "critical")
+
+    def __init__(self, kind: str, model, row_id: str, values: Dict[str, Any], critical: bool = False):
+        self.kind = kind
+        self.model = model
+        self.row_id = row_id
+        self.values = values
+        self.critical = critical
+
+
+class DatabaseWriter:
+    """DB 로그 기록 큐와 백그라운드 기록 스레드"""
+
+    def __init__(self, engine, background: Optional[bool] = None, max_queue: Optional[int] = None,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 overflow: Optional[str] = None, block_timeout: Optional[float] = None):
+        self.engine = engine
+        if background is None:
+            background = os.getenv("DB_LOG_ASYNC", "true").lower() != "false"
+        self.background = background
+        self.max_queue = max_queue or int(os.getenv("DB_LOG_QUEUE_MAX", "5000"))
+        self.batch_size = batch_size or int(os.getenv("DB_LOG_BATCH_SIZE", "200"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(
+            os.getenv("DB_LOG_FLUSH_INTERVAL", "0.5"))
+        self.overflow = (overflow or os.getenv("DB_LOG_OVERFLOW", OVERFLOW_DROP)).lower()
+        self.block_timeout = block_timeout if block_timeout is not None else float(
+            os.getenv("DB_LOG_BLOCK_TIMEOUT", "1.0"))
+
+        self._queue: Deque[WriteOp] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight = 0
+        self._flushing = 0
+        self._stopping = False
+        self._closed = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.waits = 0  # backpressure()로 빈 자리를 기다린 횟수
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def insert(self, model, values: Dict[str, Any], critical: bool = False) -> bool:
+        """새 행 기록 예약 (values에 id 포함)"""
+        return self._submit(WriteOp("insert", model, values["id"], values, critical))
+
+    def update(self, model, row_id: str, values: Dict[str, Any], critical: bool = False) -> bool:
+        """기존 행(같은 큐에 먼저 들어간 insert 포함) 컬럼 변경 예약"""
+        return self._submit(WriteOp("update", model, row_id, values, critical))
+
+    def merge(self, model, values: Dict[str, Any], critical: bool = False) -> bool:
+        """기본 키로 있으면 변경, 없으면 새 행 기록 예약 (여러 워커가 같은 행을 기록할 수 있는 경우)"""
+        return self._submit(WriteOp("merge", model, values["id"], values, critical))
+
+    def _submit(self, op: WriteOp) -> bool:
+        """큐에 추가 (버려지면 False). 백그라운드 기록을 쓰지 않거나 종료된 뒤에는 바로 기록"""
+        if not self.background or self._closed:
+            self.enqueued += 1
+            self._write([op])
+            return True
+
+        with self._cond:
+            # 이벤트 루프에서 호출되므로 여기서는 기다리지 않음 (block 정책의 대기는 backpressure())
+            if len(self._queue) >= self.max_queue and not op.critical:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    print(f"[DB WRITER] Queue full ({self.max_queue}), dropped {self.dropped} records")
+                return False
+
+            self._queue.append(op)
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-log-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return True
+
+    def _wait_for_room(self) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self._queue) < self.max_queue, timeout=self.block_timeout)
+
+    async def backpressure(self):
+        """block 정책에서 큐가 가득 찼으면 빈 자리가 생기거나 DB_LOG_BLOCK_TIMEOUT초가 지날 때까지 대기 (drop 정책은 바로 반환)"""
+        if self.overflow != OVERFLOW_BLOCK or not self.background or len(self._queue) < self.max_queue:
+            return
+        self.waits += 1
+        await asyncio.to_thread(self._wait_for_room)
+
+    def _run(self):
+        """큐가 batch_size만큼 차거나 flush_interval이 지나면 한 트랜잭션으로 기록"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                self._cond.wait_for(
+                    lambda: len(self._queue) >= self.batch_size or self._flushing or self._stopping,
+                    timeout=self.flush_interval
+                )
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+                # 빈 자리가 생겼으므로 backpressure()로 기다리는 쪽을 깨움
+                self._cond.notify_all()
+
+            try:
+                self._write(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _write(self, batch: List[WriteOp]):
+        session = get_session(self.engine)
+        try:
+            self._apply(session, batch)
+            session.commit()
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            session.rollback()
+            print(f"[DB WRITER ERROR] Batch of {len(batch)}: {e}")
+            # 문제가 있는 기록만 버리도록 한 건씩 다시 기록
+            for op in batch:
+                try:
+                    self._apply(session, [op])
+                    session.commit()
+                    self.written += 1
+                except Exception as op_error:
+                    session.rollback()
+                    self.failed += 1
+                    print(f"[DB WRITER ERROR] {op.kind} {op.model.__tablename__}/{op.row_id}: {op_error}")
+        finally:
+            session.close()
+
+    @staticmethod
+    def _apply(session, batch: List[WriteOp]):
+        """배치 적용 (같은 배치에서 insert된 행의 update는 insert 값에 합쳐 UPDATE 문을 생략)"""
+        pending = {}
+        for op in batch:
+            key = (op.model, op.row_id)
+            if op.kind == "insert":
+                row = op.model(**op.values)
+                session.add(row)
+                pending[key] = row
+            elif op.kind == "merge":
+                pending[key] = session.merge(op.model(**op.values))
+            elif key in pending:
+                for column, value in op.values.items():
+                    setattr(pending[key], column, value)
+            else:
+                session.query(op.model).filter_by(id=op.row_id).update(op.values, synchronize_session=False)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """큐에 남은 기록을 모두 기록할 때까지 대기 (timeout 안에 끝나면 True)"""
+        if not self.background or self._thread is None:
+            return True
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout=timeout)
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: Optional[float] = None):
+        """남은 기록을 기록하고 스레드 종료 (이후 기록은 바로 DB에 씀)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._closed = True
+
+    def to_dict(self) -> dict:
+        return {
+            "background": self.background,
+            "queued": len(self._queue),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "waits": self.waits,
+            "failed": self.failed,
+        }
+
+
+_writers: Dict[int, DatabaseWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_db_writer(engine) -> DatabaseWriter:
+    """엔진별 공용 기록 큐 (같은 엔진을 쓰는 로거는 큐 하나를 공유)"""
+    with _writers_lock:
+        writer = _writers.get(id(engine))
+        if writer is None or writer.engine is not engine:
+            writer = DatabaseWriter(engine)
+            _writers[id(engine)] = writer
+        return writer
+
+
+def shutdown_db_writers(timeout: Optional[float] = None):
+    """모든 기록 큐를 비우고 종료"""
+    timeout = timeout if timeout is not None else float(os.getenv("DB_LOG_SHUTDOWN_TIMEOUT", "10"))
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.close(timeout)
+        if len(writer):
+            print(f"[DB WRITER] {len(writer)} records not written before shutdown")
+
+
+atexit.register(shutdown_db_writers)
@@ -0,0 +1,63 @@
+"""
+워크플로우 이벤트 로그
+노드 진행 메시지를 타입이 있는 이벤트로 TripState에 보관. 최근 EVENT_LOG_MAX_EVENTS개만 유지하는 링 버퍼이며,
+각 이벤트의 seq를 커서로 사용해 클라이언트는 마지막으로 받은 seq 이후 이벤트만 조회
+"""
+import os
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# 이벤트 타입
+EVENT_PROGRESS = "progress"  # 노드 진행 상황
+EVENT_WARNING = "warning"  # 검색 결과 부족 등 (일정은 계속 진행)
+EVENT_QUESTION = "question"  # HIL 질문 (사용자 응답 대기)
+EVENT_ITINERARY = "itinerary"  # 생성된 일정 요약
+
+MAX_EVENTS = int(os.getenv("EVENT_LOG_MAX_EVENTS", "50"))
+
+# 현재 실행 중인 노드 이름 (log_context가 설정, 이벤트의 node 필드 기본값)
+current_event_node: ContextVar[Optional[str]] = ContextVar("current_event_node", default=None)
+
+
+def new_event_log() -> Dict[str, Any]:
+    """빈 이벤트 로그 ({"next_seq": 다음 이벤트 번호, "events": 최근 이벤트 목록})"""
+    return {"next_seq": 1, "events": []}
+
+
+def add_event(state: dict, message: str, event_type: str = EVENT_PROGRESS, node: Optional[str] = None,
+              data: Optional[dict] = None, max_events: Optional[int] = None) -> dict:
+    """이벤트 추가 (가장 오래된 이벤트부터 버림)"""
+    log = state.get("event_log") or new_event_log()
+    event = {
+        "seq": log["next_seq"],
+        "type": event_type,
+        "node": node or current_event_node.get(),
+        "message": message,
+        "data": data,
+        "ts": datetime.utcnow().isoformat(timespec="milliseconds"),
+    }
+    # 체크포인트에 저장된 이전 상태와 리스트를 공유하지 않도록 새 dict로 교체
+    state["event_log"] = {
+        "next_seq": event["seq"] + 1,
+        "events": (log["events"] + [event])[-(max_events or MAX_EVENTS):],
+    }
+    return event
+
+
+def last_seq(log: Optional[dict]) -> int:
+    """지금까지 발생한 마지막 이벤트 번호 (커서)"""
+    return (log or new_event_log())["next_seq"] - 1
+
+
+def events_since(log: Optional[dict], cursor: int = 0) -> Tuple[List[dict], int, bool]:
+    """cursor 이후 이벤트, 새 커서, 버퍼에서 밀려나 놓친 이벤트가 있는지 여부"""
+    log = log or new_event_log()
+    events = [event for event in log["events"] if event["seq"] > cursor]
+    oldest = log["events"][0]["seq"] if log["events"] else log["next_seq"]
+    return events, last_seq(log), cursor < oldest - 1
+
+
+def event_messages(log: Optional[dict]) -> List[str]:
+    """보관 중인 이벤트 메시지 목록 (기존 progress 응답 형식)"""
+    return [event["message"] for event in (log or new_event_log())["events"]]
@@ -9,6 +9,7 @@ from database import init_db
 from db_logger import DatabaseLogger
 from state import TripState
 from models import TimeSettings, UserIntent
+from events import new_event_log, add_event
 
 
 async def example_workflow_with_logging():
@@ -44,7 +45,7 @@ async def example_workflow_with_logging():
                 duration_hours=6
             ),
             "user_intent": None,
-            "progress_messages": [],
+            "event_log": new_event_log(),
             "needs_refinement": False,
             "user_activity_preference": None,
             "user_food_preference": None,
@@ -102,7 +103,7 @@ async def example_workflow_with_logging():
                 drinking_required=False
             )
             initial_state["parsed_location"] = "홍대"
-            initial_state["progress_messages"].append("✓ 입력 분석 완료: 홍대")
+            add_event(initial_state, "✓ 입력 분석 완료: 홍대")
             
             logger.log_node_complete(node.id, initial_state)
         
@@ -125,7 +126,7 @@ async def example_workflow_with_logging():
                     phone="02-1234-5678"
                 )
             ]
-            initial_state["progress_messages"].append("✓ 활동 장소 1개 발견")
+            add_event(initial_state, "✓ 활동 장소 1개 발견")
             
             logger.log_node_complete(
                 node.id, 
@@ -202,7 +203,7 @@ async def example_error_handling():
             "search_radius": 2000,
             "time_settings": None,
             "user_intent": None,
-            "progress_messages": [],
+            "event_log": new_event_log(),
             "needs_refinement": False,
             "user_activity_preference": None,
             "user_food_preference": None,
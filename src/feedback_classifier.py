@@ -0,0 +1,205 @@
+"""
+일정 수정 피드백 분류기
+"카페 바꿔줘", "완료" 같은 피드백을 키워드 사전 + 문자 n-gram 나이브 베이즈로 next_action에 매핑
+확신도가 낮은 입력만 LLM으로 넘김 (부정 표현이나 수정 대상이 여러 개인 입력은 항상 LLM)
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ACTIONS = ["refine_food", "refine_cafe", "refine_region", "complete"]
+
+# 카테고리 단어 (수정 대상)
+TARGET_TERMS: Dict[str, List[str]] = {
+    "refine_food": ["음식점", "식당", "밥집", "맛집", "음식", "식사", "메뉴", "레스토랑", "밥", "저녁", "점심"],
+    "refine_cafe": ["카페", "커피", "디저트", "베이커리"],
+    "refine_region": ["전체", "전부", "처음부터", "지역", "동네", "코스", "일정", "다", "모두"],
+}
+
+# 변경 요청 표현
+CHANGE_TERMS = ["바꿔", "바꾸", "변경", "다른", "다른곳", "딴", "별로", "싫", "교체", "다시", "말고", "새로"]
+
+# 완료 표현
+COMPLETE_TERMS = ["완료", "좋아", "좋네", "좋습니다", "좋아요", "괜찮", "마음에 들어", "마음에들어", "맘에 들어",
+                  "오케이", "ok", "okay", "확정", "그대로", "끝", "됐어", "충분", "굿", "최고", "감사"]
+
+# 부정 표현 ("안 좋아", "좋지 않아", "마음에 안 들어"). 완료 표현과 겹치므로 사전/모델로 판단하지 않음
+NEGATION_PATTERN = re.compile(r"(?:^|\s)안\s?(?:좋|괜찮|돼|되|들|맞|가|갈|해|할|마음|맘)|않|못|별로|아니")
+
+# 학습 데이터가 없을 때 사용하는 기본 예시
+SEED_EXAMPLES: List[Tuple[str, str]] = [
+    ("음식점 다른 곳", "refine_food"), ("식당 바꿔줘", "refine_food"), ("밥집 별로야", "refine_food"),
+    ("다른 메뉴 먹고 싶어", "refine_food"), ("맛집 다시 찾아줘", "refine_food"), ("저녁 다른 데로", "refine_food"),
+    ("카페 바꿔줘", "refine_cafe"), ("카페 다른 곳", "refine_cafe"), ("커피 말고 디저트 가게", "refine_cafe"),
+    ("카페 별로야", "refine_cafe"), ("다른 카페 추천해줘", "refine_cafe"),
+    ("전체 다시", "refine_region"), ("처음부터 다시 짜줘", "refine_region"), ("다른 지역으로", "refine_region"),
+    ("코스 전부 바꿔줘", "refine_region"), ("다 별로야", "refine_region"),
+    ("완료", "complete"), ("좋아요", "complete"), ("마음에 들어", "complete"), ("이대로 확정", "complete"),
+    ("괜찮네", "complete"), ("오케이", "complete"), ("좋아 고마워", "complete"), ("그대로 갈게", "complete"),
+]
+
+_ACTION_PATTERN = re.compile(r"(refine_food|refine_cafe|refine_region|complete)")
+
+
+def parse_action(output: str) -> Optional[str]:
+    """LLM 출력(예: "ACTION: refine_cafe")에서 action 코드 추출"""
+    match = _ACTION_PATTERN.search(output or "")
+    return match.group(1) if match else None
+
+
+class FeedbackClassifier:
+    """키워드 사전 + 문자 n-gram 나이브 베이즈 분류기
+
+    classify()는 (action, 확신도)를 반환합니다. 확신도가 min_confidence 미만이면 LLM 판단을 권장합니다.
+    """
+
+    MODEL_ONLY_DISCOUNT = 0.8
+
+    def __init__(self, min_confidence: float = 0.75, ngram_range: Tuple[int, int] = (1, 3), alpha: float = 0.5):
+        self.min_confidence = min_confidence
+        self.ngram_range = ngram_range
+        self.alpha = alpha
+        self.training_size = 0
+        self._class_counts: Counter = Counter()
+        self._ngram_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._ngram_totals: Counter = Counter()
+        self._vocabulary = set()
+        self.fit(SEED_EXAMPLES)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _ngrams(self, text: str) -> List[str]:
+        text = f" {self._normalize(text)} "
+        low, high = self.ngram_range
+        return [text[i:i + n] for n in range(low, high + 1) for i in range(len(text) - n + 1)]
+
+    def fit(self, examples: Iterable[Tuple[str, str]]):
+        """(피드백, action) 예시 추가 학습"""
+        for text, action in examples:
+            if action not in ACTIONS or not text:
+                continue
+            self._class_counts[action] += 1
+            for gram in self._ngrams(text):
+                self._ngram_counts[action][gram] += 1
+                self._ngram_totals[action] += 1
+                self._vocabulary.add(gram)
+            self.training_size += 1
+
+    @staticmethod
+    def _query_examples(session, limit: int) -> List[Tuple[str, str]]:
+        from database import FeedbackLabel
+
+        rows = (
+            session.query(FeedbackLabel.feedback, FeedbackLabel.action)
+            .order_by(FeedbackLabel.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+        return [(feedback, action) for feedback, action in rows]
+
+    def train_from_db(self, engine, limit: int = 5000) -> int:
+        """feedback_labels 테이블의 과거 LLM 분류 결과로 학습. 학습한 예시 수 반환"""
+        from database import get_session
+
+        session = get_session(engine)
+        try:
+            examples = self._query_examples(session, limit)
+        finally:
+            session.close()
+        self.fit(examples)
+        return len(examples)
+
+    async def atrain_from_db(self, engine=None, async_engine=None, limit: int = 5000) -> int:
+        """train_from_db의 비동기 버전 (조회는 이벤트 루프 밖에서, 학습은 조회가 끝난 뒤 한 번에)"""
+        from database import run_session
+
+        examples = await run_session(self._query_examples, limit, async_engine=async_engine, engine=engine)
+        self.fit(examples)
+        return len(examples)
+
+    @staticmethod
+    def record_label(engine, feedback: str, action: str, workflow_id: Optional[str] = None, source: str = "llm"):
+        """LLM이 판단한 피드백 분류 결과를 학습 데이터로 기록 (기록 큐를 거침, 추적 수준과 무관)"""
+        from database import FeedbackLabel
+        from db_writer import get_db_writer
+        import uuid
+
+        get_db_writer(engine).insert(FeedbackLabel, {
+            "id": str(uuid.uuid4()),
+            "workflow_id": workflow_id,
+            "feedback": feedback,
+            "action": action,
+            "source": source,
+        })
+
+    def _targets(self, text: str) -> List[str]:
+        compact = self._normalize(text).replace(" ", "")
+        return [action for action, terms in TARGET_TERMS.items()
+                if any(term in compact for term in terms if len(term) > 1)]
+
+    def _is_negated(self, text: str) -> bool:
+        return NEGATION_PATTERN.search(self._normalize(text)) is not None
+
+    def _lexicon_vote(self, text: str) -> Optional[str]:
+        """키워드 사전으로 판단 가능한 경우 action 반환"""
+        normalized = self._normalize(text)
+        compact = normalized.replace(" ", "")
+        has_change = any(term in compact for term in CHANGE_TERMS)
+        targets = self._targets(text)
+
+        if has_change:
+            if len(targets) == 1:
+                return targets[0]
+            if not targets and ("다시" in compact or normalized in ("다", "전부")):
+                return "refine_region"
+            return None
+
+        if self._is_negated(text):
+            return None
+        if not targets and any(term in normalized or term in compact for term in COMPLETE_TERMS):
+            return "complete"
+        return None
+
+    def _predict_proba(self, text: str) -> Dict[str, float]:
+        total_docs = sum(self._class_counts.values())
+        vocab_size = len(self._vocabulary) or 1
+        grams = self._ngrams(text)
+
+        log_probs = {}
+        for action in ACTIONS:
+            prior = (self._class_counts[action] + 1) / (total_docs + len(ACTIONS))
+            score = math.log(prior)
+            denominator = self._ngram_totals[action] + self.alpha * vocab_size
+            counts = self._ngram_counts[action]
+            for gram in grams:
+                score += math.log((counts[gram] + self.alpha) / denominator)
+            log_probs[action] = score
+
+        peak = max(log_probs.values())
+        exps = {action: math.exp(score - peak) for action, score in log_probs.items()}
+        norm = sum(exps.values())
+        return {action: value / norm for action, value in exps.items()}
+
+    def classify(self, text: str) -> Tuple[str, float]:
+        """피드백 분류 -> (action, 확신도)"""
+        probabilities = self._predict_proba(text)
+        model_action = max(probabilities, key=probabilities.get)
+        lexicon_action = self._lexicon_vote(text)
+
+        if lexicon_action:
+            # 사전 판단과 모델 판단이 일치하면 확신도를 높임
+            confidence = max(0.9, probabilities[lexicon_action]) if lexicon_action == model_action else 0.8
+            return lexicon_action, round(confidence, 3)
+
+        if self._is_negated(text) or len(self._targets(text)) > 1:
+            # "안 좋아"가 완료로, "식당이랑 카페"가 한쪽만 수정으로 분류되지 않도록 LLM에 맡김
+            return model_action, 0.0
+
+        # 사전 근거 없이 n-gram 모델만으로 판단한 경우는 보수적으로 할인
+        return model_action, round(probabilities[model_action] * self.MODEL_ONLY_DISCOUNT, 3)
+
+    def is_confident(self, confidence: float) -> bool:
+        return confidence >= self.min_confidence
@@ -0,0 +1,96 @@
+"""
+서울 지명 사전 (gazetteer)
+자치구/동네/역 이름과 별칭(홍대/홍익대/홍대입구)을 대표 지역으로 묶고, 미리 계산된 중심 좌표를 제공
+(경계 정보는 없음. 자치구는 주요 자치구만 수록되어 있어 사전에 없는 지역은 Kakao 검색으로 위치 확인)
+Kakao 키워드 검색으로 지역 위치를 찾지 않고 바로 좌표 기반 카테고리 검색을 할 수 있게 함
+"""
+import json
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "data", "seoul_gazetteer.json")
+
+# 별칭 뒤에 붙어도 같은 지역으로 보는 표현 ("홍대 근처", "강남역 쪽")
+_TRAILING_WORDS = ["근처", "주변", "부근", "일대", "쪽", "앞", "에서", "에"]
+
+
+class Region(NamedTuple):
+    """지명 사전 항목"""
+    name: str  # 대표 이름 (parsed_location으로 사용)
+    kind: str  # district, neighborhood
+    district: Optional[str]  # 소속 자치구
+    x: float  # 중심 경도
+    y: float  # 중심 위도
+
+
+def _normalize(text: str) -> str:
+    return "".join(text.lower().split())
+
+
+class Gazetteer:
+    """별칭 -> Region 해시 조회 + 긴 별칭 우선 부분 문자열 탐색"""
+
+    def __init__(self, regions: List[Region], aliases: Dict[str, str]):
+        self.regions: Dict[str, Region] = {region.name: region for region in regions}
+        # 정규화된 별칭 -> 대표 이름
+        self._aliases: Dict[str, str] = {}
+        for alias, name in aliases.items():
+            self._aliases[_normalize(alias)] = name
+        # 텍스트 탐색용 별칭 길이 목록 (긴 것부터)
+        self._alias_lengths = sorted({len(alias) for alias in self._aliases}, reverse=True)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH) -> "Gazetteer":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        regions = []
+        aliases = {}
+        for item in data["regions"]:
+            x, y = item["centroid"]
+            region = Region(item["name"], item["type"], item.get("district"), x, y)
+            regions.append(region)
+            aliases[region.name] = region.name
+            for alias in item.get("aliases", []):
+                aliases[alias] = region.name
+        return cls(regions, aliases)
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def aliases(self) -> Iterator[Tuple[str, str]]:
+        """(별칭, 대표 이름) 목록"""
+        return iter(self._aliases.items())
+
+    def lookup(self, name: Optional[str]) -> Optional[Region]:
+        """지역명 조회 (별칭, 공백/대소문자 차이, "근처" 같은 꼬리말 허용)"""
+        if not name:
+            return None
+        key = _normalize(name)
+        if key in self._aliases:
+            return self.regions[self._aliases[key]]
+        for word in _TRAILING_WORDS:
+            if key.endswith(word) and key[:-len(word)] in self._aliases:
+                return self.regions[self._aliases[key[:-len(word)]]]
+        return None
+
+    def find_in_text(self, text: str) -> Optional[Region]:
+        """문장 안에서 가장 긴 별칭으로 지역 찾기 ("강남역 근처 맛집" -> 강남)"""
+        compact = _normalize(text)
+        for length in self._alias_lengths:
+            for start in range(len(compact) - length + 1):
+                name = self._aliases.get(compact[start:start + length])
+                if name:
+                    return self.regions[name]
+        return None
+
+
+_default_gazetteer: Optional[Gazetteer] = None
+
+
+def get_gazetteer() -> Gazetteer:
+    """기본 지명 사전 (프로세스당 한 번 로드)"""
+    global _default_gazetteer
+    if _default_gazetteer is None:
+        _default_gazetteer = Gazetteer.load()
+    return _default_gazetteer
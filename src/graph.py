@@ -1,9 +1,9 @@
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from state import TripState
 from nodes import TripNodes
 
-def build_trip_graph(nodes: TripNodes, memory: MemorySaver) -> StateGraph:
+def build_trip_graph(nodes: TripNodes, memory: BaseCheckpointSaver) -> StateGraph:
     """LangGraph 워크플로우 구성"""
     workflow = StateGraph(TripState)
 
@@ -47,8 +47,24 @@ def build_trip_graph(nodes: TripNodes, memory: MemorySaver) -> StateGraph:
     )
 
     workflow.add_edge("request_food_preference", "discover_dining_places")
-    workflow.add_edge("discover_dining_places", "discover_cafe_places")
-    workflow.add_edge("discover_cafe_places", "discover_drinking_places")
+
+    # 식사/카페만 수정하는 경우 뒤 단계 검색을 건너뛰고 바로 일정 재최적화
+    workflow.add_conditional_edges(
+        "discover_dining_places",
+        nodes.route_after_dining,
+        {
+            "regenerate": "generate_itinerary",
+            "continue": "discover_cafe_places"
+        }
+    )
+    workflow.add_conditional_edges(
+        "discover_cafe_places",
+        nodes.route_after_cafe,
+        {
+            "regenerate": "generate_itinerary",
+            "continue": "discover_drinking_places"
+        }
+    )
     workflow.add_edge("discover_drinking_places", "generate_itinerary")
 
     workflow.add_edge("generate_itinerary", "request_refinement_feedback")
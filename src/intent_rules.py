@@ -0,0 +1,242 @@
+"""
+규칙 기반 의도 분석 (LLM 앞단 fast path)
+"홍대에서 보드게임하고 한식 먹을래" 같은 정형화된 입력은 사전(지역/활동/음식/카페/술집/부정 표현)만으로
+UserIntent를 만들고, 확신이 낮은 입력만 LLM으로 넘김
+"""
+from typing import Dict, List, Optional, Tuple
+
+from gazetteer import get_gazetteer
+from models import UserIntent
+
+
+# 지역 별칭 -> 대표 지역명 (지명 사전 data/seoul_gazetteer.json에서 로드)
+LOCATION_ALIASES: Dict[str, str] = dict(get_gazetteer().aliases())
+
+# 구체적 활동 (activity_preference)
+ACTIVITY_TERMS = [
+    "보드게임", "방탈출", "전시회", "전시", "미술관", "박물관", "영화", "볼링", "코인노래방", "노래방",
+    "공방", "원데이클래스", "산책", "쇼핑", "클라이밍", "VR", "오락실", "만화카페", "당구", "공연",
+    "연극", "뮤지컬", "사진관", "인생네컷", "한강", "자전거", "놀이공원", "아쿠아리움", "팝업스토어",
+]
+
+# 음식 종류 (food_preference)
+FOOD_TERMS = [
+    "한식", "일식", "중식", "양식", "파스타", "피자", "고기", "삼겹살", "곱창", "막창", "초밥", "스시",
+    "라멘", "돈까스", "버거", "햄버거", "타코", "멕시칸", "태국음식", "쌀국수", "베트남음식", "인도음식",
+    "커리", "카레", "떡볶이", "분식", "치킨", "족발", "보쌈", "냉면", "국밥", "샤브샤브", "마라탕",
+    "훠궈", "스테이크", "오마카세", "우동", "소바", "회", "해산물", "양꼬치",
+]
+
+# 카페 선호 (cafe_preference)
+CAFE_TERMS = ["디저트카페", "베이커리", "브런치카페", "루프탑카페", "애견카페", "북카페", "디저트", "케이크", "빵집"]
+
+# 술집 종류 (drinking_preference)
+DRINKING_TERMS = [
+    "이자카야", "칵테일바", "와인바", "루프탑바", "위스키바", "포차", "수제맥주", "맥주", "펍",
+    "막걸리", "전통주", "하이볼", "호프",
+]
+
+# 카테고리 자체를 가리키는 명사 (부정 표현 판단용)
+CATEGORY_NOUNS: Dict[str, List[str]] = {
+    "activity": ["놀거리", "활동", "액티비티"],
+    "dining": ["밥", "식사", "음식", "맛집", "저녁", "점심"],
+    "cafe": ["카페", "커피"],
+    "drinking": ["술집", "술"],
+}
+
+# 분위기/조건 키워드 (바로 뒤에 오는 카테고리의 keywords로 붙임)
+MOOD_KEYWORDS = [
+    "조용한", "분위기좋은", "분위기있는", "감성", "감성적인", "힙한", "가성비", "노포", "뷰좋은",
+    "로맨틱한", "이색적인", "활동적인", "아늑한", "예쁜", "유명한", "핫한", "저렴한", "고급스러운",
+]
+
+# 카테고리 뒤에 오면 "필요 없음"을 뜻하는 표현
+NEGATIONS = ["안", "말고", "빼고", "제외", "제외하고", "필요없어", "필요없고", "없어도", "생략", "패스",
+             "싫어", "싫고", "됐어", "먹었어", "먹었고", "못", "안가", "안갈래", "안마셔", "안마실래"]
+
+# 어절 끝에 붙는 조사/어미 (사전 단어 뒤에 남아도 되는 부분)
+SUFFIXES = [
+    "", "에서", "에", "은", "는", "이", "가", "을", "를", "도", "랑", "이랑", "하고", "이나", "나", "로",
+    "으로", "까지", "부터", "쪽", "쪽에서", "근처", "근처에서", "먹고", "먹을래", "하고싶어", "할래",
+    "가고", "갈래", "보고", "볼래", "마시고", "마실래", "집", "맛집", "카페", "역",
+]
+
+# 의미 없는 어절 (있어도 확신도를 깎지 않음)
+FILLERS = {
+    "먹을래", "먹고", "먹고싶어", "먹고싶다", "하고", "하고싶어", "할래", "갈래", "가고", "가고싶어", "싶어",
+    "놀래", "놀고", "놀고싶어", "마실래", "마시고", "보고", "볼래", "해줘", "짜줘", "추천", "추천해줘",
+    "데이트", "코스", "일정", "오늘", "내일", "주말", "같이", "그리고", "다음에", "그다음", "가서", "좀",
+    "근처", "주변", "에서", "여행", "놀러", "가자", "하자", "먹자", "마시자", "싶다", "갈거야", "할거야",
+    "맛있는", "괜찮은", "좋은", "곳", "데", "거",
+}
+
+
+class IntentRuleParser:
+    """사전 기반 의도 파서
+
+    parse()는 (UserIntent 또는 None, 확신도)를 반환합니다.
+    해석하지 못한 어절이 많거나, 지역이 없거나 여러 개거나, 구체 항목에 부정 표현이 붙으면 확신도가 낮아집니다.
+    """
+
+    def __init__(self, min_confidence: float = 0.8):
+        self.min_confidence = min_confidence
+        # 긴 단어 우선 매칭 (홍대입구 > 홍대)
+        self._terms: List[Tuple[str, str, str]] = []  # (단어, 종류, 값)
+        for alias, name in LOCATION_ALIASES.items():
+            self._terms.append((alias, "location", name))
+        for term in ACTIVITY_TERMS:
+            self._terms.append((term, "activity", term))
+        for term in FOOD_TERMS:
+            self._terms.append((term, "dining", term))
+        for term in CAFE_TERMS:
+            self._terms.append((term, "cafe", term))
+        for term in DRINKING_TERMS:
+            self._terms.append((term, "drinking", term))
+        for category, nouns in CATEGORY_NOUNS.items():
+            for noun in nouns:
+                self._terms.append((noun, f"{category}_noun", category))
+        for keyword in MOOD_KEYWORDS:
+            self._terms.append((keyword, "mood", keyword))
+        self._terms.sort(key=lambda t: len(t[0]), reverse=True)
+        self._suffixes = set(SUFFIXES)
+        self._negations = set(NEGATIONS)
+
+    def _match_token(self, token: str) -> Optional[Tuple[str, str]]:
+        """어절 하나를 (종류, 값)으로 해석. 사전 단어 + 조사/어미 형태만 인정"""
+        for term, kind, value in self._terms:
+            if token.startswith(term) and token[len(term):] in self._suffixes:
+                return kind, value
+        return None
+
+    def _is_negation(self, token: str) -> bool:
+        return token in self._negations or any(token.startswith(n) for n in ("안", "말고", "빼고", "제외"))
+
+    def _negated(self, following: List[str]) -> bool:
+        """다음 사전 단어가 나오기 전까지의 어절에 부정 표현이 있는지"""
+        for token in following:
+            # 사전 단어 우선 ("안국역"은 부정 표현이 아니라 지역)
+            if self._match_token(token) is not None:
+                return False
+            if self._is_negation(token):
+                return True
+        return False
+
+    def parse(self, text: str) -> Tuple[Optional[UserIntent], float]:
+        tokens = [t for t in text.replace(",", " ").replace(".", " ").split() if t]
+        if not tokens:
+            return None, 0.0
+
+        locations = set()
+        preferences: Dict[str, List[str]] = {"activity": [], "dining": [], "cafe": [], "drinking": []}
+        keywords: Dict[str, List[str]] = {"activity": [], "dining": [], "cafe": [], "drinking": []}
+        excluded = set()
+        pending_moods: List[str] = []
+        unknown = 0
+        penalty = 0.0
+
+        for i, token in enumerate(tokens):
+            matched = self._match_token(token)
+            following = tokens[i + 1:i + 3]
+
+            if matched is None:
+                if token in FILLERS or self._is_negation(token):
+                    continue
+                unknown += 1
+                continue
+
+            kind, value = matched
+            negated = self._negated(following)
+
+            if kind == "location":
+                locations.add(value)
+            elif kind == "mood":
+                pending_moods.append(value)
+            elif kind.endswith("_noun"):
+                if negated:
+                    excluded.add(value)
+                else:
+                    keywords[value].extend(pending_moods)
+                pending_moods = []
+            else:
+                if negated:
+                    # "한식 말고" 같은 세부 조건 부정은 규칙으로 안전하게 표현할 수 없음
+                    penalty += 0.5
+                preferences[kind].append(value)
+                keywords[kind].extend(pending_moods)
+                pending_moods = []
+
+        if len(locations) != 1:
+            return None, 0.0
+
+        # 대상 없이 남은 분위기 키워드는 해석 실패로 취급
+        unknown += len(pending_moods)
+        for category, prefs in preferences.items():
+            if len(prefs) > 1:
+                penalty += 0.1 * (len(prefs) - 1)
+            if category in excluded and prefs:
+                penalty += 0.5
+
+        confidence = max(0.0, 1.0 - unknown / len(tokens) - penalty)
+
+        def first(items):
+            return items[0] if items else None
+
+        intent = UserIntent(
+            location=next(iter(locations)),
+            activity_required="activity" not in excluded,
+            activity_preference=first(preferences["activity"]),
+            activity_keywords=keywords["activity"],
+            dining_required="dining" not in excluded,
+            food_preference=first(preferences["dining"]),
+            food_keywords=keywords["dining"],
+            cafe_required="cafe" not in excluded,
+            cafe_preference=first(preferences["cafe"]),
+            cafe_keywords=keywords["cafe"],
+            drinking_required="drinking" not in excluded,
+            drinking_preference=first(preferences["drinking"]),
+            drinking_keywords=keywords["drinking"],
+        )
+        return intent, round(confidence, 3)
+
+    def try_parse(self, text: str) -> Tuple[Optional[UserIntent], float]:
+        """확신도가 기준 이상일 때만 UserIntent 반환"""
+        intent, confidence = self.parse(text)
+        if intent is None or confidence < self.min_confidence:
+            return None, confidence
+        return intent, confidence
+
+
+class IntentFastPathStats:
+    """규칙 기반 분석 적중률 및 절약 시간 추정 (프로세스 단위)"""
+
+    def __init__(self, default_llm_latency_ms: int = 2000):
+        self.hits = 0
+        self.misses = 0
+        self.total_saved_ms = 0
+        # 최근 LLM 의도 분석 지연 시간의 지수 이동 평균 (적중 시 절약 시간 추정치)
+        self.avg_llm_latency_ms = float(default_llm_latency_ms)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def record_hit(self, rule_latency_ms: float) -> int:
+        """적중 기록 후 이번 요청에서 절약한 시간(ms) 반환"""
+        self.hits += 1
+        saved = max(0, int(self.avg_llm_latency_ms - rule_latency_ms))
+        self.total_saved_ms += saved
+        return saved
+
+    def record_miss(self, llm_latency_ms: float):
+        self.misses += 1
+        self.avg_llm_latency_ms = 0.8 * self.avg_llm_latency_ms + 0.2 * llm_latency_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "total_saved_ms": self.total_saved_ms,
+            "avg_llm_latency_ms": int(self.avg_llm_latency_ms),
+        }
@@ -0,0 +1,105 @@
+"""
+스트리밍 LLM 출력용 점진적 JSON 파서
+의도 분석 JSON이 전부 생성되기 전에 완성된 최상위 필드(예: location)를 먼저 꺼내
+후속 검색을 앞당겨 시작할 수 있게 함
+"""
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+
+class IncrementalJSONParser:
+    """최상위 객체의 필드가 완성될 때마다 (key, value)를 내보내는 관대한 파서
+
+    - 첫 '{' 이전의 텍스트(설명, ```json 코드 블록 표시 등)는 무시
+    - 문자열 안의 괄호/쉼표와 이스케이프 처리
+    - 파싱할 수 없는 필드는 건너뜀 (최종 파싱은 호출 측에서 전체 응답으로 다시 수행)
+    """
+
+    # JSON 대신 파이썬 리터럴을 내는 모델 대비
+    _LITERAL_FIXES = [(re.compile(r"\bTrue\b"), "true"),
+                      (re.compile(r"\bFalse\b"), "false"),
+                      (re.compile(r"\bNone\b"), "null")]
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member: List[str] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """청크를 입력하고 이번에 완성된 필드 목록 반환"""
+        completed = []
+
+        for ch in chunk:
+            if self.done:
+                break
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._member.append(ch)
+            elif ch in "{[":
+                self._depth += 1
+                self._member.append(ch)
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._finish_member())
+                    self.done = True
+                else:
+                    self._member.append(ch)
+            elif ch == "," and self._depth == 1:
+                completed.extend(self._finish_member())
+            else:
+                self._member.append(ch)
+
+        return completed
+
+    def _finish_member(self) -> List[Tuple[str, Any]]:
+        """버퍼에 쌓인 "key": value 하나를 파싱"""
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return []
+
+        parsed = self._loads_member(text)
+        if not parsed:
+            return []
+
+        key, value = next(iter(parsed.items()))
+        self.fields[key] = value
+        return [(key, value)]
+
+    @classmethod
+    def _loads_member(cls, text: str):
+        try:
+            return json.loads("{" + text + "}")
+        except ValueError:
+            pass
+
+        fixed = text
+        for pattern, replacement in cls._LITERAL_FIXES:
+            fixed = pattern.sub(replacement, fixed)
+        try:
+            return json.loads("{" + fixed + "}")
+        except ValueError:
+            return None
@@ -1,6 +1,7 @@
 import httpx
 from typing import List, Optional
 from models import Location
+from taxonomy import get_taxonomy
 import os
 from dotenv import load_dotenv
 
@@ -27,8 +28,10 @@ class KakaoMapClient:
         print(f"📋 Authorization Header: KakaoAK {self.api_key[:10]}...")
 
     def _parse_location(self, doc: dict) -> Location:
-        """카카오맵 API 응답을 Location 객체로 변환"""
+        """카카오맵 API 응답을 Location 객체로 변환 (카테고리 경로는 분류 트리에 인턴)"""
+        get_taxonomy().intern(doc["category_name"])
         return Location(
+            id=doc.get("id"),
             name=doc["place_name"],
             category=doc["category_name"],
             address=doc["address_name"],
@@ -43,9 +46,11 @@ class KakaoMapClient:
             self,
             location_name: str,
             radius: int = 2000,
-            size: int = 10
+            size: int = 10,
+            x: Optional[float] = None,
+            y: Optional[float] = None
     ) -> List[Location]:
-        """활동 장소 검색"""
+        """활동 장소 검색 (중심 좌표가 주어지면 반경 내 결과만, 거리 포함)"""
         keywords = [f"{location_name} 가볼만한곳", f"{location_name} 명소"]
 
         all_results = []
@@ -57,6 +62,8 @@ class KakaoMapClient:
                     "sort": "accuracy",
                     "category_group_code": "AT4"  # 관광명소
                 }
+                if x is not None and y is not None:
+                    params.update({"x": x, "y": y, "radius": radius})
 
                 try:
                     response = await client.get(
@@ -83,12 +90,41 @@ class KakaoMapClient:
 
         return unique_results[:size]
 
+    async def find_activity_places_near(
+            self,
+            x: float,
+            y: float,
+            radius: int = 2000,
+            size: int = 15
+    ) -> List[Location]:
+        """좌표 주변 활동 장소 검색 (관광명소 + 문화시설 카테고리, 거리순)"""
+        all_results = []
+        for category_code in ["AT4", "CT1"]:  # 관광명소, 문화시설
+            try:
+                all_results.extend(await self.search_by_category(category_code, x, y, radius, size))
+            except Exception as e:
+                print(f"검색 실패 ({category_code}): {e}")
+
+        seen = set()
+        unique_results = []
+        for loc in sorted(all_results, key=lambda l: l.distance if l.distance is not None else float("inf")):
+            if loc.name not in seen:
+                seen.add(loc.name)
+                unique_results.append(loc)
+
+        return unique_results
+
     async def find_specific_place(self, place_name: str) -> Optional[Location]:
         """특정 장소 하나 검색"""
+        places = await self.search_places(place_name, size=1)
+        return places[0] if places else None
+
+    async def search_places(self, query: str, size: int = 5) -> List[Location]:
+        """장소명 키워드 검색 (정확도순, 자동완성 인덱스에 없는 이름 조회용)"""
         async with httpx.AsyncClient() as client:
             params = {
-                "query": place_name,
-                "size": 1,
+                "query": query,
+                "size": size,
                 "sort": "accuracy"
             }
             response = await client.get(
@@ -99,11 +135,7 @@ class KakaoMapClient:
             response.raise_for_status()
             data = response.json()
 
-            if not data.get("documents"):
-                return None
-
-            doc = data["documents"][0]
-            return self._parse_location(doc)
+            return [self._parse_location(doc) for doc in data.get("documents", [])]
 
     async def search_by_category(
             self,
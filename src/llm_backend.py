@@ -0,0 +1,328 @@
+"""
+LLM 백엔드 풀
+여러 Ollama 엔드포인트에 요청을 분산(least outstanding requests)하고,
+엔드포인트별 동시 실행 수(OLLAMA_NUM_PARALLEL)를 넘는 요청은 우선순위 대기열에서 대기시킴
+시작 시 모델을 미리 로드하고 keep_alive / 주기적 keep-warm 요청으로 메모리에 상주시킴
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Union
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# 우선순위 (낮을수록 먼저 실행)
+PRIORITY_INTERACTIVE = 0  # 사용자가 응답을 기다리는 짧은 호출 (피드백 분류 등)
+PRIORITY_NORMAL = 5       # 일반 노드 호출 (의도 분석 등)
+PRIORITY_BULK = 10        # 지연돼도 괜찮은 호출 (키워드 확장 등)
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+
+
+def parse_keep_alive(value: Optional[str]) -> Optional[Union[int, str]]:
+    """OLLAMA_KEEP_ALIVE 값 변환 ("30m" 같은 기간 문자열은 그대로, "-1"/"0" 같은 숫자는 초 단위 정수)"""
+    if value is None or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class LLMEndpoint:
+    """단일 Ollama 엔드포인트 (동시 실행 수 제한 + 우선순위 대기열)"""
+
+    def __init__(self, base_url: str, max_concurrency: int = 4, name: Optional[str] = None):
+        self.base_url = base_url
+        self.name = name or base_url
+        self.max_concurrency = max(1, max_concurrency)
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self._waiters: List[tuple] = []  # (priority, seq, future)
+        self._seq = itertools.count()
+        self._models: Dict[tuple, object] = {}
+        # 메모리에 올라가 있다고 판단되는 모델 -> 마지막 사용/로드 시각
+        self.loaded_models: Dict[str, float] = {}
+        self.last_warm_error: Optional[str] = None
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @property
+    def outstanding(self) -> int:
+        """실행 중 + 대기 중 요청 수 (라우팅 기준)"""
+        return self.active + self.queued
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL):
+        """실행 슬롯 획득 (가득 찼으면 우선순위 순서로 대기)"""
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소되면 다음 대기자에게 양보
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """실행 슬롯 반환 (대기자가 있으면 그대로 넘겨줌)"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active = max(0, self.active - 1)
+
+    def get_model(self, model: str, **options):
+        """모델/옵션 조합별 채팅 모델 (재사용)"""
+        key = (model, tuple(sorted(options.items())))
+        if key not in self._models:
+            self._models[key] = self._create_model(model, **options)
+        return self._models[key]
+
+    def _create_model(self, model: str, **options):
+        from langchain_community.chat_models import ChatOllama
+        return ChatOllama(model=model, base_url=self.base_url, **options)
+
+    def mark_loaded(self, model: str):
+        self.loaded_models[model] = time.time()
+
+    async def preload(self, model: str, keep_alive: Optional[Union[int, str]] = None, timeout: float = 120.0) -> bool:
+        """모델을 메모리에 로드 (프롬프트 없는 /api/generate 요청은 로드만 수행)"""
+        import httpx
+
+        payload = {"model": model}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.post(f"{self.base_url}/api/generate", json=payload)
+                response.raise_for_status()
+        except Exception as e:
+            self.loaded_models.pop(model, None)
+            self.last_warm_error = f"{model}: {e}"
+            return False
+
+        self.mark_loaded(model)
+        self.last_warm_error = None
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queued": self.queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "loaded_models": sorted(self.loaded_models),
+            "last_warm_error": self.last_warm_error,
+        }
+
+
+class FakeChatModel:
+    """테스트용 채팅 모델 (응답 목록을 순서대로 반복하거나 함수로 생성)"""
+
+    def __init__(self, responses: Union[Sequence[str], Callable[[List], str]], latency: float = 0.0):
+        self.responses = responses
+        self.latency = latency
+        self.calls: List[List] = []
+        self._index = 0
+
+    def _next_response(self, messages: List) -> str:
+        self.calls.append(messages)
+        if callable(self.responses):
+            return self.responses(messages)
+        response = self.responses[self._index % len(self.responses)]
+        self._index += 1
+        return response
+
+    async def ainvoke(self, messages: List, **kwargs) -> AIMessage:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return AIMessage(content=self._next_response(messages))
+
+    async def astream(self, messages: List, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        content = self._next_response(messages)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for i in range(0, len(content), 8):
+            yield AIMessageChunk(content=content[i:i + 8])
+
+
+class FakeLLMEndpoint(LLMEndpoint):
+    """테스트용 로컬 엔드포인트 (Ollama 없이 동작)"""
+
+    def __init__(self, responses: Union[Sequence[str], Callable[[List], str]] = ("{}",),
+                 max_concurrency: int = 4, latency: float = 0.0, name: str = "fake"):
+        super().__init__(base_url=f"fake://{name}", max_concurrency=max_concurrency, name=name)
+        self.chat_model = FakeChatModel(responses, latency)
+
+    def _create_model(self, model: str, **options):
+        return self.chat_model
+
+    async def preload(self, model: str, keep_alive: Optional[Union[int, str]] = None, timeout: float = 120.0) -> bool:
+        self.mark_loaded(model)
+        return True
+
+
+class LLMBackendPool:
+    """여러 엔드포인트에 LLM 요청을 분산하는 풀
+
+    ainvoke/astream은 ChatOllama와 같은 메시지 형식을 받고,
+    model/priority 및 모델 옵션(temperature, num_predict 등)을 호출마다 지정할 수 있습니다.
+    keep_alive가 설정되면 모든 호출에 전달되어 Ollama가 유휴 시간 동안 모델을 내리지 않습니다.
+    """
+
+    def __init__(self, endpoints: List[LLMEndpoint], default_model: str = "llama3.2", temperature: float = 0.7,
+                 keep_alive: Optional[Union[int, str]] = None, preload_timeout: float = 120.0):
+        if not endpoints:
+            raise ValueError("LLMBackendPool requires at least one endpoint")
+        self.endpoints = endpoints
+        self.default_model = default_model
+        self.temperature = temperature
+        self.keep_alive = keep_alive
+        self.preload_timeout = preload_timeout
+        self.warm_models: List[str] = []
+        self._keep_warm_task: Optional[asyncio.Task] = None
+        self._keep_warm_interval: Optional[float] = None
+        self._rr = itertools.count()
+
+    @classmethod
+    def from_env(cls, default_model: str = "llama3.2", temperature: float = 0.7) -> "LLMBackendPool":
+        """환경 변수로 풀 구성
+
+        - OLLAMA_ENDPOINTS: 쉼표로 구분한 엔드포인트 URL (기본: OLLAMA_BASE_URL 또는 localhost)
+        - OLLAMA_NUM_PARALLEL: 엔드포인트별 동시 실행 수 (Ollama 서버 설정과 맞출 것)
+        - OLLAMA_KEEP_ALIVE: 마지막 요청 후 모델 상주 시간 (예: 30m, -1은 무기한)
+        - OLLAMA_PRELOAD_TIMEOUT: 모델 로드 대기 시간(초)
+        """
+        urls = os.getenv("OLLAMA_ENDPOINTS") or os.getenv("OLLAMA_BASE_URL") or DEFAULT_OLLAMA_URL
+        num_parallel = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+        endpoints = [LLMEndpoint(url.strip(), num_parallel) for url in urls.split(",") if url.strip()]
+        return cls(
+            endpoints,
+            default_model=default_model,
+            temperature=temperature,
+            keep_alive=parse_keep_alive(os.getenv("OLLAMA_KEEP_ALIVE", "30m")),
+            preload_timeout=float(os.getenv("OLLAMA_PRELOAD_TIMEOUT", "120")),
+        )
+
+    def _pick_endpoint(self) -> LLMEndpoint:
+        """대기 포함 요청 수가 가장 적은 엔드포인트 (동률이면 라운드 로빈)"""
+        offset = next(self._rr) % len(self.endpoints)
+        rotated = self.endpoints[offset:] + self.endpoints[:offset]
+        return min(rotated, key=lambda endpoint: endpoint.outstanding / endpoint.max_concurrency)
+
+    def _model_options(self, options: dict) -> dict:
+        merged = {"temperature": self.temperature}
+        if self.keep_alive is not None:
+            merged["keep_alive"] = self.keep_alive
+        merged.update({k: v for k, v in options.items() if v is not None})
+        return merged
+
+    async def ainvoke(self, messages: List, model: Optional[str] = None,
+                      priority: int = PRIORITY_NORMAL, **options) -> AIMessage:
+        endpoint = self._pick_endpoint()
+        model = model or self.default_model
+        chat_model = endpoint.get_model(model, **self._model_options(options))
+
+        await endpoint.acquire(priority)
+        try:
+            response = await chat_model.ainvoke(messages)
+            endpoint.completed += 1
+            endpoint.mark_loaded(model)
+            return response
+        except Exception:
+            endpoint.failed += 1
+            raise
+        finally:
+            endpoint.release()
+
+    async def astream(self, messages: List, model: Optional[str] = None,
+                      priority: int = PRIORITY_NORMAL, **options) -> AsyncIterator[AIMessageChunk]:
+        endpoint = self._pick_endpoint()
+        model = model or self.default_model
+        chat_model = endpoint.get_model(model, **self._model_options(options))
+
+        await endpoint.acquire(priority)
+        try:
+            async for chunk in chat_model.astream(messages):
+                yield chunk
+            endpoint.completed += 1
+            endpoint.mark_loaded(model)
+        except Exception:
+            endpoint.failed += 1
+            raise
+        finally:
+            endpoint.release()
+
+    @property
+    def ready(self) -> bool:
+        """미리 로드하기로 한 모델이 모든 엔드포인트에 올라가 있는지"""
+        return all(model in endpoint.loaded_models for endpoint in self.endpoints for model in self.warm_models)
+
+    async def warm_up(self, models: List[str]) -> bool:
+        """모든 엔드포인트에 모델을 동시에 로드. 준비 완료 여부 반환"""
+        self.warm_models = list(dict.fromkeys(models))
+        start = time.time()
+        await asyncio.gather(*[
+            endpoint.preload(model, self.keep_alive, self.preload_timeout)
+            for endpoint in self.endpoints for model in self.warm_models
+        ])
+        duration_ms = int((time.time() - start) * 1000)
+        if self.ready:
+            print(f"[LLM] Preloaded {self.warm_models} on {len(self.endpoints)} endpoint(s) in {duration_ms}ms")
+        else:
+            errors = [endpoint.last_warm_error for endpoint in self.endpoints if endpoint.last_warm_error]
+            print(f"[LLM WARNING] Model preload incomplete ({duration_ms}ms): {errors}")
+        return self.ready
+
+    async def _keep_warm_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            now = time.time()
+            pings = [
+                endpoint.preload(model, self.keep_alive, self.preload_timeout)
+                for endpoint in self.endpoints for model in self.warm_models
+                # 최근 실제 요청이 있었던 모델은 이미 keep_alive가 갱신됨
+                if now - endpoint.loaded_models.get(model, 0) >= interval
+            ]
+            if pings:
+                await asyncio.gather(*pings)
+
+    def start_keep_warm(self, interval: float):
+        """interval초마다 유휴 모델에 로드 요청을 보내 keep_alive 갱신 (keep_alive보다 짧게 설정할 것)"""
+        if self._keep_warm_task is None and interval > 0 and self.warm_models:
+            self._keep_warm_interval = interval
+            self._keep_warm_task = asyncio.create_task(self._keep_warm_loop(interval))
+
+    async def stop_keep_warm(self):
+        if self._keep_warm_task is None:
+            return
+        self._keep_warm_task.cancel()
+        try:
+            await self._keep_warm_task
+        except asyncio.CancelledError:
+            pass
+        self._keep_warm_task = None
+
+    def to_dict(self) -> dict:
+        return {
+            "default_model": self.default_model,
+            "keep_alive": self.keep_alive,
+            "ready": self.ready,
+            "warm_models": self.warm_models,
+            "keep_warm_interval": self._keep_warm_interval if self._keep_warm_task else None,
+            "endpoints": [endpoint.to_dict() for endpoint in self.endpoints],
+        }
@@ -0,0 +1,220 @@
+"""
+LLM 응답 캐시
+같은 모델/temperature/프롬프트 조합의 응답을 메모리 LRU와 DB(llm_cache 테이블)에 저장해
+반복되는 키워드 확장, 의도 분석 호출을 생략
+노드에서는 DB 조회/저장을 이벤트 루프 밖(비동기 엔진 또는 스레드)에서 하는 aget/aput 사용
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from database import get_session, run_session, LLMCacheEntry
+
+
+class LLMResponseCache:
+    """메모리 LRU + DB 영속 캐시
+
+    - 키: sha256(모델, temperature, 공백 정규화된 메시지 목록)
+    - 만료: TTL (메모리/DB 공통)
+    - 크기 제한: 메모리는 max_entries개 LRU, DB는 max_db_entries개를 넘으면 오래된 항목부터 삭제
+    """
+
+    # DB 정리(만료/초과분 삭제)를 수행하는 put 간격
+    PRUNE_INTERVAL = 50
+
+    def __init__(self, engine=None, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None,
+                 max_db_entries: Optional[int] = None, async_engine=None):
+        self.engine = engine
+        self.async_engine = async_engine
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+        self.ttl = timedelta(seconds=ttl_seconds or int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")))
+        self.max_db_entries = max_db_entries or int(os.getenv("LLM_CACHE_MAX_DB_ENTRIES", "10000"))
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false"
+
+        self._memory: "OrderedDict[str, Tuple[str, datetime]]" = OrderedDict()  # key -> (output, expires_at)
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, temperature: Optional[float], messages: List) -> str:
+        """모델, temperature, 정규화된 프롬프트로 캐시 키 생성"""
+        parts = [model_name, f"{temperature if temperature is not None else ''}"]
+        for message in messages:
+            # 들여쓰기/줄바꿈 차이는 같은 프롬프트로 취급
+            content = " ".join(str(message.content).split())
+            parts.append(f"{message.type}:{content}")
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시 조회 (메모리 -> DB 순)"""
+        if not self.enabled:
+            return None
+
+        now = datetime.utcnow()
+        output = self._get_from_memory(key, now)
+        if output is None:
+            output = self._get_from_db(key, now)
+        return self._count(output)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get의 비동기 버전 (DB 조회가 이벤트 루프를 막지 않음)"""
+        if not self.enabled:
+            return None
+
+        now = datetime.utcnow()
+        output = self._get_from_memory(key, now)
+        if output is None and self.engine:
+            try:
+                output = self._remember_entry(key, await self._run(self._read_entry, key, now))
+            except Exception as e:
+                print(f"[LLM CACHE ERROR] Get: {e}")
+        return self._count(output)
+
+    def _count(self, output: Optional[str]) -> Optional[str]:
+        if output is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return output
+
+    def _get_from_memory(self, key: str, now: datetime) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry:
+            output, expires_at = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                return output
+            del self._memory[key]
+        return None
+
+    def put(self, key: str, model_name: str, temperature: Optional[float], output: str):
+        """캐시 저장 (메모리 + DB)"""
+        expires_at = self._put_memory(key, output)
+        if expires_at is None or not self.engine:
+            return
+
+        session = get_session(self.engine)
+        try:
+            self._write_entry(session, key, model_name, temperature, output, expires_at, self._should_prune())
+        except Exception as e:
+            session.rollback()
+            print(f"[LLM CACHE ERROR] Put: {e}")
+        finally:
+            session.close()
+
+    async def aput(self, key: str, model_name: str, temperature: Optional[float], output: str):
+        """put의 비동기 버전 (DB 저장이 이벤트 루프를 막지 않음)"""
+        expires_at = self._put_memory(key, output)
+        if expires_at is None or not self.engine:
+            return
+
+        try:
+            await self._run(self._write_entry, key, model_name, temperature, output, expires_at, self._should_prune())
+        except Exception as e:
+            print(f"[LLM CACHE ERROR] Put: {e}")
+
+    async def _run(self, fn, *args):
+        return await run_session(fn, *args, async_engine=self.async_engine, engine=self.engine)
+
+    def _put_memory(self, key: str, output: str) -> Optional[datetime]:
+        """메모리에 저장하고 만료 시각 반환 (저장하지 않으면 None)"""
+        if not self.enabled or not output:
+            return None
+        expires_at = datetime.utcnow() + self.ttl
+        self._remember(key, output, expires_at)
+        return expires_at
+
+    def _should_prune(self) -> bool:
+        self._puts += 1
+        return self._puts % self.PRUNE_INTERVAL == 0
+
+    def _write_entry(self, session, key: str, model_name: str, temperature: Optional[float], output: str,
+                     expires_at: datetime, prune: bool = False):
+        entry = session.get(LLMCacheEntry, key)
+        if entry:
+            entry.output = output
+            entry.expires_at = expires_at
+        else:
+            session.add(LLMCacheEntry(
+                cache_key=key,
+                model_name=model_name,
+                temperature=temperature,
+                output=output,
+                hit_count=0,
+                expires_at=expires_at
+            ))
+        session.commit()
+        if prune:
+            self._prune_db(session)
+
+    def _remember(self, key: str, output: str, expires_at: datetime):
+        self._memory[key] = (output, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_from_db(self, key: str, now: datetime) -> Optional[str]:
+        if not self.engine:
+            return None
+
+        session = get_session(self.engine)
+        try:
+            return self._remember_entry(key, self._read_entry(session, key, now))
+        except Exception as e:
+            session.rollback()
+            print(f"[LLM CACHE ERROR] Get: {e}")
+            return None
+        finally:
+            session.close()
+
+    @staticmethod
+    def _read_entry(session, key: str, now: datetime) -> Optional[Tuple[str, datetime]]:
+        """DB 항목 (output, expires_at) 조회 및 적중 횟수 증가"""
+        entry = session.get(LLMCacheEntry, key)
+        if not entry or entry.expires_at <= now:
+            return None
+        entry.hit_count = (entry.hit_count or 0) + 1
+        output, expires_at = entry.output, entry.expires_at
+        session.commit()
+        return output, expires_at
+
+    def _remember_entry(self, key: str, entry: Optional[Tuple[str, datetime]]) -> Optional[str]:
+        if entry is None:
+            return None
+        self._remember(key, *entry)
+        return entry[0]
+
+    def _prune_db(self, session):
+        """만료 항목 및 최대 개수 초과분 삭제"""
+        session.query(LLMCacheEntry).filter(LLMCacheEntry.expires_at <= datetime.utcnow()).delete(
+            synchronize_session=False
+        )
+        overflow = session.query(LLMCacheEntry).count() - self.max_db_entries
+        if overflow > 0:
+            oldest = (
+                session.query(LLMCacheEntry.cache_key)
+                .order_by(LLMCacheEntry.created_at.asc())
+                .limit(overflow)
+                .subquery()
+            )
+            session.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key.in_(oldest.select())).delete(
+                synchronize_session=False
+            )
+        session.commit()
+
+    def clear(self):
+        """메모리 캐시 비우기"""
+        self._memory.clear()
+
+    def to_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
@@ -4,6 +4,7 @@ from pydantic import BaseModel, Field
 
 class Location(BaseModel):
     """장소 정보"""
+    id: Optional[str] = None  # Kakao 장소 ID (place_store 키)
     name: str
     category: str
     address: str
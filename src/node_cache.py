@@ -0,0 +1,178 @@
+"""
+노드 단위 메모이제이션
+각 노드가 실제로 읽는 state 경로(예: "dining_places[:2]", "user_intent.cafe_keywords")를 선언하고,
+그 값들의 해시가 같으면 이전 실행 결과(쓰는 state 키 + 진행 이벤트)를 재사용
+"""
+import copy
+import functools
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict, defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from events import add_event, events_since, last_seq
+
+# 현재 노드의 캐시 상태 (log_context가 output_data / nodes.cache_status에 기록)
+node_cache_status: ContextVar[Optional[dict]] = ContextVar("node_cache_status", default=None)
+
+# "키", "키[:n]", "키.속성", "키[:n].속성" 형태의 state 경로
+_PATH_PATTERN = re.compile(r"^(\w+)(?:\[:(\d+)\])?(?:\.(\w+))?$")
+
+
+def read_path(state: dict, path: str) -> Any:
+    """선언된 경로의 state 값 조회"""
+    match = _PATH_PATTERN.match(path)
+    if not match:
+        raise ValueError(f"Invalid state path: {path}")
+    key, limit, attr = match.groups()
+    value = state.get(key)
+    if limit is not None and value:
+        value = value[:int(limit)]
+    if attr is not None:
+        value = getattr(value, attr, None) if value is not None else None
+    return value
+
+
+def _get_output(state: dict, key: str) -> Any:
+    """쓰기 키 조회 ("candidate_pools.cafe"처럼 딕셔너리 state의 하위 키도 지원)"""
+    if "." in key:
+        parent, child = key.split(".", 1)
+        return (state.get(parent) or {}).get(child)
+    return state.get(key)
+
+
+def _set_output(state: dict, key: str, value: Any):
+    if "." in key:
+        parent, child = key.split(".", 1)
+        state[parent] = {**(state.get(parent) or {}), child: value}
+    else:
+        state[key] = value
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    return value
+
+
+def fingerprint(node_name: str, state: dict, reads: Sequence[str]) -> str:
+    """노드 이름 + 선언된 입력 값들의 해시"""
+    material = {path: _to_jsonable(read_path(state, path)) for path in reads}
+    payload = json.dumps([node_name, material], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class NodeCache:
+    """노드 출력 LRU 캐시 (프로세스 단위, TTL 적용)"""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("NODE_CACHE_MAX_ENTRIES", "256"))
+        # 장소 검색 결과는 영업 상태 등이 바뀔 수 있으므로 짧게 유지
+        self.ttl_seconds = ttl_seconds or int(os.getenv("NODE_CACHE_TTL_SECONDS", "600"))
+        self.enabled = os.getenv("NODE_CACHE_ENABLED", "true").lower() != "false"
+        self._entries: "OrderedDict[str, Tuple[dict, list, float]]" = OrderedDict()  # key -> (outputs, events, expires_at)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hit": 0, "miss": 0, "bypass": 0})
+
+    def get(self, key: str) -> Optional[Tuple[dict, list]]:
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        outputs, events, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(outputs), events
+
+    def put(self, key: str, outputs: dict, events: list):
+        self._entries[key] = (copy.deepcopy(outputs), copy.deepcopy(events), time.time() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def record(self, node_name: str, status: str) -> float:
+        """캐시 결과 기록 후 해당 노드의 적중률 반환"""
+        stats = self.stats[node_name]
+        stats[status] += 1
+        lookups = stats["hit"] + stats["miss"]
+        return round(stats["hit"] / lookups, 3) if lookups else 0.0
+
+    def clear(self):
+        self._entries.clear()
+
+    def to_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "nodes": {name: dict(stats) for name, stats in self.stats.items()},
+        }
+
+
+def memoize_node(node_name: str, node_type: str, reads: Sequence[str], writes: Sequence[str],
+                 bypass_on: Sequence[str] = ()):
+    """TripNodes 노드 메서드 메모이제이션 데코레이터
+
+    - reads: 노드가 읽는 state 경로. 이 값들이 같으면 결과를 재사용
+    - writes: 노드가 쓰는 state 키 ("키.하위키" 가능). 캐시 적중 시 이 키들과 진행 이벤트만 복원
+    - bypass_on: 이 next_action으로 재실행될 때는 (다른 결과를 원하므로) 캐시를 쓰지 않음
+    빈 결과는 일시적인 검색 실패일 수 있으므로 저장하지 않습니다.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, state):
+            cache: NodeCache = self.node_cache
+
+            if not cache.enabled:
+                return await method(self, state)
+
+            if state.get("next_action") in bypass_on:
+                cache.record(node_name, "bypass")
+                token = node_cache_status.set({"node_cache": "bypass"})
+                try:
+                    return await method(self, state)
+                finally:
+                    node_cache_status.reset(token)
+
+            key = fingerprint(node_name, state, reads)
+            cached = cache.get(key)
+
+            if cached is not None:
+                outputs, events = cached
+                hit_rate = cache.record(node_name, "hit")
+                token = node_cache_status.set({"node_cache": "hit", "node_cache_hit_rate": hit_rate})
+                try:
+                    async with self.log_context(state, node_name, node_type):
+                        for write_key, value in outputs.items():
+                            _set_output(state, write_key, value)
+                        for event in events:
+                            add_event(state, event["message"], event["type"], event["node"], event["data"])
+                finally:
+                    node_cache_status.reset(token)
+                print(f"[NODE CACHE] {node_name} hit (hit rate {hit_rate:.0%})")
+                return state
+
+            hit_rate = cache.record(node_name, "miss")
+            token = node_cache_status.set({"node_cache": "miss", "node_cache_hit_rate": hit_rate})
+            cursor = last_seq(state.get("event_log"))
+            try:
+                result = await method(self, state)
+            finally:
+                node_cache_status.reset(token)
+
+            outputs = {k: _get_output(result, k) for k in writes}
+            if any(outputs.values()):
+                cache.put(key, outputs, events_since(result.get("event_log"), cursor)[0])
+            return result
+
+        return wrapper
+    return decorator
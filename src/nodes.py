@@ -1,72 +1,237 @@
+import asyncio
 import httpx
-from langchain_community.chat_models import ChatOllama
+import time
+from collections import OrderedDict
 from langchain_core.messages import HumanMessage, SystemMessage
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
 from state import TripState
-from models import ScheduleItem, Location, TravelInfo
+from models import ScheduleItem, Location, TravelInfo, UserIntent
 from kakao_client import KakaoMapClient
 from time_calculator import TimeCalculator
 from contextlib import asynccontextmanager
+from langgraph.config import get_config
 from db_logger import DatabaseLogger
+from intent_stream import IncrementalJSONParser
+from intent_rules import IntentRuleParser, IntentFastPathStats
+from llm_cache import LLMResponseCache
+from feedback_classifier import FeedbackClassifier, parse_action
+from llm_backend import LLMBackendPool, PRIORITY_INTERACTIVE, PRIORITY_NORMAL, PRIORITY_BULK
+from gazetteer import get_gazetteer
+from place_index import PlaceIndex
+from place_store import PlaceStore
+from ranking import PlaceRanker, anchor_distances
+from node_cache import NodeCache, memoize_node, node_cache_status
+from events import add_event, current_event_node, EVENT_WARNING, EVENT_QUESTION, EVENT_ITINERARY
+from prompts import PROMPTS, INTENT_SYSTEM, KEYWORD_EXPANSION_SYSTEM, KEYWORD_EXPANSION_USER, FEEDBACK_CLASSIFICATION_SYSTEM
+
+# 작업별 모델 라우팅 기본값
+# 짧은 분류/키워드 확장은 작은 모델과 짧은 num_predict로 처리하고, JSON 의도 분석만 기본 모델 사용
+DEFAULT_MODEL_ROUTES = {
+    "default": {"model": "llama3.2", "temperature": 0.7},
+    "intent": {"model": "llama3.2", "temperature": 0.7, "num_predict": 512},
+    "keyword_expansion": {"model": "llama3.2:1b", "temperature": 0.5, "num_predict": 64},
+    "feedback_classification": {"model": "llama3.2:1b", "temperature": 0.0, "num_predict": 16},
+}
+
 
 class TripNodes:
-    def __init__(self, llm: ChatOllama, kakao_client: KakaoMapClient, time_calc: TimeCalculator, engine=None):
+    # 보관할 선행 검색 작업 수 (소비되지 않은 작업은 오래된 것부터 취소)
+    MAX_PREFETCH_TASKS = 64
+    # 피드백 action -> 다시 계산할 단계 (나머지 단계는 고정)
+    REFINE_STAGES = {"refine_food": "dining", "refine_place": "dining", "refine_cafe": "cafe", "refine_region": "all"}
+    # 식사/카페/술집 검색 후보 수 (Kakao 한 페이지 최대치를 받아 랭킹 후 상위만 사용)
+    CANDIDATE_SEARCH_SIZE = 15
+    # 활동 장소는 최대 반경으로 한 번만 검색하고, 작은 반경은 거리로 로컬 필터링
+    MAX_SEARCH_RADIUS = 5000
+    RADIUS_STEP = 1000
+    MAX_ACTIVITY_PLACES = 10
+    # 식사/카페/술집은 앞 단계 장소(기준 장소) 주변 이 반경(m) 안에서 검색
+    STAGE_SEARCH_RADIUS = {"dining": 500, "cafe": 300, "drinking": 300}
+
+    def __init__(self, llm: LLMBackendPool, kakao_client: KakaoMapClient, time_calc: TimeCalculator, engine=None,
+                 llm_cache: Optional[LLMResponseCache] = None, model_routes: Optional[dict] = None,
+                 async_engine=None):
         self.llm = llm
         self.kakao_client = kakao_client
         self.time_calc = time_calc
         self.engine = engine
+        self.async_engine = async_engine  # 요청 처리 중 DB 조회용 (없으면 스레드에서 동기 엔진 사용)
+        # 작업별 모델 라우팅 (호출 측 설정이 기본값을 덮어씀)
+        self.model_routes = {task: dict(route) for task, route in DEFAULT_MODEL_ROUTES.items()}
+        for task, route in (model_routes or {}).items():
+            self.model_routes.setdefault(task, {}).update(route)
+        # LLM 응답 캐시 (메모리 LRU + llm_cache 테이블)
+        self.llm_cache = llm_cache or LLMResponseCache(engine, async_engine=async_engine)
+        # 노드 단위 메모이제이션 (선언된 입력이 같으면 검색 결과 재사용)
+        self.node_cache = NodeCache()
+        # 의도 분석 중 location이 먼저 나오면 시작하는 활동 장소 선행 검색 {세션키: (location, task)}
+        self._activity_prefetch: "OrderedDict[str, tuple]" = OrderedDict()
+        # 지명 사전 (지역명 -> 중심 좌표, 위치 확인용 Kakao 검색 생략)
+        self.gazetteer = get_gazetteer()
+        # 공유 장소 저장소 (state에는 장소 ID만 보관)
+        self.place_store = PlaceStore(engine, async_engine=async_engine)
+        # 장소명 자동완성 인덱스 (지명 사전 + 검색으로 알게 된 장소)
+        self.place_index = PlaceIndex()
+        self.place_index.add_gazetteer(self.gazetteer)
+        # 후보 랭킹 (거리/키워드/카테고리 가중합, RANKING_WEIGHTS)
+        self.ranker = PlaceRanker()
+        # 규칙 기반 의도 분석 (확신도가 낮을 때만 LLM 사용)
+        self.intent_parser = IntentRuleParser()
+        self.intent_stats = IntentFastPathStats()
+        # 피드백 분류기 (과거 LLM 분류 결과로 추가 학습, train_feedback_classifier()에서 백그라운드로)
+        self.feedback_classifier = FeedbackClassifier()
+
+    async def train_feedback_classifier(self):
+        """feedback_labels 기록으로 피드백 분류기 추가 학습 (서버 시작을 기다리게 하지 않도록 백그라운드 태스크로 실행)"""
+        if not self.engine:
+            return
+        try:
+            trained = await self.feedback_classifier.atrain_from_db(self.engine, self.async_engine)
+            print(f"[INFO] Feedback classifier trained on {trained} labelled feedbacks")
+        except Exception as e:
+            print(f"[WARNING] Feedback classifier training failed: {e}")
+
+    def _workflow_logger(self, state: TripState) -> Tuple[Optional[DatabaseLogger], bool]:
+        """그래프 config로 전달된 워크플로우 로거와, config에 없어서 새로 만든 임시 로거인지 여부"""
+        workflow_id = state.get("workflow_id")
+        if not self.engine or not workflow_id:
+            return None, False
+        try:
+            logger = get_config().get("configurable", {}).get("db_logger")
+        except RuntimeError:
+            # 그래프 밖에서 노드를 직접 호출한 경우
+            logger = None
+        if logger is not None:
+            return logger, False
+
+        logger = DatabaseLogger(self.engine, trace_level=state.get("trace_level"))
+        logger.current_workflow_id = workflow_id
+        return logger, True
 
     @asynccontextmanager
     async def log_context(self, state: TripState, node_name: str, node_type: str):
-        """노드 실행 로깅 컨텍스트 매니저"""
-        workflow_id = state.get("workflow_id")
-        logger = None
+        """노드 실행 로깅 컨텍스트 매니저
+
+        노드가 채워 넣을 수 있는 dict를 반환하며, 내용은 노드 완료 시 output_data로 저장됩니다.
+        memoize_node로 감싼 노드는 캐시 적중 여부가 함께 기록됩니다.
+        """
+        logger, owned = None, False
         node_id = None
+        node_log = dict(node_cache_status.get() or {})
+        event_token = current_event_node.set(node_name)
         
-        if self.engine and workflow_id:
+        if self.engine and state.get("workflow_id"):
             try:
-                logger = DatabaseLogger(self.engine)
-                logger.current_workflow_id = workflow_id
-                
-                # 입력 데이터 (상태의 일부만 저장하거나 전체 저장)
-                # 여기서는 간단히 전체 상태 중 일부만
-                input_data = {k: v for k, v in state.items() if k not in ["progress_messages", "final_itinerary"]}
+                logger, owned = self._workflow_logger(state)
                 
-                node = logger.log_node_start(node_name, node_type, input_data=input_data)
+                # 입력 state (로거가 직전 노드 완료 이후 바뀐 부분만 기록)
+                node = logger.log_node_start(node_name, node_type, input_data=dict(state))
                 node_id = node.id
                 state["current_node_id"] = node_id  # 현재 노드 ID 저장
             except Exception as e:
                 print(f"[DB LOG ERROR] Start: {e}")
 
         try:
-            yield
+            yield node_log
             
             if logger and node_id:
                 try:
-                    logger.log_node_complete(node_id, state)
+                    # 기록 큐가 가득 찼으면 (block 정책) 이벤트 루프를 막지 않고 빈 자리를 기다림
+                    await logger.writer.backpressure()
+                    logger.log_node_complete(node_id, state, output_data=node_log or None,
+                                             cache_status=node_log.get("node_cache"))
                 except Exception as e:
                     print(f"[DB LOG ERROR] Complete: {e}")
         except Exception as e:
             if logger and node_id:
                 try:
                     import traceback
-                    logger.log_node_error(node_id, str(e), traceback.format_exc())
+                    logger.log_node_error(node_id, str(e), traceback.format_exc(), state=state)
                 except:
                     pass
             raise e
         finally:
-            if logger:
+            current_event_node.reset(event_token)
+            if owned:
                 logger.close()
 
-    async def _call_llm(self, state: TripState, messages: List, model_name: str = "llama3.2") -> str:
-        """LLM 호출 및 DB 로깅"""
+    def _resolve_route(self, task: str) -> dict:
+        """작업 이름으로 모델/옵션 조회 (없으면 default)"""
+        route = dict(self.model_routes.get("default", {}))
+        route.update(self.model_routes.get(task, {}))
+        return route
+
+    @staticmethod
+    def _token_usage(message) -> dict:
+        """응답 메타데이터에서 토큰 수 추출 (Ollama: prompt_eval_count / eval_count)"""
+        usage = getattr(message, "usage_metadata", None) or {}
+        metadata = getattr(message, "response_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens") or metadata.get("prompt_eval_count")
+        completion_tokens = usage.get("output_tokens") or metadata.get("eval_count")
+        total_tokens = None
+        if prompt_tokens is not None or completion_tokens is not None:
+            total_tokens = (prompt_tokens or 0) + (completion_tokens or 0)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": total_tokens
+        }
+
+    async def _call_llm(self, state: TripState, messages: List, task: str = "default",
+                        on_chunk: Optional[Callable[[str], None]] = None, use_cache: bool = True,
+                        priority: int = PRIORITY_NORMAL) -> str:
+        """LLM 호출 및 DB 로깅
+
+        task로 모델/temperature/num_predict를 고릅니다 (model_routes 참고).
+        on_chunk가 주어지면 스트리밍으로 호출하고 생성되는 텍스트 조각마다 콜백을 호출합니다.
+        use_cache=False면 응답 캐시를 건너뛰고 항상 모델을 호출합니다.
+        priority는 백엔드 풀 대기열 우선순위입니다 (낮을수록 먼저 실행).
+        """
+        route = self._resolve_route(task)
+        model_name = route.get("model", self.llm.default_model)
+        temperature = route.get("temperature", self.llm.temperature)
+        num_predict = route.get("num_predict")
+        options = {"temperature": temperature, "num_predict": num_predict}
+
+        cache_key = None
+        if use_cache:
+            cache_key = self.llm_cache.make_key(f"{model_name}|num_predict={num_predict}", temperature, messages)
+
         start_time = datetime.utcnow()
-        response = await self.llm.ainvoke(messages)
+        content = await self.llm_cache.aget(cache_key) if cache_key else None
+        cached = content is not None
+        usage = {}
+
+        if cached:
+            if on_chunk:
+                on_chunk(content)
+        elif on_chunk:
+            parts = []
+            last_chunk = None
+            async for chunk in self.llm.astream(messages, model=model_name, priority=priority, **options):
+                last_chunk = chunk
+                if chunk.content:
+                    parts.append(chunk.content)
+                    on_chunk(chunk.content)
+            content = "".join(parts).strip()
+            usage = self._token_usage(last_chunk)
+        else:
+            response = await self.llm.ainvoke(messages, model=model_name, priority=priority, **options)
+            content = response.content.strip()
+            usage = self._token_usage(response)
         end_time = datetime.utcnow()
         duration_ms = int((end_time - start_time).total_seconds() * 1000)
-        content = response.content.strip()
+
+        if cache_key and not cached:
+            await self.llm_cache.aput(cache_key, model_name, temperature, content)
+        if not cached:
+            PROMPTS.record_usage(task, usage.get("prompt_tokens"), usage.get("completion_tokens"))
+
+        print(f"[LLM] task={task} model={model_name} {duration_ms}ms"
+              f"{' (cache)' if cached else ''} prompt_tokens={usage.get('prompt_tokens')}"
+              f" completion_tokens={usage.get('completion_tokens')}")
 
         # DB 로깅
         workflow_id = state.get("workflow_id")
@@ -74,8 +239,7 @@ class TripNodes:
         
         if self.engine and workflow_id:
             try:
-                logger = DatabaseLogger(self.engine)
-                logger.current_workflow_id = workflow_id
+                logger, owned = self._workflow_logger(state)
                 
                 # 프롬프트 구성 (문자열 변환)
                 user_prompt = messages[-1].content if messages else ""
@@ -87,14 +251,187 @@ class TripNodes:
                     output=content,
                     node_id=node_id,
                     system_prompt=system_prompt,
-                    latency_ms=duration_ms
+                    model_provider="cache" if cached else "ollama",
+                    temperature=temperature,
+                    max_tokens=num_predict,
+                    latency_ms=duration_ms,
+                    task=task,
+                    **usage
                 )
-                logger.close()
+                if owned:
+                    logger.close()
             except Exception as e:
                 print(f"[DB LOG ERROR] Generation: {e}")
                 
         return content
 
+    @staticmethod
+    def _is_refining(state: TripState, stage: str) -> bool:
+        return state.get("refine_stage") in (stage, "all")
+
+    @staticmethod
+    def _stage(key: str) -> str:
+        """state 키의 단계 이름 ("dining_places" -> "dining")"""
+        return key[:-len("_places")] if key.endswith("_places") else key
+
+    @staticmethod
+    def _distances(state: TripState, stage: str) -> Optional[Dict[str, int]]:
+        return (state.get("place_distances") or {}).get(stage)
+
+    async def load_places(self, state: TripState, key: str, limit: Optional[int] = None) -> List[Location]:
+        """state의 장소 ID 목록을 Location 목록으로 조회 (메모리에 없는 장소는 비동기로 DB 조회)"""
+        place_ids = state.get(key) or []
+        return await self.place_store.amaterialize(place_ids[:limit], self._distances(state, self._stage(key)))
+
+    async def _pool(self, state: TripState, stage: str) -> List[Location]:
+        pool = (state.get("candidate_pools") or {}).get(stage)
+        return await self.place_store.amaterialize(pool, self._distances(state, stage)) if pool else []
+
+    def _place_ids(self, state: TripState, stage: str, places: List[Location]) -> List[str]:
+        """장소를 저장소에 등록하고 ID 목록 반환 (검색 기준점 거리는 단계별로 state에 따로 보관)
+
+        같은 장소가 다른 단계에서 다른 기준점으로 검색돼도 각 단계의 거리를 유지하도록 단계별로 나눔
+        """
+        place_ids = self.place_store.add_many(places)
+        distances = {pid: p.distance for pid, p in zip(place_ids, places) if p.distance is not None}
+        if distances:
+            all_distances = dict(state.get("place_distances") or {})
+            all_distances[stage] = {**(all_distances.get(stage) or {}), **distances}
+            state["place_distances"] = all_distances
+        return place_ids
+
+    def _set_places(self, state: TripState, key: str, places: List[Location]):
+        state[key] = self._place_ids(state, self._stage(key), places)
+
+    @staticmethod
+    def _unshown(state: TripState, stage: str, places: List[Location]) -> List[Location]:
+        """이미 일정에 보여준 장소 제외"""
+        shown = set((state.get("shown_places") or {}).get(stage, []))
+        return [p for p in places if p.name not in shown]
+
+    async def _reuse_candidates(self, state: TripState, stage: str,
+                                anchors: Optional[List[Location]] = None) -> List[Location]:
+        """수정 중인 단계면 기존 후보 중 아직 보여주지 않은 장소 반환 (없으면 재검색 필요)
+
+        활동은 검색 반경 안의 후보만, 나머지 단계는 현재 기준 장소(anchors) 주변 후보만 사용
+        (전체 다시 짜기로 앞 단계 장소가 바뀌면 예전 기준 장소 주변 후보는 버리고 새 기준 장소로 재검색)
+        """
+        if not self._is_refining(state, stage):
+            return []
+        pool = self._unshown(state, stage, await self._pool(state, stage))
+        if stage == "activity":
+            return self._within_radius(pool, state.get("search_radius", 2000))
+        return self._near_anchors(pool, anchors or [], self.STAGE_SEARCH_RADIUS[stage])
+
+    @staticmethod
+    def _near_anchors(places: List[Location], anchors: List[Location], radius: int) -> List[Location]:
+        """기준 장소 중 하나에서 radius 안에 있는 장소 (거리는 가장 가까운 기준 장소 기준으로 갱신)"""
+        if not places or not anchors:
+            return []
+        distances = anchor_distances(places, anchors)
+        return [place.model_copy(update={"distance": int(distance)})
+                for place, distance in zip(places, distances) if distance <= radius]
+
+    def _remember_candidates(self, state: TripState, stage: str, places: List[Location]):
+        """단계별 후보 풀에 검색 결과 ID 추가 (중복 제거, 자동완성 인덱스에도 등록)"""
+        self.place_index.add_places(places)
+        pools = dict(state.get("candidate_pools") or {})
+        pool = list(pools.get(stage, []))
+        known = set(pool)
+        for place_id in self._place_ids(state, stage, places):
+            if place_id not in known:
+                known.add(place_id)
+                pool.append(place_id)
+        pools[stage] = pool
+        state["candidate_pools"] = pools
+
+    @staticmethod
+    def _session_key(state: TripState) -> str:
+        return state.get("workflow_id") or state["user_input"]
+
+    def _region_name(self, location: str) -> str:
+        """지명 사전의 대표 이름 (사전에 없으면 그대로)"""
+        region = self.gazetteer.lookup(location) or self.gazetteer.find_in_text(location or "")
+        return region.name if region else location
+
+    async def _search_activity_pool(self, location: str, center: Optional[Location] = None) -> List[Location]:
+        """활동 장소를 최대 반경으로 한 번 검색해 거리순으로 반환"""
+        region = self.gazetteer.lookup(location) if center is None else None
+        if region:
+            # 사전에 있는 지역은 중심 좌표 기준 카테고리 검색만 수행
+            return await self.kakao_client.find_activity_places_near(
+                region.x, region.y, radius=self.MAX_SEARCH_RADIUS
+            )
+
+        if center is None:
+            try:
+                center = await self.kakao_client.find_specific_place(location)
+            except Exception as e:
+                print(f"[ERROR] Failed to locate '{location}': {e}")
+
+        places = await self.kakao_client.find_activity_places(
+            location,
+            radius=self.MAX_SEARCH_RADIUS,
+            size=15,
+            x=center.x if center else None,
+            y=center.y if center else None
+        )
+        return sorted(places, key=lambda p: p.distance if p.distance is not None else float("inf"))
+
+    @staticmethod
+    def _within_radius(places: List[Location], radius: int) -> List[Location]:
+        """반경 내 장소만 (거리 정보가 없는 장소는 항상 포함)"""
+        return [p for p in places if p.distance is None or p.distance <= radius]
+
+    async def _next_radius(self, state: TripState) -> Optional[int]:
+        """후보가 실제로 늘어나는 다음 검색 반경 (기존 검색 결과로 판단, 더 늘지 않으면 None)"""
+        radius = state["search_radius"]
+        pool = await self._pool(state, "activity")
+        current = len(self._within_radius(pool, radius)) if pool else 0
+        while radius < self.MAX_SEARCH_RADIUS:
+            radius = min(radius + self.RADIUS_STEP, self.MAX_SEARCH_RADIUS)
+            # 검색 결과가 없으면(검색 실패 등) 예전처럼 다시 검색해 봄
+            if not pool or len(self._within_radius(pool, radius)) > current:
+                return radius
+        return None
+
+    def _start_activity_prefetch(self, state: TripState, location: str):
+        """활동 장소 기본 검색을 백그라운드로 미리 시작"""
+        key = self._session_key(state)
+        if key in self._activity_prefetch:
+            return
+
+        location = self._region_name(location)
+        task = asyncio.create_task(self._search_activity_pool(location, state.get("starting_point")))
+        self._activity_prefetch[key] = (location, task)
+        print(f"[DEBUG] Prefetching activity places for '{location}'")
+
+        while len(self._activity_prefetch) > self.MAX_PREFETCH_TASKS:
+            _, (_, stale) = self._activity_prefetch.popitem(last=False)
+            stale.cancel()
+
+    async def _take_activity_prefetch(self, state: TripState, location: str) -> Optional[List[Location]]:
+        """선행 검색 결과 꺼내기 (조건이 다르거나 실패했으면 None)"""
+        entry = self._activity_prefetch.pop(self._session_key(state), None)
+        if not entry:
+            return None
+
+        prefetched_location, task = entry
+        if prefetched_location != location:
+            task.cancel()
+            return None
+
+        try:
+            return await task
+        except Exception as e:
+            print(f"[ERROR] Activity prefetch failed: {e}")
+            return None
+
+    def _discard_activity_prefetch(self, state: TripState):
+        entry = self._activity_prefetch.pop(self._session_key(state), None)
+        if entry:
+            entry[1].cancel()
+
     def route_after_analysis(self, state: TripState) -> str:
         """입력 분석 후 라우팅 (자연어 분석 결과 기반)"""
         input_type = state.get("input_type", "region")
@@ -102,12 +439,14 @@ class TripNodes:
 
         # 1. 특정 장소 검색인 경우 -> 활동 검색 건너뜀
         if input_type == "specific_place":
+            self._discard_activity_prefetch(state)
             if user_intent and (not user_intent.dining_required or user_intent.food_preference):
                 return "skip_to_dining"
             return "skip_to_food"
 
         # 2. 활동이 필요 없는 경우 -> 바로 식당/카페 검색으로
         if user_intent and not user_intent.activity_required:
+            self._discard_activity_prefetch(state)
             if not user_intent.dining_required or user_intent.food_preference:
                 return "skip_to_dining"
             return "skip_to_food"
@@ -128,108 +467,130 @@ class TripNodes:
             if not user_intent.dining_required or user_intent.food_preference:
                 return "skip_to_dining"
 
-        return "ask_food"
+        # 이전 HIL에서 이미 답한 경우 (전체 다시 짜기 등) 다시 묻지 않음
+        if state.get("user_food_preference"):
+            return "skip_to_dining"
 
-    async def analyze_user_input(self, state: TripState) -> TripState:
-        """사용자 입력 분석 (JSON 기반 구조화)"""
-        async with self.log_context(state, "analyze_user_input", "analysis"):
-            print(f"[DEBUG] Analyzing input: {state['user_input']}")
+        return "ask_food"
 
-            # 자연어 분석 프롬프트 (JSON 출력 유도)
-            system_prompt = f"""
-            당신은 여행 계획 전문가입니다. 사용자의 자연어 입력을 분석하여 구조화된 JSON 데이터로 변환하세요.
-
-            [입력 정보]
-            사용자 발화: {state['user_input']}
-
-            [지시 사항]
-            1. 사용자 발화에서 지역, 활동, 음식, 카페, 술집 관련 정보를 추출하세요.
-            2. 명시되지 않은 항목은 required=true로 설정하여 추천받도록 합니다.
-            3. "필요 없어", "안 갈래" 등의 부정 표현이 있으면 required=false로 설정하세요.
-
-            [JSON 응답 형식]
-            {{
-                "location": "지역명 또는 장소명",
-                "activity": {{
-                    "required": true/false,
-                    "preference": "구체적 활동 (예: 보드게임, 방탈출) 또는 null",
-                    "keywords": ["키워드1", "키워드2"]
-                }},
-                "dining": {{
-                    "required": true/false,
-                    "preference": "음식 종류 (예: 한식, 파스타) 또는 null",
-                    "keywords": ["키워드1", "키워드2"]
-                }},
-                "cafe": {{
-                    "required": true/false,
-                    "preference": "선호도 또는 null",
-                    "keywords": ["키워드1", "키워드2"]
-                }},
-                "drinking": {{
-                    "required": true/false,
-                    "preference": "술집 종류 (예: 이자카야, 칵테일바) 또는 null",
-                    "keywords": ["키워드1", "키워드2"]
-                }}
-            }}
-            """
-
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=state['user_input'])
-            ]
+    def route_after_dining(self, state: TripState) -> str:
+        """식사 장소만 수정하는 경우 카페/술집은 고정하고 바로 일정 재최적화"""
+        if state.get("refine_stage") == "dining" and state.get("selected_places"):
+            return "regenerate"
+        return "continue"
+
+    def route_after_cafe(self, state: TripState) -> str:
+        """카페만 수정하는 경우 술집은 고정하고 바로 일정 재최적화"""
+        if state.get("refine_stage") == "cafe" and state.get("selected_places"):
+            return "regenerate"
+        return "continue"
+
+    async def _analyze_with_llm(self, state: TripState) -> UserIntent:
+        """LLM 기반 의도 분석 (스트리밍 JSON)"""
+        # 고정 지시문만 system으로, 사용자 발화는 HumanMessage로 한 번만 전달 (prefix 캐시 재사용)
+        messages = [
+            SystemMessage(content=INTENT_SYSTEM.render()),
+            HumanMessage(content=state['user_input'])
+        ]
+
+        # location 필드가 먼저 완성되면 나머지 응답을 기다리지 않고 활동 장소 검색 시작
+        stream_parser = IncrementalJSONParser()
+
+        def on_chunk(text: str):
+            for key, value in stream_parser.feed(text):
+                if key == "location" and isinstance(value, str) and value.strip():
+                    self._start_activity_prefetch(state, value.strip())
 
-            try:
-                content = await self._call_llm(state, messages)
-            
-                # 마크다운 코드 블록 제거 (혹시 있을 경우)
-                if "```json" in content:
-                    content = content.split("```json")[1].split("```")[0].strip()
-                elif "```" in content:
-                    content = content.split("```")[1].split("```")[0].strip()
-
-                import json
-                data = json.loads(content)
+        try:
+            content = await self._call_llm(state, messages, task="intent", on_chunk=on_chunk)
+        
+            # 마크다운 코드 블록 제거 (혹시 있을 경우)
+            if "```json" in content:
+                content = content.split("```json")[1].split("```")[0].strip()
+            elif "```" in content:
+                content = content.split("```")[1].split("```")[0].strip()
+
+            import json
+            data = json.loads(content)
+        
+            # 파싱 결과 저장
+            from models import UserIntent
+        
+            intent_data = {
+                "location": data.get("location", ""),
             
-                # 파싱 결과 저장
-                from models import UserIntent
+                "activity_required": data["activity"].get("required", True),
+                "activity_preference": data["activity"].get("preference"),
+                "activity_keywords": data["activity"].get("keywords", []),
             
-                intent_data = {
-                    "location": data.get("location", ""),
-                
-                    "activity_required": data["activity"].get("required", True),
-                    "activity_preference": data["activity"].get("preference"),
-                    "activity_keywords": data["activity"].get("keywords", []),
-                
-                    "dining_required": data["dining"].get("required", True),
-                    "food_preference": data["dining"].get("preference"),
-                    "food_keywords": data["dining"].get("keywords", []),
-                
-                    "cafe_required": data["cafe"].get("required", True),
-                    "cafe_preference": data["cafe"].get("preference"),
-                    "cafe_keywords": data["cafe"].get("keywords", []),
-                
-                    "drinking_required": data["drinking"].get("required", True),
-                    "drinking_preference": data["drinking"].get("preference"),
-                    "drinking_keywords": data["drinking"].get("keywords", [])
-                }
+                "dining_required": data["dining"].get("required", True),
+                "food_preference": data["dining"].get("preference"),
+                "food_keywords": data["dining"].get("keywords", []),
             
-                user_intent = UserIntent(**intent_data)
+                "cafe_required": data["cafe"].get("required", True),
+                "cafe_preference": data["cafe"].get("preference"),
+                "cafe_keywords": data["cafe"].get("keywords", []),
             
-            except Exception as e:
-                print(f"[ERROR] Intent Parsing Failed: {e}")
-                # 실패 시 기본값 (안전장치)
-                from models import UserIntent
-                user_intent = UserIntent(
-                    location=state['user_input'][:10], # 대충 앞부분만 사용
-                    activity_required=True,
-                    dining_required=True,
-                    cafe_required=True,
-                    drinking_required=True
-                )
+                "drinking_required": data["drinking"].get("required", True),
+                "drinking_preference": data["drinking"].get("preference"),
+                "drinking_keywords": data["drinking"].get("keywords", [])
+            }
+        
+            user_intent = UserIntent(**intent_data)
+        
+        except Exception as e:
+            print(f"[ERROR] Intent Parsing Failed: {e}")
+            # 실패 시 기본값 (안전장치)
+            from models import UserIntent
+            user_intent = UserIntent(
+                location=state['user_input'][:10], # 대충 앞부분만 사용
+                activity_required=True,
+                dining_required=True,
+                cafe_required=True,
+                drinking_required=True
+            )
+
+        return user_intent
+
+    async def analyze_user_input(self, state: TripState) -> TripState:
+        """사용자 입력 분석 (JSON 기반 구조화)"""
+        async with self.log_context(state, "analyze_user_input", "analysis") as node_log:
+            print(f"[DEBUG] Analyzing input: {state['user_input']}")
+
+            # 1. 규칙 기반 fast path (확신도가 높으면 LLM 호출 생략)
+            rule_start = time.perf_counter()
+            user_intent, confidence = self.intent_parser.try_parse(state["user_input"])
+            rule_ms = (time.perf_counter() - rule_start) * 1000
+
+            if user_intent:
+                source = "rules"
+                saved_ms = self.intent_stats.record_hit(rule_ms)
+                if user_intent.activity_required and not user_intent.activity_preference:
+                    self._start_activity_prefetch(state, user_intent.location)
+                print(f"[INTENT] Rule fast path hit (confidence={confidence}, {rule_ms:.2f}ms, "
+                      f"~{saved_ms}ms saved, hit rate {self.intent_stats.hit_rate:.0%})")
+            else:
+                # 2. LLM 분석
+                source = "llm"
+                llm_start = time.perf_counter()
+                user_intent = await self._analyze_with_llm(state)
+                llm_ms = (time.perf_counter() - llm_start) * 1000
+                saved_ms = 0
+                self.intent_stats.record_miss(llm_ms)
+                print(f"[INTENT] LLM fallback (rule confidence={confidence}, {llm_ms:.0f}ms, "
+                      f"hit rate {self.intent_stats.hit_rate:.0%})")
+
+            node_log.update({
+                "intent_source": source,
+                "rule_confidence": confidence,
+                "latency_saved_ms": saved_ms,
+                "fast_path": self.intent_stats.to_dict()
+            })
 
             state["user_intent"] = user_intent
-            state["parsed_location"] = user_intent.location
-            state["input_type"] = "region"  
+            state["parsed_location"] = self._region_name(user_intent.location)
+            # 자동완성으로 출발 장소가 정해진 경우 해당 장소 기준으로 검색
+            state["input_type"] = "specific_place" if state.get("starting_point") else "region"
         
             # 선호도를 state에도 저장 (기존 로직 호환성 및 HIL 체크용)
             if user_intent.activity_preference:
@@ -238,7 +599,7 @@ class TripNodes:
                 state["user_food_preference"] = user_intent.food_preference
         
             # 진행 메시지
-            state["progress_messages"].append(f"✓ 입력 분석 완료: {user_intent.location}")
+            add_event(state, f"✓ 입력 분석 완료: {user_intent.location}")
         
         def format_req(name, req, pref, keywords):
             if not req: return f"  - {name}: 제외"
@@ -246,23 +607,23 @@ class TripNodes:
             if keywords: desc += f" ({', '.join(keywords)})"
             return f"  - {name}: {desc}"
 
-        state["progress_messages"].append(format_req("활동", user_intent.activity_required, user_intent.activity_preference, user_intent.activity_keywords))
-        state["progress_messages"].append(format_req("식사", user_intent.dining_required, user_intent.food_preference, user_intent.food_keywords))
-        state["progress_messages"].append(format_req("카페", user_intent.cafe_required, user_intent.cafe_preference, user_intent.cafe_keywords))
-        state["progress_messages"].append(format_req("술집", user_intent.drinking_required, user_intent.drinking_preference, user_intent.drinking_keywords))
+        add_event(state, format_req("활동", user_intent.activity_required, user_intent.activity_preference, user_intent.activity_keywords), node="analyze_user_input")
+        add_event(state, format_req("식사", user_intent.dining_required, user_intent.food_preference, user_intent.food_keywords), node="analyze_user_input")
+        add_event(state, format_req("카페", user_intent.cafe_required, user_intent.cafe_preference, user_intent.cafe_keywords), node="analyze_user_input")
+        add_event(state, format_req("술집", user_intent.drinking_required, user_intent.drinking_preference, user_intent.drinking_keywords), node="analyze_user_input")
         
         return state
 
     async def request_activity_preference(self, state: TripState) -> TripState:
         """활동 선호도 질문"""
         msg = "어떤 스타일의 활동을 원하시나요? (예: 전시, 체험, 힐링, 쇼핑 등)"
-        state["progress_messages"].append(msg)
+        add_event(state, msg, EVENT_QUESTION, node="request_activity_preference")
         return state
 
     async def request_food_preference(self, state: TripState) -> TripState:
         """음식 선호도 질문"""
         msg = "어떤 종류의 음식을 선호하시나요? (예: 한식/양식/중식/일식 등) '상관없음'이라고 하시면 추천해드릴게요."
-        state["progress_messages"].append(msg)
+        add_event(state, msg, EVENT_QUESTION, node="request_food_preference")
         return state
 
     async def discover_activity_places(self, state: TripState) -> TripState:
@@ -271,30 +632,46 @@ class TripNodes:
             # 자연어 분석 결과 확인
             user_intent = state.get("user_intent")
             if user_intent and not user_intent.activity_required:
+                self._discard_activity_prefetch(state)
                 state["activity_places"] = []
-                state["progress_messages"].append("✓ 활동 장소 검색 건너뛰기 (사용자 요청)")
+                add_event(state, "✓ 활동 장소 검색 건너뛰기 (사용자 요청)")
+                return state
+
+            # 전체 다시 짜기: 기존 후보 중 보여주지 않은 장소 사용 (재검색 없음)
+            reused = await self._reuse_candidates(state, "activity")
+            if reused:
+                self._discard_activity_prefetch(state)
+                self._set_places(state, "activity_places", reused[:5])
+                add_event(state, f"✓ 기존 후보에서 새 활동 장소 {len(state['activity_places'])}개 선택")
                 return state
 
             location = state["parsed_location"]
             radius = state.get("search_radius", 2000)
 
+            # 반경 확대 재시도: 최대 반경으로 이미 검색한 후보를 거리로 필터링 (Kakao/LLM 재호출 없음)
+            pool = await self._pool(state, "activity")
+            if pool and state.get("refine_stage") is None:
+                self._discard_activity_prefetch(state)
+                self._set_places(state, "activity_places", self._within_radius(pool, radius)[:self.MAX_ACTIVITY_PLACES])
+                add_event(state, f"✓ 반경 {radius}m 내 활동 장소 {len(state['activity_places'])}개 (기존 검색 결과)")
+                return state
+
             # 사용자 선호도 (NLP 또는 HIL)
             preference = state.get("user_activity_preference")
 
             # 1. 사용자 선호도가 명확하면 최우선 적용
             if preference and preference not in ["상관없음", "없음"]:
-                state["progress_messages"].append(f"✓ '{preference}' 기준으로 활동 장소를 검색합니다.")
+                self._discard_activity_prefetch(state)
+                add_event(state, f"✓ '{preference}' 기준으로 활동 장소를 검색합니다.")
 
                 # 키워드 확장
-                expansion_prompt = f"""
-                '{location}' 지역에서 '{preference}'와(과) 관련된 장소를 찾기 위한 검색 키워드 3개를 쉼표로 구분하여 나열하세요.
-                다른 설명 없이 오직 키워드만 반환하세요.
-                예시: {location} {preference}, {location} 추천, {location} 데이트
-                """
-
                 try:
-                    expansion_msg = [HumanMessage(content=expansion_prompt)]
-                    content = await self._call_llm(state, expansion_msg)
+                    expansion_msg = [
+                        SystemMessage(content=KEYWORD_EXPANSION_SYSTEM.render()),
+                        HumanMessage(content=KEYWORD_EXPANSION_USER.render(location=location, preference=preference))
+                    ]
+                    content = await self._call_llm(state, expansion_msg, task="keyword_expansion",
+                                                   priority=PRIORITY_BULK)
                     keywords = [k.strip() for k in content.split(",") if k.strip()]
                 except Exception as e:
                     print(f"[ERROR] Keyword expansion failed: {e}")
@@ -307,10 +684,14 @@ class TripNodes:
 
                 print(f"[DEBUG] Expanded keywords for {preference}: {keywords}")
 
+                # 사전에 있는 지역이면 중심 좌표 반경 안에서만 검색
+                region = self.gazetteer.lookup(location)
                 activity_places = []
                 async with httpx.AsyncClient() as client:
                     for kw in keywords:
                         params = {"query": kw, "size": 5, "sort": "accuracy"}
+                        if region:
+                            params.update({"x": region.x, "y": region.y, "radius": self.MAX_SEARCH_RADIUS})
                         headers = {"Authorization": f"KakaoAK {self.kakao_client.api_key}"}
                         try:
                             res = await client.get(
@@ -322,6 +703,7 @@ class TripNodes:
                             data = res.json()
                             for doc in data.get("documents", []):
                                 activity_places.append(Location(
+                                    id=doc.get("id"),
                                     name=doc["place_name"],
                                     category=doc["category_name"],
                                     address=doc["address_name"],
@@ -329,7 +711,8 @@ class TripNodes:
                                     y=float(doc["y"]),
                                     phone=doc.get("phone"),
                                     place_url=doc.get("place_url"),
-                                    distance=0
+                                    # 중심 좌표 없이 검색하면 거리가 없음 (반경 필터에서 항상 포함)
+                                    distance=int(doc["distance"]) if doc.get("distance") else None
                                 ))
                         except Exception as e:
                             print(f"Search failed for {kw}: {e}")
@@ -341,16 +724,33 @@ class TripNodes:
                         seen.add(a.name)
                         unique_places.append(a)
 
-                state["activity_places"] = unique_places[:5]
+                # 반경 밖 후보도 풀에 보관해 두고 반경 확대 시 재사용
+                self._remember_candidates(state, "activity", unique_places)
+                found = self._within_radius(unique_places, radius)[:5]
 
             # 2. 선호도가 없으면 기본 검색
             else:
-                places = await self.kakao_client.find_activity_places(location, radius)
-                state["activity_places"] = places
-
-            state["progress_messages"].append(f"✓ 활동 장소 {len(state['activity_places'])}개 발견")
+                places = await self._take_activity_prefetch(state, location)
+                if places is None:
+                    places = await self._search_activity_pool(location, state.get("starting_point"))
+                # 반경 밖 후보도 풀에 보관해 두고 반경 확대 시 재사용
+                self._remember_candidates(state, "activity", places)
+                found = self._within_radius(places, radius)[:self.MAX_ACTIVITY_PLACES]
+
+            if self._is_refining(state, "activity"):
+                found = self._unshown(state, "activity", found) or found
+
+            self._set_places(state, "activity_places", found)
+            add_event(state, f"✓ 활동 장소 {len(found)}개 발견")
             return state
 
+    @memoize_node(
+        "discover_dining_places", "search",
+        reads=("input_type", "starting_point", "activity_places[:3]", "user_food_preference",
+               "user_intent.dining_required", "user_intent.food_keywords"),
+        writes=("dining_places", "candidate_pools.dining", "place_distances.dining"),
+        bypass_on=("refine_food", "refine_place", "refine_region"),
+    )
     async def discover_dining_places(self, state: TripState) -> TripState:
         """식사 장소 검색"""
         async with self.log_context(state, "discover_dining_places", "search"):
@@ -358,21 +758,35 @@ class TripNodes:
             user_intent = state.get("user_intent")
             if user_intent and not user_intent.dining_required:
                 state["dining_places"] = []
-                state["progress_messages"].append("✓ 식사 장소 검색 건너뛰기 (사용자 요청)")
+                add_event(state, "✓ 식사 장소 검색 건너뛰기 (사용자 요청)")
                 return state
 
+            refining = self._is_refining(state, "dining")
+            selected = state.get("selected_places") or {}
+            size = self.CANDIDATE_SEARCH_SIZE
+            radius = self.STAGE_SEARCH_RADIUS["dining"]
             current_locations = []
 
             if state["input_type"] == "specific_place" and state.get("starting_point"):
                 current_locations = [state["starting_point"]]
+            elif state.get("refine_stage") == "dining" and selected.get("activity"):
+                # 식사만 수정: 고정된 활동 장소 기준으로 더 넓게 검색
+                current_locations = await self.place_store.amaterialize([selected["activity"]])
             elif state["activity_places"]:
-                current_locations = state["activity_places"][:3]
+                current_locations = await self.load_places(state, "activity_places", 3)
             else:
                 current_locations = []
 
             if not current_locations:
                 return state
 
+            # 수정 요청: 기존 후보 중 현재 기준 장소 주변에서 보여주지 않은 장소 우선 사용 (재검색 없음)
+            reused = await self._reuse_candidates(state, "dining", current_locations)
+            if reused:
+                self._set_places(state, "dining_places", reused[:5])
+                add_event(state, f"✓ 기존 후보에서 새 식사 장소 {len(state['dining_places'])}개 선택")
+                return state
+
             all_dining = []
 
             # 사용자 인텐트 키워드 체크
@@ -385,33 +799,33 @@ class TripNodes:
                     keyword_parts = [food_pref] + intent_keywords + ["맛집"]
                     keyword = " ".join(keyword_parts)
 
-                    state["progress_messages"].append(f"✓ '{keyword}' 검색")
+                    add_event(state, f"✓ '{keyword}' 검색")
 
                     places = await self.kakao_client.search_nearby_by_keyword(
                         keyword=keyword,
                         x=loc.x,
                         y=loc.y,
-                        radius=500,
-                        size=3
+                        radius=radius,
+                        size=size
                     )
                 elif intent_keywords:
                     # 키워드가 있는 경우 (예: "조용한 맛집")
                     keyword = " ".join(intent_keywords + ["맛집"])
-                    state["progress_messages"].append(f"✓ '{keyword}' 검색 (NLP 기반)")
+                    add_event(state, f"✓ '{keyword}' 검색 (NLP 기반)")
                     places = await self.kakao_client.search_nearby_by_keyword(
                         keyword=keyword,
                         x=loc.x,
                         y=loc.y,
-                        radius=500,
-                        size=3
+                        radius=radius,
+                        size=size
                     )
                 else:
                     # 기본 검색
                     places = await self.kakao_client.find_dining_places(
                         x=loc.x,
                         y=loc.y,
-                        radius=500,
-                        size=3
+                        radius=radius,
+                        size=size
                     )
                 all_dining.extend(places)
 
@@ -423,11 +837,30 @@ class TripNodes:
                     seen.add(r.name)
                     unique_dining.append(r)
 
-            state["dining_places"] = unique_dining[:5]
-            state["progress_messages"].append(f"✓ 식사 장소 {len(unique_dining)}개 발견")
+            # 기준 장소와의 거리, 선호/키워드 일치, 카테고리로 정렬 (후보 풀도 이 순서로 보관)
+            preference_terms = [food_pref] if food_pref and food_pref != "상관없음" else []
+            unique_dining = self.ranker.top_k(unique_dining, None, current_locations,
+                                              keywords=preference_terms + intent_keywords,
+                                              categories=["음식점"] + preference_terms)
+
+            self._remember_candidates(state, "dining", unique_dining)
+            if refining:
+                unique_dining = self._unshown(state, "dining", unique_dining)
+                if not unique_dining:
+                    add_event(state, "! 새로운 식사 장소를 찾지 못해 기존 추천을 유지합니다", EVENT_WARNING)
+                    return state
+
+            self._set_places(state, "dining_places", unique_dining[:5])
+            add_event(state, f"✓ 식사 장소 {len(unique_dining)}개 발견")
 
             return state
 
+    @memoize_node(
+        "discover_cafe_places", "search",
+        reads=("dining_places[:2]", "user_intent.cafe_required", "user_intent.cafe_keywords"),
+        writes=("cafe_places", "candidate_pools.cafe", "place_distances.cafe"),
+        bypass_on=("refine_cafe", "refine_region"),
+    )
     async def discover_cafe_places(self, state: TripState) -> TripState:
         """카페 검색"""
         async with self.log_context(state, "discover_cafe_places", "search"):
@@ -435,36 +868,50 @@ class TripNodes:
             user_intent = state.get("user_intent")
             if user_intent and not user_intent.cafe_required:
                 state["cafe_places"] = []
-                state["progress_messages"].append("✓ 카페 검색 건너뛰기 (사용자 요청)")
+                add_event(state, "✓ 카페 검색 건너뛰기 (사용자 요청)")
                 return state
 
             if not state["dining_places"]:
                 state["cafe_places"] = []
                 return state
 
-            target_places = state["dining_places"][:2]
+            refining = self._is_refining(state, "cafe")
+            selected = state.get("selected_places") or {}
+            size = self.CANDIDATE_SEARCH_SIZE
+            radius = self.STAGE_SEARCH_RADIUS["cafe"]
+            if state.get("refine_stage") == "cafe" and selected.get("dining"):
+                # 카페만 수정: 고정된 식사 장소 기준으로 더 많이 검색
+                target_places = await self.place_store.amaterialize([selected["dining"]])
+            else:
+                target_places = await self.load_places(state, "dining_places", 2)
+
+            # 수정 요청: 기존 후보 중 현재 식사 장소 주변에서 보여주지 않은 장소 우선 사용 (재검색 없음)
+            reused = await self._reuse_candidates(state, "cafe", target_places)
+            if reused:
+                self._set_places(state, "cafe_places", reused[:3])
+                add_event(state, f"✓ 기존 후보에서 새 카페 {len(state['cafe_places'])}개 선택")
+                return state
             all_cafes = []
+            # NLP 키워드 우선 (예: "조용한 카페")
+            intent_keywords = user_intent.cafe_keywords if user_intent else []
 
             for place in target_places:
-                # NLP 키워드 우선 (예: "조용한 카페")
-                intent_keywords = user_intent.cafe_keywords if user_intent else []
-
                 if intent_keywords:
                     keyword = " ".join(intent_keywords + ["카페"])
                     cafes = await self.kakao_client.search_nearby_by_keyword(
                         keyword=keyword,
                         x=place.x,
                         y=place.y,
-                        radius=300,
-                        size=2
+                        radius=radius,
+                        size=size
                     )
                 else:
                     # 기본 검색
                     cafes = await self.kakao_client.find_cafe_places(
                         x=place.x,
                         y=place.y,
-                        radius=300,
-                        size=2
+                        radius=radius,
+                        size=size
                     )
                 all_cafes.extend(cafes)
 
@@ -475,10 +922,27 @@ class TripNodes:
                     seen.add(c.name)
                     unique_cafes.append(c)
 
-            state["cafe_places"] = unique_cafes[:3]
-            state["progress_messages"].append(f"✓ 카페 {len(unique_cafes)}개 발견")
+            unique_cafes = self.ranker.top_k(unique_cafes, None, target_places,
+                                             keywords=intent_keywords, categories=["카페"])
+
+            self._remember_candidates(state, "cafe", unique_cafes)
+            if refining:
+                unique_cafes = self._unshown(state, "cafe", unique_cafes)
+                if not unique_cafes:
+                    add_event(state, "! 새로운 카페를 찾지 못해 기존 추천을 유지합니다", EVENT_WARNING)
+                    return state
+
+            self._set_places(state, "cafe_places", unique_cafes[:3])
+            add_event(state, f"✓ 카페 {len(unique_cafes)}개 발견")
             return state
 
+    @memoize_node(
+        "discover_drinking_places", "search",
+        reads=("cafe_places[:2]", "dining_places[:2]", "user_intent.drinking_required",
+               "user_intent.drinking_preference", "user_intent.drinking_keywords"),
+        writes=("drinking_places", "candidate_pools.drinking", "place_distances.drinking"),
+        bypass_on=("refine_region",),
+    )
     async def discover_drinking_places(self, state: TripState) -> TripState:
         """술집 검색"""
         async with self.log_context(state, "discover_drinking_places", "search"):
@@ -486,35 +950,41 @@ class TripNodes:
             user_intent = state.get("user_intent")
             if user_intent and not user_intent.drinking_required:
                 state["drinking_places"] = []
-                state["progress_messages"].append("✓ 술집 검색 건너뛰기 (사용자 요청)")
+                add_event(state, "✓ 술집 검색 건너뛰기 (사용자 요청)")
                 return state
-        
+
+            radius = self.STAGE_SEARCH_RADIUS["drinking"]
             targets = []
             if state["cafe_places"]:
-                targets = state["cafe_places"][:2]
+                targets = await self.load_places(state, "cafe_places", 2)
             elif state["dining_places"]:
-                targets = state["dining_places"][:2]
+                targets = await self.load_places(state, "dining_places", 2)
 
             if not targets:
                 state["drinking_places"] = []
                 return state
 
+            # 전체 다시 짜기: 기존 후보 중 새 카페/식사 장소 주변에서 보여주지 않은 장소 사용 (재검색 없음)
+            reused = await self._reuse_candidates(state, "drinking", targets)
+            if reused:
+                self._set_places(state, "drinking_places", reused[:3])
+                add_event(state, f"✓ 기존 후보에서 새 술집/바 {len(state['drinking_places'])}개 선택")
+                return state
+
             all_bars = []
-            for target in targets:
-                # NLP 키워드 우선 (예: "칵테일바", "루프탑")
-                intent_keywords = user_intent.drinking_keywords if user_intent else []
-                preference = user_intent.drinking_preference if user_intent else "술집"
-                if not preference or preference == "none": preference = "술집"
+            # NLP 키워드 우선 (예: "칵테일바", "루프탑")
+            intent_keywords = user_intent.drinking_keywords if user_intent else []
+            preference = user_intent.drinking_preference if user_intent else "술집"
+            if not preference or preference == "none": preference = "술집"
+            keyword = " ".join([preference] + intent_keywords)
 
-                keyword_parts = [preference] + intent_keywords
-                keyword = " ".join(keyword_parts)
-            
+            for target in targets:
                 bars = await self.kakao_client.search_nearby_by_keyword(
                     keyword=keyword,
                     x=target.x,
                     y=target.y,
-                    radius=300,
-                    size=2
+                    radius=radius,
+                    size=self.CANDIDATE_SEARCH_SIZE
                 )
                 all_bars.extend(bars)
 
@@ -525,15 +995,33 @@ class TripNodes:
                     seen.add(b.name)
                     unique_bars.append(b)
 
-            state["drinking_places"] = unique_bars[:3]
-            state["progress_messages"].append(f"✓ 술집/바 {len(unique_bars)}개 발견")
+            unique_bars = self.ranker.top_k(unique_bars, None, targets, keywords=[preference] + intent_keywords,
+                                            categories=["술집", preference])
+
+            self._remember_candidates(state, "drinking", unique_bars)
+            if self._is_refining(state, "drinking"):
+                unique_bars = self._unshown(state, "drinking", unique_bars) or unique_bars
+
+            self._set_places(state, "drinking_places", unique_bars[:3])
+            add_event(state, f"✓ 술집/바 {len(unique_bars)}개 발견")
             return state
 
     async def generate_itinerary(self, state: TripState) -> TripState:
         """⏰ 시간표가 포함된 여행 일정 생성"""
-        async with self.log_context(state, "generate_itinerary", "generation"):
+        async with self.log_context(state, "generate_itinerary", "generation") as node_log:
             places = []
 
+            # 부분 수정이면 수정 대상이 아닌 단계는 현재 일정의 장소로 고정
+            refine_stage = state.get("refine_stage")
+            pinned = {}
+            if refine_stage in ("dining", "cafe"):
+                for stage, place_id in (state.get("selected_places") or {}).items():
+                    record = await self.place_store.aget(place_id) if stage != refine_stage else None
+                    if record:
+                        pinned[stage] = record.to_location()
+                node_log.update({"refine_stage": refine_stage, "pinned": sorted(pinned)})
+                add_event(state, f"✓ {refine_stage} 단계만 다시 최적화 (나머지 장소 고정)")
+
             # 장소 수집
             if state["input_type"] == "specific_place" and state.get("starting_point"):
                 # 시작점이 고정된 경우
@@ -548,9 +1036,10 @@ class TripNodes:
                 optimized = self.time_calc.find_optimized_path(
                     start_point,
                     [], # activities (시작점이 엑티비티라면 제외) -> 로직상 분리 필요하지만 복잡도 줄이기 위해 공백
-                    state["dining_places"],
-                    state["cafe_places"],
-                    state["drinking_places"]
+                    await self.load_places(state, "dining_places"),
+                    await self.load_places(state, "cafe_places"),
+                    await self.load_places(state, "drinking_places"),
+                    pinned={stage: place for stage, place in pinned.items() if stage != "activity"}
                 )
                 places.extend(optimized)
             
@@ -559,15 +1048,24 @@ class TripNodes:
                 # 시작점이 없으므로 첫 번째 장소가 기준이 됨 (find_optimized_path 내부 로직에 맡김 or None)
                 places = self.time_calc.find_optimized_path(
                     None,
-                    state["activity_places"],
-                    state["dining_places"],
-                    state["cafe_places"],
-                    state["drinking_places"]
+                    await self.load_places(state, "activity_places"),
+                    await self.load_places(state, "dining_places"),
+                    await self.load_places(state, "cafe_places"),
+                    await self.load_places(state, "drinking_places"),
+                    pinned=pinned
                 )
 
             if not places:
                 return state
 
+            # 선택된 장소 기록 (다음 부분 수정 시 고정 / 제외 대상)
+            state["selected_places"] = {place_type: self.place_store.add(location) for place_type, location in places}
+            shown = {stage: list(names) for stage, names in (state.get("shown_places") or {}).items()}
+            for place_type, location in places:
+                if location.name not in shown.setdefault(place_type, []):
+                    shown[place_type].append(location.name)
+            state["shown_places"] = shown
+
             # ⏰ 시간 설정 확인
             time_settings = state.get("time_settings")
 
@@ -632,7 +1130,7 @@ class TripNodes:
                     if item.travel_to_next:
                         summary += f"   🚶 다음 장소까지: {item.travel_to_next.description}\n"
 
-                state["progress_messages"].append(summary)
+                add_event(state, summary, EVENT_ITINERARY, data={"stops": len(itinerary)})
             else:
                 # 시간 설정이 없을 때는 기존 방식
                 itinerary = []
@@ -651,62 +1149,65 @@ class TripNodes:
                     summary += f"{item.order}. {item.location.name} ({item.location.category})\n"
                     summary += f"   📍 {item.location.address}\n"
 
-                state["progress_messages"].append(summary)
+                add_event(state, summary, EVENT_ITINERARY, data={"stops": len(itinerary)})
 
-            state["progress_messages"].append(f"✓ 최종 일정 생성 완료")
+            add_event(state, f"✓ 최종 일정 생성 완료")
             return state
 
     async def request_refinement_feedback(self, state: TripState) -> TripState:
         """일정 확인 및 수정 요청"""
         msg = "생성된 일정이 마음에 드시나요? '완료'라고 하시면 종료하고, 수정하고 싶다면 '카페 바꿔줘', '음식점 다른 곳' 등으로 말씀해주세요."
-        state["progress_messages"].append(msg)
+        add_event(state, msg, EVENT_QUESTION, node="request_refinement_feedback")
         return state
 
     async def validate_itinerary_quality(self, state: TripState) -> TripState:
         """일정 품질 검증"""
-        feedback = state.get("user_feedback")
-        if feedback:
-            msgs = [
-                SystemMessage(content="""
-                사용자 피드백을 분석하세요.
-                - 음식점 변경 -> ACTION: refine_food
-                - 카페 변경 -> ACTION: refine_cafe
-                - 전체 다시 -> ACTION: refine_region
-                - 완료/좋음 -> ACTION: complete
-
-                응답 형식: ACTION: [action_code]
-                """),
-                HumanMessage(content=feedback)
-            ]
-            content = await self._call_llm(state, msgs)
-
-            action = "complete"
-            if "refine_food" in content:
-                action = "refine_food"
-            elif "refine_cafe" in content:
-                action = "refine_cafe"
-            elif "refine_region" in content:
-                action = "refine_region"
-
-            state["next_action"] = action
-            state["progress_messages"].append(f"✓ 피드백 반영: {action}")
-            state["user_feedback"] = None
-
-            if action != "complete":
+        async with self.log_context(state, "validate_itinerary_quality", "validation") as node_log:
+            feedback = state.get("user_feedback")
+            if feedback:
+                # 1. 로컬 분류기 (확신도가 낮을 때만 LLM 사용)
+                action, confidence = self.feedback_classifier.classify(feedback)
+                node_log.update({"feedback_source": "classifier", "classifier_confidence": confidence})
+
+                if not self.feedback_classifier.is_confident(confidence):
+                    msgs = [
+                        SystemMessage(content=FEEDBACK_CLASSIFICATION_SYSTEM.render()),
+                        HumanMessage(content=feedback)
+                    ]
+                    content = await self._call_llm(state, msgs, task="feedback_classification",
+                                                   priority=PRIORITY_INTERACTIVE)
+                    action = parse_action(content) or "complete"
+                    node_log["feedback_source"] = "llm"
+                    if self.engine and parse_action(content):
+                        # 다음 학습에 쓰도록 판단 결과 기록 (generations 본문은 full 수준에서만 남으므로 따로 보관)
+                        self.feedback_classifier.record_label(self.engine, feedback, action, state.get("workflow_id"))
+
+                print(f"[FEEDBACK] '{feedback}' -> {action} ({node_log['feedback_source']}, confidence={confidence})")
+
+                state["next_action"] = action
+                state["refine_stage"] = self.REFINE_STAGES.get(action)
+                add_event(state, f"✓ 피드백 반영: {action}")
+                state["user_feedback"] = None
+
+                if action != "complete":
+                    state["needs_refinement"] = True
+                    return state
+
+            # 반경 확대 재검색은 모든 단계를 새로 계산
+            state["refine_stage"] = None
+            next_radius = await self._next_radius(state) if len(state["final_itinerary"]) < 2 else None
+            if next_radius:
                 state["needs_refinement"] = True
-                return state
-
-        if len(state["final_itinerary"]) < 2 and state["search_radius"] < 5000:
-            state["needs_refinement"] = True
-            state["search_radius"] += 1000
-            state["progress_messages"].append(f"! 검색 결과 부족, 반경 확대: {state['search_radius']}m")
-            state["next_action"] = "refine_region"
-        else:
-            state["needs_refinement"] = False
-            state["next_action"] = "complete"
-            state["progress_messages"].append("✓ 일정 생성 완료")
+                state["search_radius"] = next_radius
+                add_event(state, f"! 검색 결과 부족, 반경 확대: {state['search_radius']}m", EVENT_WARNING,
+                          data={"search_radius": state["search_radius"]})
+                state["next_action"] = "refine_region"
+            else:
+                state["needs_refinement"] = False
+                state["next_action"] = "complete"
+                add_event(state, "✓ 일정 생성 완료")
 
-        return state
+            return state
 
     def determine_next_step(self, state: TripState) -> str:
         """다음 단계 결정"""
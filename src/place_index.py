@@ -0,0 +1,159 @@
+"""
+장소 이름 자동완성 인덱스
+이름/별칭을 자모 단위로 분해해 정렬 배열에 넣고 이분 탐색으로 접두어 범위를 찾음
+("호" -> 홍대, "홍ㄷ" -> 홍대, 초성 "ㅎㄷ" -> 홍대)
+"""
+import bisect
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from gazetteer import Gazetteer, Region
+from models import Location
+
+# 한글 음절 분해용 자모 (호환용 자모)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+              "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 겹받침/겹모음은 입력 중간 상태("닭" 입력 중 "달")와도 맞도록 낱자로 풀어 씀
+_COMPOUND = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ",
+    "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ", "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ",
+    "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+}
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+
+
+def _expand(jamo: str) -> str:
+    return _COMPOUND.get(jamo, jamo)
+
+
+def decompose(text: str) -> str:
+    """자모 단위 검색 키 (공백 제거, 소문자)"""
+    keys = []
+    for char in "".join(text.lower().split()):
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            offset = code - _HANGUL_BASE
+            keys.append(_CHOSEONG[offset // 588])
+            keys.append(_expand(_JUNGSEONG[(offset % 588) // 28]))
+            keys.append(_expand(_JONGSEONG[offset % 28]))
+        else:
+            keys.append(_expand(char))
+    return "".join(keys)
+
+
+def initials(text: str) -> Optional[str]:
+    """초성 검색 키 ("홍대입구" -> "ㅎㄷㅇㄱ"). 한글이 아닌 글자가 있으면 None"""
+    keys = []
+    for char in "".join(text.split()):
+        code = ord(char)
+        if not _HANGUL_BASE <= code <= _HANGUL_LAST:
+            return None
+        keys.append(_CHOSEONG[(code - _HANGUL_BASE) // 588])
+    return "".join(keys)
+
+
+def _is_initials_query(text: str) -> bool:
+    return bool(text) and all(char in _CHOSEONG for char in text)
+
+
+def place_entry(place: Location) -> dict:
+    """자동완성 항목 (starting_point로 그대로 보낼 수 있는 Location 필드 포함)"""
+    return {
+        "id": place.id,
+        "name": place.name,
+        "kind": "place",
+        "category": place.category,
+        "address": place.address,
+        "x": place.x,
+        "y": place.y,
+        "phone": place.phone,
+        "place_url": place.place_url,
+    }
+
+
+class PlaceIndex:
+    """정렬 배열 기반 접두어 인덱스
+
+    - 지역(지명 사전)과 장소(검색 결과 Location)를 같은 배열에 보관
+    - 조회: bisect로 접두어 범위를 찾은 뒤 정확히 일치, 지역, 짧은 이름 순으로 정렬
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._keys: List[Tuple[str, int]] = []  # (검색 키, 항목 번호) 정렬 배열
+        self._initial_keys: List[Tuple[str, int]] = []  # 초성 키
+        self._entries: List[dict] = []
+        self._by_name: Dict[Tuple[str, str], int] = {}  # (이름, 주소) -> 항목 번호
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add_entry(self, entry: dict, aliases: List[str]) -> bool:
+        identity = (entry["name"], entry.get("address") or "")
+        if identity in self._by_name or len(self._entries) >= self.max_entries:
+            return False
+
+        entry_id = len(self._entries)
+        self._entries.append(entry)
+        self._by_name[identity] = entry_id
+        for text in [entry["name"]] + aliases:
+            bisect.insort(self._keys, (decompose(text), entry_id))
+            initial_key = initials(text)
+            if initial_key:
+                bisect.insort(self._initial_keys, (initial_key, entry_id))
+        return True
+
+    def add_region(self, region: Region, aliases: Sequence[str] = ()) -> bool:
+        """지명 사전 항목 추가 (별칭도 같은 항목으로 검색됨)"""
+        entry = {
+            "name": region.name,
+            "kind": "region",
+            "category": region.kind,
+            "address": region.district,
+            "x": region.x,
+            "y": region.y,
+        }
+        return self._add_entry(entry, [alias for alias in aliases if alias != region.name])
+
+    def add_gazetteer(self, gazetteer: Gazetteer) -> int:
+        aliases: Dict[str, List[str]] = defaultdict(list)
+        for alias, name in gazetteer.aliases():
+            aliases[name].append(alias)
+        return sum(1 for region in gazetteer.regions.values() if self.add_region(region, aliases[region.name]))
+
+    def add_place(self, place: Location) -> bool:
+        return self._add_entry(place_entry(place), [])
+
+    def add_places(self, places: List[Location]) -> int:
+        return sum(1 for place in places if self.add_place(place))
+
+    @staticmethod
+    def _prefix_range(keys: List[Tuple[str, int]], prefix: str) -> List[int]:
+        start = bisect.bisect_left(keys, (prefix, -1))
+        matches = []
+        for position in range(start, len(keys)):
+            key, entry_id = keys[position]
+            if not key.startswith(prefix):
+                break
+            matches.append(entry_id)
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """접두어로 항목 검색 (자모 단위 부분 입력, 초성 입력 지원)"""
+        query = "".join(query.split())
+        if not query:
+            return []
+
+        if _is_initials_query(query):
+            matched = self._prefix_range(self._initial_keys, query)
+        else:
+            matched = self._prefix_range(self._keys, decompose(query))
+
+        # 이름이 정확히 같은 항목 -> 지역 -> 짧은 이름 순
+        unique_ids = list(dict.fromkeys(matched))
+        unique_ids.sort(key=lambda i: (self._entries[i]["name"] != query, self._entries[i]["kind"] != "region",
+                                       len(self._entries[i]["name"]), self._entries[i]["name"]))
+        return [dict(self._entries[i]) for i in unique_ids[:limit]]
@@ -0,0 +1,209 @@
+"""
+공유 장소 저장소
+검색된 장소를 Kakao 장소 ID 기준으로 프로세스당 한 번만 보관하고 TripState에는 ID만 저장
+(체크포인트, nodes.state_data에 같은 Location이 반복 저장되지 않음). Location 객체는 노드 계산과 API 응답 직전에만 생성
+다른 워커가 세션을 이어받을 수 있도록 새 장소는 places 테이블에도 기록 (db_writer 큐를 거쳐 백그라운드에서 기록)
+요청 처리 중(이벤트 루프)에는 aget()/amaterialize()/aprefetch()로 메모리에 없는 장소를 비동기로 조회
+"""
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from database import get_session, run_session, Place
+from db_writer import get_db_writer
+from models import Location
+
+
+class PlaceRecord:
+    """장소 정보 (거리처럼 검색 기준점에 따라 달라지는 값은 제외)"""
+    __slots__ = ("id", "name", "category", "address", "x", "y", "phone", "place_url")
+
+    def __init__(self, place_id: str, name: str, category: Optional[str], address: Optional[str], x: float, y: float,
+                 phone: Optional[str] = None, place_url: Optional[str] = None):
+        self.id = place_id
+        self.name = name
+        self.category = category
+        self.address = address
+        self.x = x
+        self.y = y
+        self.phone = phone
+        self.place_url = place_url
+
+    @classmethod
+    def from_location(cls, place_id: str, place: Location) -> "PlaceRecord":
+        return cls(place_id, place.name, place.category, place.address, place.x, place.y, place.phone, place.place_url)
+
+    def to_location(self, distance: Optional[int] = None) -> Location:
+        return Location(
+            id=self.id,
+            name=self.name,
+            category=self.category or "",
+            address=self.address or "",
+            x=self.x,
+            y=self.y,
+            phone=self.phone,
+            place_url=self.place_url,
+            distance=distance
+        )
+
+
+def place_key(place: Location) -> str:
+    """장소 ID (Kakao ID가 없는 장소는 이름/주소/좌표 해시)"""
+    if place.id:
+        return place.id
+    material = f"{place.name}\x1f{place.address}\x1f{place.x:.6f}\x1f{place.y:.6f}"
+    return "local:" + hashlib.sha1(material.encode("utf-8")).hexdigest()[:20]
+
+
+def state_place_ids(values: dict) -> List[str]:
+    """state가 참조하는 장소 ID (카테고리별 목록, 단계별 후보 목록, 선택 장소. shown_places는 장소 이름이라 제외)"""
+    place_ids = []
+    for key in ("activity_places", "dining_places", "cafe_places", "drinking_places"):
+        place_ids.extend(values.get(key) or [])
+    for ids in (values.get("candidate_pools") or {}).values():
+        place_ids.extend(ids or [])
+    place_ids.extend(place_id for place_id in (values.get("selected_places") or {}).values() if place_id)
+    return place_ids
+
+
+class PlaceStore:
+    """장소 ID -> PlaceRecord (메모리 LRU + places 테이블)"""
+
+    def __init__(self, engine=None, max_entries: Optional[int] = None, async_engine=None):
+        self.engine = engine
+        self.async_engine = async_engine
+        self.max_entries = max_entries or int(os.getenv("PLACE_STORE_MAX_ENTRIES", "50000"))
+        self._records: "OrderedDict[str, PlaceRecord]" = OrderedDict()
+        self.db_loads = 0
+        self.missing = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _remember(self, record: PlaceRecord):
+        self._records[record.id] = record
+        self._records.move_to_end(record.id)
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    def add_many(self, places: Iterable[Location]) -> List[str]:
+        """장소 등록 후 ID 목록 반환 (처음 보는 장소만 DB에 기록)"""
+        ids = []
+        new_records: Dict[str, PlaceRecord] = {}
+        for place in places:
+            place_id = place_key(place)
+            ids.append(place_id)
+            if place_id in self._records:
+                self._records.move_to_end(place_id)
+            elif place_id not in new_records:
+                new_records[place_id] = PlaceRecord.from_location(place_id, place)
+
+        for record in new_records.values():
+            self._remember(record)
+        if new_records:
+            self._save(list(new_records.values()))
+        return ids
+
+    def add(self, place: Location) -> str:
+        return self.add_many([place])[0]
+
+    def _save(self, records: List[PlaceRecord]):
+        if not self.engine:
+            return
+
+        # 다른 워커가 세션을 이어받을 때 필요하므로 큐가 가득 차도 버리지 않음
+        writer = get_db_writer(self.engine)
+        for r in records:
+            writer.merge(Place, {
+                "id": r.id, "name": r.name, "category": r.category, "address": r.address, "x": r.x, "y": r.y,
+                "phone": r.phone, "place_url": r.place_url
+            }, critical=True)
+
+    @staticmethod
+    def _query_places(session, place_ids: List[str]) -> List[PlaceRecord]:
+        return [
+            PlaceRecord(row.id, row.name, row.category, row.address, row.x, row.y, row.phone, row.place_url)
+            for row in session.query(Place).filter(Place.id.in_(place_ids)).all()
+        ]
+
+    def _remember_loaded(self, records: List[PlaceRecord]):
+        for record in records:
+            self._remember(record)
+            self.db_loads += 1
+
+    def _load(self, place_ids: List[str]):
+        """메모리에 없는 장소를 places 테이블에서 한 번에 조회 (다른 워커가 찾은 장소)"""
+        if not self.engine or not place_ids:
+            return
+
+        session = get_session(self.engine)
+        try:
+            self._remember_loaded(self._query_places(session, place_ids))
+        except Exception as e:
+            print(f"[PLACE STORE ERROR] Load: {e}")
+        finally:
+            session.close()
+
+    async def aprefetch(self, place_ids: Iterable[str]):
+        """메모리에 없는 장소를 비동기로 미리 조회 (이벤트 루프를 막지 않음)"""
+        missing = list(dict.fromkeys(place_id for place_id in place_ids if place_id not in self._records))
+        if not self.engine or not missing:
+            return
+
+        try:
+            records = await run_session(self._query_places, missing, async_engine=self.async_engine,
+                                        engine=self.engine)
+            self._remember_loaded(records)
+        except Exception as e:
+            print(f"[PLACE STORE ERROR] Prefetch: {e}")
+
+    def get(self, place_id: str) -> Optional[PlaceRecord]:
+        """장소 조회 (메모리에 없으면 DB를 동기로 조회하므로 이벤트 루프 밖에서만 사용, 요청 처리 중에는 aget)"""
+        record = self._records.get(place_id)
+        if record is None:
+            self._load([place_id])
+            record = self._records.get(place_id)
+        return record
+
+    async def aget(self, place_id: str) -> Optional[PlaceRecord]:
+        """장소 조회 (메모리에 없으면 비동기로 DB 조회)"""
+        record = self._records.get(place_id)
+        if record is None:
+            await self.aprefetch([place_id])
+            record = self._records.get(place_id)
+        return record
+
+    def _locations(self, place_ids: List[str], distances: Optional[Dict[str, int]]) -> List[Location]:
+        """메모리에 있는 장소만 Location으로 변환 (순서 유지, 찾을 수 없는 ID는 제외)"""
+        distances = distances or {}
+        places = []
+        for place_id in place_ids:
+            record = self._records.get(place_id)
+            if record is None:
+                self.missing += 1
+                print(f"[PLACE STORE] Unknown place id: {place_id}")
+                continue
+            places.append(record.to_location(distances.get(place_id)))
+        return places
+
+    def materialize(self, place_ids: Optional[Iterable[str]],
+                    distances: Optional[Dict[str, int]] = None) -> List[Location]:
+        """ID 목록 -> Location 목록 (DB 동기 조회, 이벤트 루프 밖에서만 사용. 요청 처리 중에는 amaterialize)"""
+        place_ids = list(place_ids or [])
+        self._load([place_id for place_id in place_ids if place_id not in self._records])
+        return self._locations(place_ids, distances)
+
+    async def amaterialize(self, place_ids: Optional[Iterable[str]],
+                           distances: Optional[Dict[str, int]] = None) -> List[Location]:
+        """ID 목록 -> Location 목록 (메모리에 없는 장소는 비동기로 DB 조회)"""
+        place_ids = list(place_ids or [])
+        await self.aprefetch(place_ids)
+        return self._locations(place_ids, distances)
+
+    def to_dict(self) -> dict:
+        return {
+            "entries": len(self._records),
+            "db_loads": self.db_loads,
+            "missing": self.missing,
+        }
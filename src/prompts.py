@@ -0,0 +1,129 @@
+"""
+프롬프트 템플릿 레지스트리
+모듈 로드 시 한 번만 들여쓰기/공백을 정리해 두고, 고정 지시문을 앞에 변수 부분을 뒤에 배치해
+Ollama가 같은 접두부(prefix)의 KV 캐시를 재사용할 수 있게 함
+"""
+import string
+import textwrap
+from typing import Dict, List, Optional
+
+
+def normalize_prompt(text: str) -> str:
+    """들여쓰기 제거, 줄 끝 공백 제거, 연속 빈 줄 축소"""
+    lines = [line.strip() for line in textwrap.dedent(text).strip().splitlines()]
+    normalized: List[str] = []
+    for line in lines:
+        if not line and normalized and not normalized[-1]:
+            continue
+        normalized.append(line)
+    return "\n".join(normalized)
+
+
+class PromptTemplate:
+    """미리 정규화된 프롬프트 템플릿 + 토큰 사용량 집계"""
+
+    def __init__(self, name: str, template: str):
+        self.name = name
+        self.text = normalize_prompt(template)
+        self.fields = [field for _, field, _, _ in string.Formatter().parse(self.text) if field]
+        if not self.fields:
+            # 변수가 없으면 {{ }} 이스케이프를 한 번만 풀어 두고 render()에서는 그대로 반환
+            self.text = self.text.format()
+        # 첫 변수 이전까지는 모든 호출에서 동일 (prefix 캐시 대상)
+        first_field = self.text.find("{" + self.fields[0]) if self.fields else -1
+        self.static_prefix = self.text if first_field < 0 else self.text[:first_field].format()
+
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.measured_calls = 0
+
+    def render(self, **kwargs) -> str:
+        if not self.fields:
+            return self.text
+        return self.text.format(**kwargs)
+
+    def record_usage(self, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        self.calls += 1
+        if prompt_tokens is None:
+            return
+        self.measured_calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens or 0
+
+    def to_dict(self) -> dict:
+        measured = self.measured_calls or 1
+        return {
+            "chars": len(self.text),
+            "static_prefix_chars": len(self.static_prefix),
+            "calls": self.calls,
+            "avg_prompt_tokens": round(self.prompt_tokens / measured, 1) if self.measured_calls else None,
+            "avg_completion_tokens": round(self.completion_tokens / measured, 1) if self.measured_calls else None,
+        }
+
+
+class PromptRegistry:
+    """이름(= _call_llm의 task)으로 템플릿을 찾는 레지스트리"""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, name: str, template: str) -> PromptTemplate:
+        prompt = PromptTemplate(name, template)
+        self._templates[name] = prompt
+        return prompt
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def record_usage(self, name: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+        prompt = self._templates.get(name)
+        if prompt:
+            prompt.record_usage(prompt_tokens, completion_tokens)
+
+    def to_dict(self) -> dict:
+        return {name: prompt.to_dict() for name, prompt in self._templates.items()}
+
+
+PROMPTS = PromptRegistry()
+
+# 의도 분석 (사용자 발화는 HumanMessage로만 전달)
+INTENT_SYSTEM = PROMPTS.register("intent", """
+    당신은 여행 계획 전문가입니다. 사용자의 자연어 입력을 분석하여 구조화된 JSON 데이터로 변환하세요.
+
+    [지시 사항]
+    1. 사용자 발화에서 지역, 활동, 음식, 카페, 술집 관련 정보를 추출하세요.
+    2. 명시되지 않은 항목은 required=true로 설정하여 추천받도록 합니다.
+    3. "필요 없어", "안 갈래" 등의 부정 표현이 있으면 required=false로 설정하세요.
+    4. location 필드를 가장 먼저 출력하세요.
+
+    [JSON 응답 형식]
+    {{"location": "지역명 또는 장소명",
+    "activity": {{"required": true/false, "preference": "구체적 활동 (예: 보드게임, 방탈출) 또는 null", "keywords": ["키워드1", "키워드2"]}},
+    "dining": {{"required": true/false, "preference": "음식 종류 (예: 한식, 파스타) 또는 null", "keywords": ["키워드1", "키워드2"]}},
+    "cafe": {{"required": true/false, "preference": "선호도 또는 null", "keywords": ["키워드1", "키워드2"]}},
+    "drinking": {{"required": true/false, "preference": "술집 종류 (예: 이자카야, 칵테일바) 또는 null", "keywords": ["키워드1", "키워드2"]}}
+    }}
+""")
+
+# 활동 키워드 확장 (고정 지시문은 system, 지역/선호는 user)
+KEYWORD_EXPANSION_SYSTEM = PROMPTS.register("keyword_expansion", """
+    주어진 지역에서 선호 활동과 관련된 장소를 찾기 위한 검색 키워드 3개를 쉼표로 구분하여 나열하세요.
+    다른 설명 없이 오직 키워드만 반환하세요.
+    예시: 홍대 보드게임, 홍대 보드게임카페, 홍대 데이트
+""")
+KEYWORD_EXPANSION_USER = PromptTemplate("keyword_expansion_user", """
+    지역: {location}
+    선호 활동: {preference}
+""")
+
+# 피드백 분류 (로컬 분류기 확신도가 낮을 때만 사용)
+FEEDBACK_CLASSIFICATION_SYSTEM = PROMPTS.register("feedback_classification", """
+    사용자 피드백을 분석하세요.
+    - 음식점 변경 -> ACTION: refine_food
+    - 카페 변경 -> ACTION: refine_cafe
+    - 전체 다시 -> ACTION: refine_region
+    - 완료/좋음 -> ACTION: complete
+
+    응답 형식: ACTION: [action_code]
+""")
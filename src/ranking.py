@@ -0,0 +1,105 @@
+"""
+후보 장소 랭킹
+검색된 후보 전체를 NumPy 특징 배열(기준 장소와의 거리, 키워드 일치, 카테고리 적합도)로 한 번에 점수화하고
+가중합 상위 k개를 반환. 가중치는 RANKING_WEIGHTS 환경변수로 조정 (예: "distance=0.5,keyword=0.3,category=0.2")
+"""
+import os
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from models import Location
+from taxonomy import CategoryTaxonomy, get_taxonomy
+
+# 위도 37.5도 부근의 경도/위도 1도당 거리 (m)
+_METERS_PER_DEG_LAT = 110_940.0
+_METERS_PER_DEG_LON = 88_200.0
+
+
+class RankingWeights(NamedTuple):
+    """특징별 가중치"""
+    distance: float = 0.5
+    keyword: float = 0.3
+    category: float = 0.2
+
+    @classmethod
+    def from_env(cls) -> "RankingWeights":
+        weights = cls()._asdict()
+        for item in os.getenv("RANKING_WEIGHTS", "").split(","):
+            name, _, value = item.partition("=")
+            name = name.strip()
+            if name in weights and value.strip():
+                weights[name] = float(value)
+        return cls(**weights)
+
+
+def anchor_distances(places: List[Location], anchors: List[Location]) -> np.ndarray:
+    """각 후보에서 가장 가까운 기준 장소까지의 거리 (m, 기준 장소가 없으면 inf)"""
+    coords = np.array([(p.x, p.y) for p in places], dtype=float).reshape(-1, 2)
+    if not anchors:
+        return np.full(len(places), np.inf)
+    anchor_coords = np.array([(a.x, a.y) for a in anchors], dtype=float)
+    delta = coords[:, None, :] - anchor_coords[None, :, :]
+    meters = np.hypot(delta[..., 0] * _METERS_PER_DEG_LON, delta[..., 1] * _METERS_PER_DEG_LAT)
+    return meters.min(axis=1)
+
+
+def _match_ratio(texts: np.ndarray, terms: Sequence[str]) -> np.ndarray:
+    """각 텍스트에 포함된 검색어 비율 (검색어가 없으면 0)"""
+    terms = list(dict.fromkeys(term for term in terms if term))
+    if not terms or texts.size == 0:
+        return np.zeros(texts.shape[0])
+    found = np.char.find(texts[:, None], np.array(terms)[None, :]) >= 0
+    return found.mean(axis=1)
+
+
+class PlaceRanker:
+    """후보 풀 점수화 및 상위 k개 선택"""
+
+    def __init__(self, weights: Optional[RankingWeights] = None, distance_scale: Optional[float] = None,
+                 taxonomy: Optional[CategoryTaxonomy] = None):
+        self.weights = weights or RankingWeights.from_env()
+        self.taxonomy = taxonomy or get_taxonomy()
+        # 기준 장소에서 이 거리(m)만큼 떨어지면 거리 점수가 1/e로 감소
+        self.distance_scale = distance_scale or float(os.getenv("RANKING_DISTANCE_SCALE", "400"))
+
+    def features(self, places: List[Location], anchors: List[Location], keywords: Sequence[str],
+                 categories: Sequence[str]) -> np.ndarray:
+        """(후보 수, 3) 특징 배열: 거리 점수, 키워드 일치율, 카테고리 적합도 (모두 0~1)"""
+        if anchors:
+            distance = np.exp(-anchor_distances(places, anchors) / self.distance_scale)
+        else:
+            distance = np.zeros(len(places))
+
+        texts = np.array([f"{p.name} {p.category}" for p in places], dtype=str)
+        return np.column_stack([
+            distance,
+            _match_ratio(texts, keywords),
+            self._category_fit(places, categories),
+        ])
+
+    def _category_fit(self, places: List[Location], categories: Sequence[str]) -> np.ndarray:
+        """지정한 카테고리(예: "음식점", "한식") 중 후보가 하위에 속하는 비율"""
+        terms = list(dict.fromkeys(term for term in categories if term))
+        if not terms:
+            return np.zeros(len(places))
+        codes = self.taxonomy.codes(p.category for p in places)
+        fits = [self.taxonomy.under_mask(codes, self.taxonomy.lookup(term)) for term in terms]
+        return np.mean(fits, axis=0)
+
+    def score(self, places: List[Location], anchors: List[Location], keywords: Sequence[str] = (),
+              categories: Sequence[str] = ()) -> np.ndarray:
+        if not places:
+            return np.zeros(0)
+        return self.features(places, anchors, keywords, categories) @ np.array(self.weights, dtype=float)
+
+    def top_k(self, places: List[Location], k: Optional[int], anchors: List[Location],
+              keywords: Sequence[str] = (), categories: Sequence[str] = ()) -> List[Location]:
+        """점수 내림차순 상위 k개 (동점이면 Kakao 검색 순서 유지, k=None이면 전체 정렬)"""
+        if not places:
+            return []
+        scores = self.score(places, anchors, keywords, categories)
+        order = np.argsort(-scores, kind="stable")
+        if k is not None:
+            order = order[:k]
+        return [places[i] for i in order]
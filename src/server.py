@@ -1,22 +1,38 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, AsyncIterator, Tuple
+from contextlib import asynccontextmanager
 import sys
 import os
+import json
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from agent import TripPlannerAgent
-from models import TimeSettings
+from models import Location, TimeSettings
+from prompts import PROMPTS
+
+agent = TripPlannerAgent()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """워커 시작 시 공유 체크포인트 저장소 연결 및 모델 미리 로드, 종료 시 정리"""
+    await agent.setup()
+    # 첫 요청이 모델 로드를 기다리지 않도록 트래픽을 받기 전에 로드 (실패해도 서버는 시작)
+    await agent.warm_up()
+    yield
+    await agent.aclose()
+
 
 app = FastAPI(
     title="Seoul Trip Planner API",
     description="자연어 기반 서울 여행 일정 생성 API",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
-agent = TripPlannerAgent()
-
 
 class TripPlanRequest(BaseModel):
     """여행 계획 요청"""
@@ -25,6 +41,7 @@ class TripPlanRequest(BaseModel):
 
     # 프론트엔드에서 설정한 옵션들
     time_settings: Optional[TimeSettings] = Field(default=None, description="시간 설정")
+    starting_point: Optional[Location] = Field(default=None, description="출발 장소 (자동완성으로 선택한 장소)")
 
     class Config:
         json_schema_extra = {
@@ -46,8 +63,12 @@ class UserFeedbackRequest(BaseModel):
     feedback: str = Field(..., description="피드백 내용")
 
 
+# 샘플링과 관계없이 이 요청의 DB 추적 수준을 지정하는 헤더 (off / workflow / nodes / full, 1 = full)
+TRACE_HEADER = Header(None, alias="X-Trace-Level", description="DB 추적 수준 올리기 (workflow/nodes/full, 샘플링 결과보다 낮으면 무시)")
+
+
 @app.post("/api/itinerary/plan", tags=["Itinerary"])
-async def create_trip_plan(request: TripPlanRequest):
+async def create_trip_plan(request: TripPlanRequest, x_trace_level: Optional[str] = TRACE_HEADER):
     """
     여행 일정 생성
 
@@ -60,22 +81,30 @@ async def create_trip_plan(request: TripPlanRequest):
         - enabled: 시간 설정 사용 여부
         - start_time: 시작 시간 (HH:MM)
         - duration_hours: 데이트 시간 (2~12시간)
+    - **starting_point**: (선택) `/api/places/autocomplete`에서 선택한 장소. 지정하면 이 장소를 기준으로 검색합니다.
+
+    ## Headers
+    - **X-Trace-Level**: (선택) DB 추적 수준을 샘플링 결과보다 높게 지정 (workflow / nodes / full, 낮추지는 않음)
 
     ## Response
     - **status**: "awaiting_user_input" (HIL 필요) 또는 "completed"
     - **itinerary**: 일정 정보
     - **progress**: 진행 메시지
+    - **events** / **cursor**: 타입이 있는 진행 이벤트와 마지막 이벤트 seq
     """
     try:
         print(f"[API] 여행 계획 요청")
         print(f"  - 입력: {request.user_input}")
         print(f"  - 세션: {request.session_id}")
         print(f"  - 시간 설정: {request.time_settings.enabled if request.time_settings else False}")
+        print(f"  - 출발 장소: {request.starting_point.name if request.starting_point else None}")
 
         result = await agent.plan_trip(
             user_input=request.user_input,
             session_id=request.session_id,
-            time_settings=request.time_settings
+            time_settings=request.time_settings,
+            starting_point=request.starting_point,
+            trace_level=x_trace_level
         )
         return result
     except Exception as e:
@@ -85,11 +114,11 @@ async def create_trip_plan(request: TripPlanRequest):
 
 
 @app.post("/api/itinerary/feedback", tags=["Itinerary"])
-async def submit_user_feedback(request: UserFeedbackRequest):
-    """사용자 피드백 제공"""
+async def submit_user_feedback(request: UserFeedbackRequest, x_trace_level: Optional[str] = TRACE_HEADER):
+    """사용자 피드백 제공 (X-Trace-Level 헤더로 이후 실행의 추적 수준을 올릴 수 있음)"""
     try:
         print(f"[API] 피드백 수신 - 워크플로우: {request.workflow_id}")
-        result = await agent.provide_user_feedback(request.workflow_id, request.feedback)
+        result = await agent.provide_user_feedback(request.workflow_id, request.feedback, trace_level=x_trace_level)
         return result
     except Exception as e:
         import traceback
@@ -97,12 +126,112 @@ async def submit_user_feedback(request: UserFeedbackRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/itinerary/{workflow_id}/events", tags=["Itinerary"])
+async def get_workflow_events(workflow_id: str, after: int = Query(0, ge=0, description="마지막으로 받은 이벤트 seq")):
+    """
+    진행 이벤트 조회
+
+    `after` 이후에 발생한 이벤트만 반환합니다. 응답의 `cursor`를 다음 요청의 `after`로 사용하세요.
+    세션당 최근 이벤트만 보관하므로, 그 사이에 밀려난 이벤트가 있으면 `events_truncated`가 true입니다.
+    """
+    result = await agent.get_events(workflow_id, after)
+    if result is None:
+        raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+    return result
+
+
+def _format_sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def _sse_stream(events: AsyncIterator[Tuple[str, dict]]) -> AsyncIterator[str]:
+    """에이전트 이벤트를 SSE 문자열로 변환 (에러는 error 이벤트로 전달)"""
+    try:
+        async for event, data in events:
+            yield _format_sse(event, data)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield _format_sse("error", {"status": "error", "message": str(e)})
+
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"  # 프록시 버퍼링 방지
+}
+
+
+@app.post("/api/itinerary/plan/stream", tags=["Itinerary"])
+async def stream_trip_plan(request: TripPlanRequest, x_trace_level: Optional[str] = TRACE_HEADER):
+    """
+    여행 일정 생성 (SSE 스트리밍)
+
+    `/api/itinerary/plan`과 같은 요청을 받아 노드가 끝날 때마다 이벤트를 전송합니다.
+
+    ## Events
+    - **session**: workflow_id (가장 먼저 전송)
+    - **progress**: 노드 진행 이벤트 (seq, type, message)
+    - **places**: 카테고리별로 발견된 장소
+    - **itinerary**: 생성된 (부분) 일정
+    - **result**: `/api/itinerary/plan`과 동일한 최종 응답
+    - **error**: 에러 메시지
+    """
+    print(f"[API] 여행 계획 스트리밍 요청: {request.user_input}")
+    events = agent.stream_plan_trip(
+        user_input=request.user_input,
+        session_id=request.session_id,
+        time_settings=request.time_settings,
+        starting_point=request.starting_point,
+        trace_level=x_trace_level
+    )
+    return StreamingResponse(_sse_stream(events), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.post("/api/itinerary/feedback/stream", tags=["Itinerary"])
+async def stream_user_feedback(request: UserFeedbackRequest, x_trace_level: Optional[str] = TRACE_HEADER):
+    """사용자 피드백 제공 (SSE 스트리밍, 이벤트는 /api/itinerary/plan/stream과 동일)"""
+    print(f"[API] 피드백 스트리밍 수신 - 워크플로우: {request.workflow_id}")
+    events = agent.stream_user_feedback(request.workflow_id, request.feedback, trace_level=x_trace_level)
+    return StreamingResponse(_sse_stream(events), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@app.get("/api/places/autocomplete", tags=["Places"])
+async def autocomplete_places(q: str = Query(..., min_length=1, description="입력 중인 장소명"),
+                              limit: int = Query(10, ge=1, le=30)):
+    """
+    장소명 자동완성
+
+    지명 사전과 지금까지 검색된 장소로 만든 메모리 인덱스에서 접두어로 찾습니다.
+    자모 단위 부분 입력("홍ㄷ")과 초성 입력("ㅎㄷ")을 지원하며, 인덱스에 없을 때만 Kakao 검색을 사용합니다.
+
+    ## Response
+    - **source**: "index" 또는 "kakao"
+    - **suggestions**: 장소 목록 (kind가 "place"인 항목은 그대로 `starting_point`로 보낼 수 있음)
+    - **elapsed_ms**: 처리 시간
+    """
+    return await agent.autocomplete_places(q, limit)
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """헬스 체크"""
     return {
         "status": "healthy",
-        "service": "Seoul Trip Planner"
+        "service": "Seoul Trip Planner",
+        "llm_ready": agent.llm.ready,
+        "checkpoint_backend": agent.checkpoint_backend,
+        "intent_fast_path": agent.nodes.intent_stats.to_dict(),
+        "llm_cache": agent.nodes.llm_cache.to_dict(),
+        "node_cache": agent.nodes.node_cache.to_dict(),
+        "place_index": len(agent.nodes.place_index),
+        "place_store": agent.nodes.place_store.to_dict(),
+        "db_writer": agent.db_writer.to_dict() if agent.db_writer else None,
+        "db_async": agent.async_engine is not None,
+        "tracing": agent.trace_sampler.to_dict(),
+        "llm_backend": agent.llm.to_dict(),
+        "prompts": PROMPTS.to_dict()
     }
 
 
@@ -122,4 +251,12 @@ async def get_default_settings():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # 멀티 워커는 CHECKPOINT_BACKEND=sqlite/postgres 설정 후 WEB_CONCURRENCY로 지정
+    # (예: CHECKPOINT_BACKEND=postgres WEB_CONCURRENCY=4 python src/server.py)
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        if agent.checkpoint_backend == "memory":
+            raise SystemExit("[ERROR] 멀티 워커 실행에는 CHECKPOINT_BACKEND=sqlite 또는 postgres가 필요합니다")
+        uvicorn.run("server:app", host="0.0.0.0", port=8000, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Optional
+from typing import Any, TypedDict, Dict, List, Optional
 from models import Location, ScheduleItem, TimeSettings, UserIntent
 
 class TripState(TypedDict):
@@ -8,13 +8,20 @@ class TripState(TypedDict):
     parsed_location: Optional[str]  # 파싱된 위치명
     starting_point: Optional[Location]  # 시작 지점 (특정 장소일 경우)
 
-    # 장소 목록
-    activity_places: List[Location]  # 찾은 활동 장소 (놀거리/명소)
-    dining_places: List[Location]  # 찾은 식사 장소
-    cafe_places: List[Location]  # 찾은 카페/디저트 장소
-    drinking_places: List[Location]  # 찾은 술집/바
+    # 장소 목록 (place_store의 장소 ID, Location은 TripNodes.load_places()로 조회)
+    activity_places: List[str]  # 찾은 활동 장소 (놀거리/명소)
+    dining_places: List[str]  # 찾은 식사 장소
+    cafe_places: List[str]  # 찾은 카페/디저트 장소
+    drinking_places: List[str]  # 찾은 술집/바
+    place_distances: Dict[str, Dict[str, int]]  # 단계 -> 장소 ID -> 그 단계 검색 기준점으로부터의 거리 (m)
     final_itinerary: List[ScheduleItem]  # 최종 여행 일정
 
+    # 부분 수정용
+    candidate_pools: Dict[str, List[str]]  # 단계별로 검색된 전체 후보 ID (수정 시 재검색 없이 재사용)
+    selected_places: Dict[str, str]  # 현재 일정에 포함된 단계별 장소 ID (다른 단계 수정 시 고정)
+    shown_places: Dict[str, List[str]]  # 단계별로 이미 보여준 장소 이름 (수정 시 제외)
+    refine_stage: Optional[str]  # 수정 중인 단계 ("dining", "cafe", "all"), 전체 계획이면 None
+
     # 검색 설정
     search_radius: int  # 검색 반경 (미터)
 
@@ -23,11 +30,12 @@ class TripState(TypedDict):
     user_intent: Optional['UserIntent']  # 자연어 분석 결과
 
     # 상태 관리
-    progress_messages: List[str]  # 진행 상황 메시지
+    event_log: Dict[str, Any]  # 진행 이벤트 링 버퍼 (events.py, {"next_seq", "events"})
     needs_refinement: bool  # 재정리 필요 여부
     user_activity_preference: Optional[str]  # 사용자 선호 활동 카테고리 (HIL용)
     user_food_preference: Optional[str]  # 사용자 선호 음식 종류 (HIL용)
     user_feedback: Optional[str]  # 사용자 피드백
     next_action: Optional[str]  # 다음 액션
     workflow_id: Optional[str]  # DB 워크플로우 ID (UUID)
+    trace_level: Optional[str]  # DB 추적 수준 (tracing.py, 요청 시작 시 샘플링)
     current_node_id: Optional[str]  # 현재 실행 중인 노드 ID (UUID)
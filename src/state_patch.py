@@ -0,0 +1,67 @@
+"""
+노드 state 변경분 (JSON Patch, RFC 6902)
+노드 기록에는 직전 노드 이후 바뀐 경로만 저장하고, 전체 state가 필요할 때는 첫 노드부터 패치를 차례로 적용해 복원
+- dict는 하위 키 단위로 비교, 리스트는 뒤에 항목이 추가된 경우만 add("/-"), 나머지 변경은 통째로 replace
+"""
+import copy
+from typing import Any, Dict, List
+
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(part: str) -> str:
+    return part.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old: Dict[str, Any], new: Dict[str, Any], path: str = "") -> List[dict]:
+    """old -> new 변경 연산 목록 (바뀐 게 없으면 빈 목록)"""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+
+    for key, value in new.items():
+        key_path = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": key_path, "value": value})
+            continue
+
+        before = old[key]
+        if before == value:
+            continue
+        if isinstance(before, dict) and isinstance(value, dict):
+            ops.extend(make_patch(before, value, key_path))
+        elif (isinstance(before, list) and isinstance(value, list)
+              and len(value) > len(before) and value[:len(before)] == before):
+            ops.extend({"op": "add", "path": f"{key_path}/-", "value": item} for item in value[len(before):])
+        else:
+            ops.append({"op": "replace", "path": key_path, "value": value})
+    return ops
+
+
+def apply_patch(doc: Dict[str, Any], ops: List[dict]) -> Dict[str, Any]:
+    """doc에 패치를 적용한 새 dict 반환 (doc은 변경하지 않음)"""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        parts = [_unescape(part) for part in op["path"].split("/")[1:]]
+        parent = doc
+        for part in parts[:-1]:
+            parent = parent[int(part)] if isinstance(parent, list) else parent[part]
+
+        last = parts[-1]
+        if isinstance(parent, list):
+            if op["op"] == "remove":
+                del parent[int(last)]
+            elif last == "-":
+                parent.append(copy.deepcopy(op["value"]))
+            elif op["op"] == "add":
+                parent.insert(int(last), copy.deepcopy(op["value"]))
+            else:
+                parent[int(last)] = copy.deepcopy(op["value"])
+        elif op["op"] == "remove":
+            parent.pop(last, None)
+        else:
+            parent[last] = copy.deepcopy(op["value"])
+    return doc
@@ -0,0 +1,145 @@
+"""
+장소 카테고리 분류 트리
+Kakao category_name("음식점 > 한식 > 육류,고기")을 경로별로 한 번만 파싱해 작은 정수 코드로 인턴하고,
+전위 순회 구간(preorder interval)으로 조상/자손 판정을 정수 비교로 처리
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+ROOT = 0  # 모든 카테고리의 공통 조상 (빈 경로)
+
+
+def split_category(category: Optional[str]) -> Tuple[str, ...]:
+    """"음식점 > 한식 > 육류,고기" -> ("음식점", "한식", "육류,고기")"""
+    if not category:
+        return ()
+    return tuple(part.strip() for part in category.split(">") if part.strip())
+
+
+class CategoryTaxonomy:
+    """카테고리 경로 인턴 트리
+
+    - intern(): 원본 문자열 -> 말단 노드 코드 (처음 본 경로만 파싱)
+    - is_ancestor()/descendants(): 전위 순회 구간 비교. 새 노드가 추가되면 다음 조회 때 구간을 다시 계산
+    """
+
+    def __init__(self):
+        self._labels: List[str] = [""]
+        self._parents: List[int] = [-1]
+        self._children: List[Dict[str, int]] = [{}]
+        self._by_string: Dict[str, int] = {}  # 원본 category 문자열 -> 코드
+        self._by_label: Dict[str, List[int]] = {}  # 단계 이름 -> 코드들 ("한식"은 음식점/배달 등 여러 곳에 있을 수 있음)
+        # 전위 순회 구간: 노드 c의 자손은 enter[c] <= enter[d] < leave[c]
+        self._enter = np.zeros(1, dtype=np.int32)
+        self._leave = np.ones(1, dtype=np.int32)
+        self._preorder = np.zeros(1, dtype=np.int32)
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def intern(self, category: Optional[str]) -> int:
+        """카테고리 문자열의 말단 코드 (없으면 ROOT)"""
+        if not category:
+            return ROOT
+        code = self._by_string.get(category)
+        if code is not None:
+            return code
+
+        code = ROOT
+        for label in split_category(category):
+            child = self._children[code].get(label)
+            if child is None:
+                child = len(self._labels)
+                self._labels.append(label)
+                self._parents.append(code)
+                self._children.append({})
+                self._children[code][label] = child
+                self._by_label.setdefault(label, []).append(child)
+                self._dirty = True
+            code = child
+        self._by_string[category] = code
+        return code
+
+    def codes(self, categories: Iterable[Optional[str]]) -> np.ndarray:
+        return np.fromiter((self.intern(category) for category in categories), dtype=np.int32)
+
+    def label(self, code: int) -> str:
+        return self._labels[code]
+
+    def path(self, code: int) -> Tuple[str, ...]:
+        labels = []
+        while code > ROOT:
+            labels.append(self._labels[code])
+            code = self._parents[code]
+        return tuple(reversed(labels))
+
+    def lookup(self, label: str) -> List[int]:
+        """단계 이름 또는 "음식점 > 한식" 형태 경로에 해당하는 코드들 (모르는 이름이면 빈 목록)"""
+        parts = split_category(label)
+        if len(parts) > 1:
+            code = ROOT
+            for part in parts:
+                code = self._children[code].get(part)
+                if code is None:
+                    return []
+            return [code]
+        return list(self._by_label.get(parts[0], [])) if parts else []
+
+    def _reindex(self):
+        """전위 순회 구간 재계산 (노드 추가 후 첫 조회 때만)"""
+        size = len(self._labels)
+        enter = np.zeros(size, dtype=np.int32)
+        leave = np.zeros(size, dtype=np.int32)
+        preorder = np.zeros(size, dtype=np.int32)
+        counter = 0
+        stack = [(ROOT, False)]
+        while stack:
+            code, done = stack.pop()
+            if done:
+                leave[code] = counter
+                continue
+            enter[code] = counter
+            preorder[counter] = code
+            counter += 1
+            stack.append((code, True))
+            stack.extend((child, False) for child in reversed(list(self._children[code].values())))
+        self._enter, self._leave, self._preorder = enter, leave, preorder
+        self._dirty = False
+
+    def _intervals(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._dirty:
+            self._reindex()
+        return self._enter, self._leave
+
+    def is_ancestor(self, ancestor: int, code: int) -> bool:
+        """ancestor가 code 자신이거나 조상이면 True"""
+        enter, leave = self._intervals()
+        return bool(enter[ancestor] <= enter[code] < leave[ancestor])
+
+    def descendants(self, code: int) -> Set[int]:
+        """code와 그 하위 카테고리 코드 집합"""
+        enter, leave = self._intervals()
+        return set(self._preorder[enter[code]:leave[code]].tolist())
+
+    def under_mask(self, codes: np.ndarray, ancestors: Sequence[int]) -> np.ndarray:
+        """codes 각각이 ancestors 중 하나의 하위인지 (후보 수 길이의 bool 배열)"""
+        codes = np.asarray(codes, dtype=np.int32)
+        if not len(ancestors):
+            return np.zeros(codes.shape[0], dtype=bool)
+        enter, leave = self._intervals()
+        positions = enter[codes][:, None]
+        ancestors = np.asarray(ancestors, dtype=np.int32)
+        return ((enter[ancestors][None, :] <= positions) & (positions < leave[ancestors][None, :])).any(axis=1)
+
+
+_default_taxonomy: Optional[CategoryTaxonomy] = None
+
+
+def get_taxonomy() -> CategoryTaxonomy:
+    """프로세스 공용 분류 트리 (코드는 프로세스 안에서만 유효하므로 DB/체크포인트에 저장하지 않음)"""
+    global _default_taxonomy
+    if _default_taxonomy is None:
+        _default_taxonomy = CategoryTaxonomy()
+    return _default_taxonomy
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 import math
 
 
@@ -109,24 +109,33 @@ class TimeCalculator:
         activities: list, 
         dinings: list, 
         cafes: list, 
-        bars: list
+        bars: list,
+        pinned: Optional[Dict[str, object]] = None
     ) -> list:
         """
         최단 이동 거리를 가지는 최적의 경로를 탐색합니다.
         (Greedy 방식은 최적해가 아닐 수 있으므로, 가능한 조합 중 최소 거리를 찾음)
+        pinned에 지정된 단계("activity", "dining", "cafe", "drinking")는 해당 장소로 고정하고
+        나머지 단계만 후보 중에서 고릅니다 (부분 수정 시 사용).
         """
         best_path = []
         min_total_dist = float('inf')
-        
+        pinned = pinned or {}
+
         # 선택지가 없으면 빈 리스트 반환
-        if not activities and not dinings:
+        if not activities and not dinings and "activity" not in pinned and "dining" not in pinned:
             return []
 
-        # 각 단계별 후보군 (최대 3개씩만 고려하여 연산량 조절)
-        cand_activities = activities[:3] if activities else []
-        cand_dinings = dinings[:3] if dinings else []
-        cand_cafes = cafes[:3] if cafes else []
-        cand_bars = bars[:3] if bars else []
+        # 각 단계별 후보군 (최대 3개씩만 고려하여 연산량 조절, 고정된 단계는 1개)
+        def candidates(stage, places):
+            if stage in pinned:
+                return [pinned[stage]]
+            return places[:3] if places else []
+
+        cand_activities = candidates("activity", activities)
+        cand_dinings = candidates("dining", dinings)
+        cand_cafes = candidates("cafe", cafes)
+        cand_bars = candidates("drinking", bars)
 
         # 경로 구성을 위한 더미 리스트 (없을 경우 패스)
         temp_stages = []
@@ -0,0 +1,80 @@
+"""
+워크플로우 추적(DB 로깅) 수준과 요청별 샘플링
+- off: 기록하지 않음 (노드에서 에러가 나면 full로 올려 그때까지의 노드와 함께 기록)
+- workflow: workflows 행만 (상태, 최종 일정)
+- nodes: + 노드 실행 순서/시간/캐시 결과, LLM 호출 모델/지연/토큰 (state와 프롬프트 본문 제외)
+- full: + 노드 state 변경분, 최종 state 스냅샷, 프롬프트/응답 본문
+
+TRACE_SAMPLE_RATES(예: "full=0.01,nodes=0.1,workflow=1")로 요청마다 높은 수준부터 확률적으로 고르며,
+X-Trace-Level 요청 헤더로는 수준을 올리기만 할 수 있음 (샘플링 결과보다 낮은 값은 무시)
+"""
+import os
+import random
+from typing import Dict, Optional
+
+TRACE_OFF = "off"
+TRACE_WORKFLOW = "workflow"
+TRACE_NODES = "nodes"
+TRACE_FULL = "full"
+
+TRACE_LEVELS = (TRACE_OFF, TRACE_WORKFLOW, TRACE_NODES, TRACE_FULL)
+_RANKS = {level: rank for rank, level in enumerate(TRACE_LEVELS)}
+
+# 헤더 값 별칭 (X-Trace-Level: 1 등)
+_ALIASES = {"1": TRACE_FULL, "true": TRACE_FULL, "on": TRACE_FULL, "0": TRACE_OFF, "false": TRACE_OFF}
+
+
+def parse_trace_level(value: Optional[str]) -> Optional[str]:
+    """수준 이름 정규화 (모르는 값이면 None)"""
+    if not value:
+        return None
+    value = value.strip().lower()
+    value = _ALIASES.get(value, value)
+    return value if value in _RANKS else None
+
+
+def trace_at_least(level: Optional[str], minimum: str) -> bool:
+    return _RANKS.get(level or TRACE_FULL, _RANKS[TRACE_FULL]) >= _RANKS[minimum]
+
+
+def higher_level(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    if a is None or b is None:
+        return a or b
+    return a if _RANKS[a] >= _RANKS[b] else b
+
+
+class TraceSampler:
+    """요청별 추적 수준 결정 (설정이 없으면 모든 요청 full)"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, rng: Optional[random.Random] = None):
+        self.rates = rates if rates is not None else self._rates_from_env()
+        self.rng = rng or random.Random()
+        self.counts = {level: 0 for level in TRACE_LEVELS}
+        self.forced = 0
+
+    @staticmethod
+    def _rates_from_env() -> Dict[str, float]:
+        rates = {}
+        for item in os.getenv("TRACE_SAMPLE_RATES", f"{TRACE_FULL}=1.0").split(","):
+            name, _, value = item.partition("=")
+            level = parse_trace_level(name)
+            if level and level != TRACE_OFF and value.strip():
+                rates[level] = float(value)
+        return rates
+
+    def choose(self, forced: Optional[str] = None) -> str:
+        """full -> nodes -> workflow 순으로 샘플링. forced(헤더 값)가 더 높으면 그 수준 (헤더로 추적을 끌 수는 없음)"""
+        level = TRACE_OFF
+        for candidate in (TRACE_FULL, TRACE_NODES, TRACE_WORKFLOW):
+            if self.rng.random() < self.rates.get(candidate, 0.0):
+                level = candidate
+                break
+        forced = parse_trace_level(forced)
+        if forced and higher_level(level, forced) != level:
+            self.forced += 1
+            level = forced
+        self.counts[level] += 1
+        return level
+
+    def to_dict(self) -> dict:
+        return {"rates": self.rates, "counts": self.counts, "forced": self.forced}
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+
+# src/ 모듈은 서로 평면 import(from database import ...)를 사용
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models import Location  # noqa: E402
+
+# 위도 37.55 부근 경도 1도 ≈ 88km
+METERS_PER_LON = 88_300
+
+
+def _place(place_id: str, name: str, category: str, x: float, y: float, distance: int) -> Location:
+    return Location(id=place_id, name=name, category=category, address="서울", x=x, y=y, distance=distance)
+
+
+class FakeKakao:
+    """좌표가 결정적인 Kakao 검색 대역 (기준점에서 동쪽으로 일정 간격으로 장소 배치)"""
+
+    api_key = "test"
+    # 활동 장소 간격 (약 1.8km, 주변 식사/카페 검색 반경보다 충분히 멀게)
+    ACTIVITY_STEP = 0.02
+    NEARBY_STEP = 0.0005
+
+    def __init__(self):
+        self.calls = []
+
+    async def find_activity_places_near(self, x, y, radius=2000, size=15):
+        self.calls.append(("activity", x, y))
+        return [_place(f"act{i}", f"활동{i}", "여행 > 관광,명소", x + i * self.ACTIVITY_STEP, y,
+                       int(i * self.ACTIVITY_STEP * METERS_PER_LON)) for i in range(4)]
+
+    async def find_activity_places(self, location_name, radius=2000, size=15, x=None, y=None):
+        return await self.find_activity_places_near(x or 126.9237, y or 37.5572, radius, size)
+
+    async def find_specific_place(self, query):
+        return None
+
+    def _nearby(self, kind, category, x, y, size):
+        self.calls.append((kind, x, y))
+        return [_place(f"{kind}{x:.4f}-{i}", f"{kind}{x:.4f}-{i}", category, x + i * self.NEARBY_STEP, y,
+                       int(i * self.NEARBY_STEP * METERS_PER_LON)) for i in range(size)]
+
+    async def find_dining_places(self, x, y, radius=500, size=15):
+        return self._nearby("dining", "음식점 > 한식", x, y, size)
+
+    async def find_cafe_places(self, x, y, radius=300, size=15):
+        return self._nearby("cafe", "음식점 > 카페", x, y, size)
+
+    async def search_nearby_by_keyword(self, keyword, x, y, radius=500, size=15):
+        if "맛집" in keyword:
+            return self._nearby("dining", "음식점 > 한식", x, y, size)
+        if "카페" in keyword:
+            return self._nearby("cafe", "음식점 > 카페", x, y, size)
+        return self._nearby("bar", "음식점 > 술집", x, y, size)
+
+
+@pytest.fixture
+def kakao():
+    return FakeKakao()
+
+
+@pytest.fixture
+def trip_nodes(kakao):
+    """DB 없이 동작하는 TripNodes (Kakao/LLM 대역)"""
+    from llm_backend import FakeLLMEndpoint, LLMBackendPool
+    from nodes import TripNodes
+    from time_calculator import TimeCalculator
+
+    return TripNodes(LLMBackendPool([FakeLLMEndpoint()]), kakao, TimeCalculator())
+
+
+@pytest.fixture
+def trip_state():
+    """'홍대' 지역 검색 직후의 초기 state"""
+    from agent import TripPlannerAgent
+
+    state = TripPlannerAgent._create_initial_state(None, "홍대 놀거리", None)
+    state.update({"input_type": "region", "parsed_location": "홍대"})
+    return state
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+INTENT = {
+    "location": "홍대",
+    "activity": {"required": True, "preference": None, "keywords": []},
+    "dining": {"required": True, "preference": "한식", "keywords": []},
+    "cafe": {"required": True, "preference": None, "keywords": []},
+    "drinking": {"required": False, "preference": None, "keywords": []},
+}
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch, kakao):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'agent.db'}")
+    monkeypatch.setenv("KAKAO_REST_API_KEY", "test")
+    monkeypatch.setenv("DB_ASYNC", "false")
+    monkeypatch.setenv("CHECKPOINT_BACKEND", "memory")
+    monkeypatch.setenv("OLLAMA_PRELOAD", "false")
+    from agent import TripPlannerAgent
+    from llm_backend import FakeLLMEndpoint, LLMBackendPool
+
+    agent = TripPlannerAgent()
+    agent.kakao_client = agent.nodes.kakao_client = kakao
+    agent.llm = agent.nodes.llm = LLMBackendPool([FakeLLMEndpoint([json.dumps(INTENT, ensure_ascii=False),
+                                                                    "ACTION: complete"])])
+    # 규칙 기반 분석을 건너뛰고 LLM 응답(INTENT) 사용
+    agent.nodes.intent_parser.min_confidence = 1.1
+    yield agent
+    asyncio.run(agent.aclose())
+
+
+def test_one_logger_per_run_through_graph_config(agent, monkeypatch):
+    import nodes
+    from database import Node, get_session
+
+    created = []
+    new_logger = agent._new_logger
+    monkeypatch.setattr(agent, "_new_logger", lambda *args: created.append(new_logger(*args)) or created[-1])
+    # 노드가 config에서 로거를 받지 못하면 임시 DatabaseLogger를 만듦
+    temporary = []
+    monkeypatch.setattr(nodes, "DatabaseLogger", lambda *args, **kwargs: temporary.append(args))
+
+    async def run():
+        result = await agent.plan_trip("홍대 근처 뭐할까")
+        configs = []
+        for feedback in ("상관없음", "완료", "완료"):
+            if result["status"] == "completed":
+                break
+            configs.append(dict(agent._run_loggers))
+            result = await agent.provide_user_feedback(result["workflow_id"], feedback)
+        return result, configs
+
+    result, configs = asyncio.run(run())
+
+    assert result["status"] == "completed"
+    assert len(created) == 1 and not temporary
+    # HIL 대기 중에도 같은 로거를 유지하고, 완료되면 정리
+    assert configs and all(loggers == {result["workflow_id"]: created[0]} for loggers in configs)
+    assert result["workflow_id"] not in agent._run_loggers
+
+    agent.db_writer.flush()
+    session = get_session(agent.engine)
+    try:
+        orders = [row.execution_order for row in session.query(Node).filter_by(workflow_id=result["workflow_id"])]
+    finally:
+        session.close()
+    assert orders and sorted(orders) == list(range(1, len(orders) + 1))
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from checkpointer import close_checkpointer, get_checkpoint_config, open_checkpointer, psycopg_conninfo
+
+
+@pytest.mark.parametrize("url, conninfo", [
+    ("postgresql://u:p@host/db?sslmode=require", "postgresql://u:p@host/db?sslmode=require"),
+    ("postgresql+psycopg2://u:p@host/db?sslmode=require", "postgresql://u:p@host/db?sslmode=require"),
+    ("postgresql+asyncpg://u:p@host:5432/db?ssl=require", "postgresql://u:p@host:5432/db?sslmode=require"),
+    ("postgres+asyncpg://u@host/db", "postgres://u@host/db"),
+])
+def test_psycopg_conninfo(url, conninfo):
+    assert psycopg_conninfo(url) == conninfo
+
+
+def test_postgres_falls_back_to_database_url(monkeypatch):
+    monkeypatch.delenv("CHECKPOINT_URL", raising=False)
+    monkeypatch.setenv("DATABASE_URL", "postgresql+asyncpg://u@host/db")
+    assert get_checkpoint_config("postgres") == ("postgres", "postgresql+asyncpg://u@host/db")
+
+
+def test_sqlite_uses_wal_and_busy_timeout(tmp_path, monkeypatch):
+    pytest.importorskip("langgraph.checkpoint.sqlite.aio")
+    monkeypatch.setenv("CHECKPOINT_SQLITE_BUSY_TIMEOUT", "7")
+
+    async def main():
+        saver, conn = await open_checkpointer("sqlite", f"sqlite:///{tmp_path / 'checkpoints.sqlite'}")
+        try:
+            async with conn.execute("PRAGMA journal_mode") as cursor:
+                journal_mode = (await cursor.fetchone())[0]
+            async with conn.execute("PRAGMA busy_timeout") as cursor:
+                busy_timeout = (await cursor.fetchone())[0]
+        finally:
+            await close_checkpointer(conn)
+        return journal_mode, busy_timeout
+
+    assert asyncio.run(main()) == ("wal", 7000)
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+from sqlalchemy import create_engine
+
+from database import Base, User
+from db_writer import OVERFLOW_BLOCK, DatabaseWriter
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'writer.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _user(i):
+    return {"id": i, "username": f"user{i}"}
+
+
+def test_full_queue_drops_without_blocking(tmp_path):
+    writer = DatabaseWriter(_engine(tmp_path), background=True, max_queue=2, overflow=OVERFLOW_BLOCK,
+                            block_timeout=5.0, flush_interval=60, batch_size=100)
+    gate = threading.Lock()
+    gate.acquire()
+    writer._write = lambda batch: gate.acquire()  # 기록 스레드를 멈춰 큐가 비지 않도록
+
+    started = time.monotonic()
+    results = [writer.insert(User, _user(i)) for i in range(1, 6)]
+    assert time.monotonic() - started < 1.0
+    assert results.count(False) == writer.dropped > 0
+    assert writer.insert(User, _user(99), critical=True)
+    gate.release()
+
+
+def test_backpressure_waits_off_the_event_loop(tmp_path):
+    writer = DatabaseWriter(_engine(tmp_path), background=True, max_queue=1, overflow=OVERFLOW_BLOCK,
+                            block_timeout=5.0, flush_interval=0.01, batch_size=100)
+    release = threading.Event()
+    original_write = writer._write
+
+    def slow_write(batch):
+        release.wait()
+        original_write(batch)
+
+    writer._write = slow_write
+
+    async def main():
+        assert writer.insert(User, _user(1))
+        await asyncio.sleep(0.05)  # 기록 스레드가 첫 행을 가져가 큐가 빔
+        assert writer.insert(User, _user(2))  # 큐가 다시 가득 참
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while not release.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.create_task(ticker())
+        asyncio.get_running_loop().call_later(0.2, release.set)
+        await writer.backpressure()
+        await tick_task
+        return ticks
+
+    assert asyncio.run(main()) >= 5  # 기다리는 동안에도 이벤트 루프가 돌았음
+    assert writer.waits == 1
+    assert writer.flush(timeout=5)
+    assert writer.written == 2 and writer.dropped == 0
+    writer.close()
+
+
+def test_backpressure_returns_immediately_for_drop_policy(tmp_path):
+    writer = DatabaseWriter(_engine(tmp_path), background=True, max_queue=1, overflow="drop")
+    writer._queue.append(object())
+    asyncio.run(asyncio.wait_for(writer.backpressure(), timeout=0.1))
+    assert writer.waits == 0
@@ -0,0 +1,45 @@
+from events import EVENT_WARNING, add_event, event_messages, events_since, last_seq, new_event_log
+
+
+def test_events_since_reads_from_cursor():
+    state = {"event_log": new_event_log()}
+    assert events_since(state["event_log"]) == ([], 0, False)
+
+    add_event(state, "활동 검색", node="discover_activity_places")
+    add_event(state, "결과 부족", EVENT_WARNING, data={"search_radius": 3000})
+    events, cursor, missed = events_since(state["event_log"])
+    assert [e["seq"] for e in events] == [1, 2]
+    assert events[1]["type"] == EVENT_WARNING and events[1]["data"] == {"search_radius": 3000}
+    assert (cursor, missed) == (2, False)
+
+    add_event(state, "식사 검색")
+    events, cursor, missed = events_since(state["event_log"], cursor)
+    assert [e["message"] for e in events] == ["식사 검색"]
+    assert (cursor, missed) == (3, False)
+    # 새 이벤트가 없으면 커서 유지
+    assert events_since(state["event_log"], cursor) == ([], 3, False)
+
+
+def test_ring_buffer_drops_oldest_and_reports_missed_events():
+    state = {"event_log": new_event_log()}
+    for i in range(5):
+        add_event(state, f"이벤트{i}", max_events=3)
+
+    log = state["event_log"]
+    assert event_messages(log) == ["이벤트2", "이벤트3", "이벤트4"]
+    assert last_seq(log) == 5
+
+    # 커서 1 이후의 seq 2 이벤트가 밀려났으므로 놓친 이벤트가 있음
+    events, cursor, missed = events_since(log, 1)
+    assert [e["seq"] for e in events] == [3, 4, 5]
+    assert (cursor, missed) == (5, True)
+    # 버퍼에 남은 가장 오래된 이벤트 직전부터 읽으면 놓친 이벤트 없음
+    assert events_since(log, 2)[2] is False
+
+
+def test_add_event_does_not_mutate_previous_log():
+    state = {"event_log": new_event_log()}
+    add_event(state, "첫 이벤트")
+    checkpointed = state["event_log"]
+    add_event(state, "두 번째 이벤트")
+    assert event_messages(checkpointed) == ["첫 이벤트"]
@@ -0,0 +1,73 @@
+import pytest
+
+from feedback_classifier import FeedbackClassifier, parse_action
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return FeedbackClassifier()
+
+
+@pytest.mark.parametrize("text, action", [
+    ("완료", "complete"),
+    ("좋아요", "complete"),
+    ("마음에 들어", "complete"),
+    ("카페 바꿔줘", "refine_cafe"),
+    ("밥집 별로야", "refine_food"),
+    ("식당 다른 곳으로", "refine_food"),
+    ("처음부터 다시 짜줘", "refine_region"),
+])
+def test_confident_fast_path(classifier, text, action):
+    predicted, confidence = classifier.classify(text)
+    assert predicted == action
+    assert classifier.is_confident(confidence)
+
+
+@pytest.mark.parametrize("text", [
+    "안 좋아",
+    "하나도 안 괜찮아",
+    "좋지 않아",
+    "마음에 안 들어",
+    "별로 마음에 안 드네",
+    "아니 그대로는 좀",
+    "못 가겠어",
+])
+def test_negated_feedback_goes_to_llm(classifier, text):
+    predicted, confidence = classifier.classify(text)
+    assert not classifier.is_confident(confidence), (text, predicted, confidence)
+    assert classifier._lexicon_vote(text) != "complete"
+
+
+@pytest.mark.parametrize("text", ["식당이랑 카페 바꿔줘", "밥집하고 카페 둘 다 다른 데로"])
+def test_multiple_targets_go_to_llm(classifier, text):
+    predicted, confidence = classifier.classify(text)
+    assert not classifier.is_confident(confidence), (text, predicted, confidence)
+
+
+def test_parse_action():
+    assert parse_action("ACTION: refine_cafe") == "refine_cafe"
+    assert parse_action("음... complete 입니다") == "complete"
+    assert parse_action("모르겠어요") is None
+
+
+def test_llm_labels_are_recorded_and_used_for_training(tmp_path):
+    import asyncio
+    from sqlalchemy import create_engine
+    from database import Base, FeedbackLabel, get_session
+    from db_writer import get_db_writer
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'labels.db'}")
+    Base.metadata.create_all(engine)
+    for _ in range(3):
+        FeedbackClassifier.record_label(engine, "분위기 좀 더 조용한 찻집으로", "refine_cafe", workflow_id="wf-1")
+    assert get_db_writer(engine).flush(timeout=5)
+
+    session = get_session(engine)
+    assert session.query(FeedbackLabel).filter_by(action="refine_cafe", source="llm").count() == 3
+    session.close()
+
+    fresh = FeedbackClassifier()
+    before = fresh.training_size
+    assert asyncio.run(fresh.atrain_from_db(engine)) == 3
+    assert fresh.training_size == before + 3
+    assert FeedbackClassifier().train_from_db(engine) == 3
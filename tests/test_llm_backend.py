@@ -0,0 +1,61 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage
+
+from llm_backend import FakeLLMEndpoint, LLMBackendPool, PRIORITY_BULK, PRIORITY_INTERACTIVE, PRIORITY_NORMAL
+
+
+def echo(messages):
+    return messages[-1].content
+
+
+def test_fake_endpoint_returns_responses():
+    pool = LLMBackendPool([FakeLLMEndpoint(["첫 번째", "두 번째"])])
+
+    async def run():
+        first = await pool.ainvoke([HumanMessage(content="a")])
+        chunks = [chunk.content async for chunk in pool.astream([HumanMessage(content="b")])]
+        return first.content, "".join(chunks)
+
+    assert asyncio.run(run()) == ("첫 번째", "두 번째")
+
+
+def test_queued_requests_run_in_priority_order():
+    endpoint = FakeLLMEndpoint(echo, max_concurrency=1, latency=0.01)
+    pool = LLMBackendPool([endpoint])
+
+    async def run():
+        holder = asyncio.create_task(pool.ainvoke([HumanMessage(content="hold")]))
+        await asyncio.sleep(0)  # 슬롯 점유
+        waiting = [
+            asyncio.create_task(pool.ainvoke([HumanMessage(content=name)], priority=priority))
+            for name, priority in [("bulk", PRIORITY_BULK), ("normal-1", PRIORITY_NORMAL),
+                                   ("interactive", PRIORITY_INTERACTIVE), ("normal-2", PRIORITY_NORMAL)]
+        ]
+        await asyncio.sleep(0)
+        assert endpoint.queued == 4
+        await asyncio.gather(holder, *waiting)
+
+    asyncio.run(run())
+    order = [messages[-1].content for messages in endpoint.chat_model.calls]
+    # 같은 우선순위는 먼저 온 순서
+    assert order == ["hold", "interactive", "normal-1", "normal-2", "bulk"]
+    assert endpoint.active == 0 and endpoint.completed == 5
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    endpoint = FakeLLMEndpoint(echo, max_concurrency=1, latency=0.01)
+    pool = LLMBackendPool([endpoint])
+
+    async def run():
+        holder = asyncio.create_task(pool.ainvoke([HumanMessage(content="hold")]))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(pool.ainvoke([HumanMessage(content="cancel")]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await holder
+        await pool.ainvoke([HumanMessage(content="after")])
+
+    asyncio.run(run())
+    assert [messages[-1].content for messages in endpoint.chat_model.calls] == ["hold", "after"]
+    assert endpoint.active == 0
@@ -0,0 +1,58 @@
+import asyncio
+
+from events import event_messages
+
+
+def _load(nodes, state, key, limit=None):
+    return asyncio.run(nodes.load_places(state, key, limit))
+
+
+def _run(node, state):
+    return asyncio.run(node(state))
+
+
+def _searched(kakao, kind):
+    return sum(1 for call in kakao.calls if call[0] == kind)
+
+
+def test_cache_hit_restores_pools_and_distances(trip_nodes, trip_state, kakao):
+    first = _run(trip_nodes.discover_activity_places, trip_state)
+    first = _run(trip_nodes.discover_dining_places, first)
+    searches = _searched(kakao, "dining")
+    assert searches > 0
+
+    # 다른 세션이라도 선언된 입력(활동 장소, 선호도 등)이 같으면 검색 결과 재사용
+    second = {**trip_state, "activity_places": list(first["activity_places"]),
+              "place_distances": {"activity": first["place_distances"]["activity"]}, "candidate_pools": {}}
+    second = _run(trip_nodes.discover_dining_places, second)
+
+    assert _searched(kakao, "dining") == searches
+    assert second["dining_places"] == first["dining_places"]
+    assert second["candidate_pools"]["dining"] == first["candidate_pools"]["dining"]
+    assert second["place_distances"]["dining"] == first["place_distances"]["dining"]
+    assert [p.distance for p in _load(trip_nodes, second, "dining_places")] == \
+           [p.distance for p in _load(trip_nodes, first, "dining_places")]
+    assert event_messages(second["event_log"])[-1] == event_messages(first["event_log"])[-1]
+    assert trip_nodes.node_cache.stats["discover_dining_places"] == {"hit": 1, "miss": 1, "bypass": 0}
+
+
+def test_cache_miss_when_declared_input_changes(trip_nodes, trip_state, kakao):
+    state = _run(trip_nodes.discover_activity_places, trip_state)
+    _run(trip_nodes.discover_dining_places, dict(state))
+    searches = _searched(kakao, "dining")
+
+    _run(trip_nodes.discover_dining_places, {**state, "user_food_preference": "일식"})
+
+    assert _searched(kakao, "dining") > searches
+    assert trip_nodes.node_cache.stats["discover_dining_places"]["miss"] == 2
+
+
+def test_refine_action_bypasses_cache(trip_nodes, trip_state, kakao):
+    state = _run(trip_nodes.discover_activity_places, trip_state)
+    state = _run(trip_nodes.discover_dining_places, state)
+    searches = _searched(kakao, "dining")
+
+    _run(trip_nodes.discover_dining_places, {**state, "next_action": "refine_food", "candidate_pools": {}})
+
+    assert _searched(kakao, "dining") > searches
+    assert trip_nodes.node_cache.stats["discover_dining_places"]["bypass"] == 1
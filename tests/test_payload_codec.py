@@ -0,0 +1,72 @@
+import pytest
+
+from database import CODEC_RAW, CODEC_ZLIB, CODEC_ZSTD, PayloadCodec
+
+PAYLOAD = {
+    "user_input": "서울 성수동 데이트 코스",
+    "places": [{"name": f"카페 {i}", "category": "카페", "x": 127.05 + i / 1000, "y": 37.54} for i in range(20)],
+}
+
+
+def _samples():
+    return [
+        ("{\"node\":\"%s\",\"places\":[{\"name\":\"장소 %d\",\"category\":\"음식점 > 한식\",\"address\":\"서울 성동구 %d\"}]}"
+         % (node, i, i)).encode("utf-8")
+        for i in range(300) for node in ("discover_places", "discover_cafe")
+    ]
+
+
+@pytest.fixture
+def dict_path(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "payload.dict"
+    path.write_bytes(zstandard.train_dictionary(4096, _samples()).as_bytes())
+    return str(path)
+
+
+@pytest.mark.parametrize("method, codec", [("none", CODEC_RAW), ("zlib", CODEC_ZLIB), ("zstd", CODEC_ZSTD)])
+def test_round_trip(method, codec):
+    if method == "zstd":
+        pytest.importorskip("zstandard")
+    payload_codec = PayloadCodec(method, min_bytes=0, dict_path="")
+    data = payload_codec.encode(PAYLOAD)
+    assert data[0] == codec
+    assert payload_codec.decode(data) == PAYLOAD
+
+
+def test_small_values_are_stored_raw():
+    data = PayloadCodec("zlib", min_bytes=256, dict_path="").encode({"a": 1})
+    assert data[0] == CODEC_RAW
+
+
+@pytest.mark.parametrize("method", ["none", "zlib", "zstd"])
+def test_rows_stay_readable_after_switching_method(method):
+    if method == "zstd":
+        pytest.importorskip("zstandard")
+    rows = [PayloadCodec(m, min_bytes=0, dict_path="").encode(PAYLOAD) for m in ("none", "zlib", "zstd")
+            if m != "zstd" or method == "zstd"]
+    reader = PayloadCodec(method, dict_path="")
+    assert all(reader.decode(row) == PAYLOAD for row in rows)
+
+
+@pytest.mark.parametrize("method", ["zstd", "zlib", "none"])
+def test_dictionary_rows_decode_with_any_method(dict_path, method):
+    row = PayloadCodec("zstd", min_bytes=0, dict_path=dict_path).encode(PAYLOAD)
+    assert PayloadCodec(method, dict_path=dict_path).decode(row) == PAYLOAD
+
+
+def test_dictionary_rotation(dict_path, tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    new_path = tmp_path / "payload-v2.dict"
+    new_path.write_bytes(zstandard.train_dictionary(2048, _samples()[::-1]).as_bytes())
+    old_row = PayloadCodec("zstd", min_bytes=0, dict_path=dict_path).encode(PAYLOAD)
+
+    codec = PayloadCodec("zstd", min_bytes=0, dict_path=f"{new_path},{dict_path}")
+    assert codec.decode(old_row) == PAYLOAD
+    assert codec.decode(codec.encode(PAYLOAD)) == PAYLOAD
+
+
+def test_missing_dictionary_is_reported(dict_path):
+    row = PayloadCodec("zstd", min_bytes=0, dict_path=dict_path).encode(PAYLOAD)
+    with pytest.raises(ValueError, match="DB_COMPRESSION_DICT"):
+        PayloadCodec("zlib", dict_path="").decode(row)
@@ -0,0 +1,13 @@
+from models import Location
+from place_index import PlaceIndex
+
+
+def test_place_suggestion_keeps_kakao_id():
+    index = PlaceIndex()
+    index.add_places([Location(id="8214520", name="홍대 보드게임카페", category="가정,생활 > 보드카페",
+                               address="서울 마포구", x=126.92, y=37.55)])
+
+    suggestion = index.search("홍대 보")[0]
+    assert suggestion["id"] == "8214520"
+    # starting_point로 보내면 같은 장소 ID로 복원
+    assert Location(**{k: v for k, v in suggestion.items() if k != "kind"}).id == "8214520"
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine
+
+from database import Base
+from db_writer import get_db_writer
+from models import Location
+from place_store import PlaceStore, place_key, state_place_ids
+
+
+def _load(nodes, state, key, limit=None):
+    return asyncio.run(nodes.load_places(state, key, limit))
+
+
+def test_state_place_ids_skips_shown_place_names():
+    values = {
+        "activity_places": ["a1"],
+        "dining_places": ["d1", "d2"],
+        "cafe_places": [],
+        "drinking_places": None,
+        "candidate_pools": {"dining": ["d1", "d2", "d3"], "cafe": ["c1"]},
+        "shown_places": {"dining": ["한식 맛집0"], "cafe": ["카페 어니언"]},
+        "selected_places": {"activity": "a1", "drinking": None},
+    }
+    place_ids = state_place_ids(values)
+    assert set(place_ids) == {"a1", "d1", "d2", "d3", "c1"}
+    assert "한식 맛집0" not in place_ids
+
+
+def _places():
+    return [
+        Location(id="1001", name="한식 맛집", category="음식점 > 한식", address="서울 마포구", x=126.92, y=37.55,
+                 phone="02-000-0000", place_url="http://place.map.kakao.com/1001", distance=120),
+        # Kakao ID가 없는 장소는 이름/주소/좌표 해시를 ID로 사용
+        Location(name="동네 카페", category="음식점 > 카페", address="서울 마포구", x=126.921, y=37.551, distance=40),
+    ]
+
+
+def test_place_ids_round_trip_through_trip_state(trip_nodes, trip_state):
+    places = _places()
+    trip_nodes._set_places(trip_state, "dining_places", places)
+    # 같은 장소라도 단계마다 검색 기준점 거리가 다름
+    trip_nodes._set_places(trip_state, "cafe_places", [places[1].model_copy(update={"distance": 300})])
+
+    state = json.loads(json.dumps(trip_state))
+    assert state["dining_places"] == ["1001", place_key(places[1])]
+    assert state["cafe_places"] == [place_key(places[1])]
+
+    dining = _load(trip_nodes, state, "dining_places")
+    assert dining == [places[0], places[1].model_copy(update={"id": place_key(places[1])})]
+    assert [p.distance for p in _load(trip_nodes, state, "cafe_places")] == [300]
+
+
+def test_place_ids_resolve_on_another_worker(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'places.db'}")
+    Base.metadata.create_all(engine)
+    places = _places()
+    place_ids = PlaceStore(engine).add_many(places)
+    get_db_writer(engine).close()
+
+    other = PlaceStore(engine)
+    restored = other.materialize(place_ids, {"1001": 120})
+    assert [p.model_dump(exclude={"id", "distance"}) for p in restored] == \
+           [p.model_dump(exclude={"id", "distance"}) for p in places]
+    assert [p.id for p in restored] == place_ids
+    assert [p.distance for p in restored] == [120, None]
+    assert other.db_loads == 2
+
+
+def test_async_lookups_do_not_use_the_sync_session(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'places.db'}")
+    Base.metadata.create_all(engine)
+    place_ids = PlaceStore(engine).add_many(_places())
+    get_db_writer(engine).close()
+
+    other = PlaceStore(engine)
+    # 이벤트 루프에서는 동기 DB 조회(_load)를 하지 않음
+    monkeypatch.setattr(other, "_load", lambda place_ids: pytest.fail("sync load on the event loop"))
+    assert asyncio.run(other.aget("1001")).name == "한식 맛집"
+    restored = asyncio.run(other.amaterialize(place_ids + ["unknown"], {"1001": 120}))
+    assert [p.id for p in restored] == place_ids
+    assert (other.db_loads, other.missing) == (2, 1)
@@ -0,0 +1,36 @@
+from prompts import PROMPTS, INTENT_SYSTEM, KEYWORD_EXPANSION_USER, PromptTemplate, normalize_prompt
+
+
+def test_normalize_prompt_strips_indentation_and_blank_runs():
+    assert normalize_prompt("""
+        첫 줄   
+
+
+        둘째 줄
+    """) == "첫 줄\n\n둘째 줄"
+
+
+def test_render_without_fields_unescapes_braces():
+    template = PromptTemplate("t", '{{"a": {{"b": 1}}}}')
+    assert template.fields == []
+    assert template.render() == '{"a": {"b": 1}}'
+
+
+def test_render_with_fields_substitutes_and_unescapes():
+    template = PromptTemplate("t", '지역: {location}\n{{"x": 1}}')
+    assert template.render(location="홍대") == '지역: 홍대\n{"x": 1}'
+    assert template.static_prefix == "지역: "
+
+
+def test_intent_prompt_example_is_json_shaped():
+    rendered = INTENT_SYSTEM.render()
+    example = rendered[rendered.index('{"location"'):]
+    assert example.count("{") == example.count("}")
+    assert example.rstrip().endswith("]}\n}")
+
+
+def test_no_rendered_prompt_contains_escaped_braces():
+    prompts = list(PROMPTS._templates.values()) + [KEYWORD_EXPANSION_USER]
+    for prompt in prompts:
+        rendered = prompt.render(**{field: "값" for field in prompt.fields})
+        assert "{{" not in rendered and "}}" not in rendered, prompt.name
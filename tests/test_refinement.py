@@ -0,0 +1,91 @@
+import asyncio
+
+from ranking import anchor_distances
+
+
+def _load(nodes, state, key, limit=None):
+    return asyncio.run(nodes.load_places(state, key, limit))
+
+
+def _plan(nodes, state, stages=("activity", "dining", "cafe", "drinking")):
+    async def run(state):
+        for stage in stages:
+            state = await getattr(nodes, f"discover_{stage}_places")(state)
+        return state
+    return asyncio.run(run(state))
+
+
+def _show(nodes, state, **picks):
+    """일정에 보여준 것처럼 단계별 선택 장소 고정 (picks: 단계 -> 후보 목록 인덱스)"""
+    for stage, index in picks.items():
+        place = _load(nodes, state, f"{stage}_places")[index]
+        state["selected_places"] = {**state["selected_places"], stage: state[f"{stage}_places"][index]}
+        state["shown_places"] = {**state["shown_places"], stage: [place.name]}
+
+
+def test_refine_all_filters_activity_pool_by_search_radius(trip_nodes, trip_state):
+    state = _plan(trip_nodes, trip_state, ("activity",))
+    # 활동 후보 풀은 최대 반경(5km)으로 검색해 반경 밖 장소도 들고 있음
+    assert len(state["candidate_pools"]["activity"]) == 4
+    _show(trip_nodes, state, activity=0)
+    state.update({"refine_stage": "all", "next_action": "refine_region"})
+
+    state = _plan(trip_nodes, state, ("activity",))
+
+    activities = _load(trip_nodes, state, "activity_places")
+    assert [p.name for p in activities] == ["활동1"]
+    assert all(p.distance <= state["search_radius"] for p in activities)
+
+
+def test_refine_all_reanchors_downstream_stages(trip_nodes, trip_state):
+    state = _plan(trip_nodes, trip_state)
+    _show(trip_nodes, state, activity=0, dining=0, cafe=0, drinking=0)
+    shown = dict(state["shown_places"])
+    state.update({"refine_stage": "all", "next_action": "refine_region"})
+
+    state = _plan(trip_nodes, state)
+
+    activities = _load(trip_nodes, state, "activity_places", 3)
+    dining = _load(trip_nodes, state, "dining_places")
+    cafes = _load(trip_nodes, state, "cafe_places")
+    bars = _load(trip_nodes, state, "drinking_places")
+    assert [p.name for p in activities] == ["활동1"]
+    # 예전 활동 장소(활동0) 주변 후보가 아니라 새 기준 장소 주변 장소만 사용
+    assert dining and (anchor_distances(dining, activities) <= 500).all()
+    assert cafes and (anchor_distances(cafes, dining[:2]) <= 300).all()
+    assert bars and (anchor_distances(bars, cafes[:2]) <= 300).all()
+    for stage, places in (("dining", dining), ("cafe", cafes), ("drinking", bars)):
+        assert not {p.name for p in places} & set(shown[stage])
+
+
+def test_refine_dining_uses_pinned_activity(trip_nodes, trip_state):
+    state = _plan(trip_nodes, trip_state)
+    # 두 번째 활동 장소를 일정에 고정
+    _show(trip_nodes, state, activity=1, dining=0, cafe=0, drinking=0)
+    before = {key: list(state[key]) for key in ("activity_places", "cafe_places", "drinking_places")}
+    shown_dining = state["shown_places"]["dining"]
+    state.update({"refine_stage": "dining", "next_action": "refine_food"})
+
+    state = _plan(trip_nodes, state, ("dining",))
+
+    pinned = trip_nodes.place_store.materialize([state["selected_places"]["activity"]])
+    dining = _load(trip_nodes, state, "dining_places")
+    assert dining and (anchor_distances(dining, pinned) <= 500).all()
+    assert not {p.name for p in dining} & set(shown_dining)
+    assert {key: state[key] for key in before} == before
+
+
+def test_refine_cafe_uses_pinned_dining(trip_nodes, trip_state):
+    state = _plan(trip_nodes, trip_state)
+    _show(trip_nodes, state, activity=0, dining=3, cafe=0, drinking=0)
+    before = {key: list(state[key]) for key in ("activity_places", "dining_places", "drinking_places")}
+    shown_cafe = state["shown_places"]["cafe"]
+    state.update({"refine_stage": "cafe", "next_action": "refine_cafe"})
+
+    state = _plan(trip_nodes, state, ("cafe",))
+
+    pinned = trip_nodes.place_store.materialize([state["selected_places"]["dining"]])
+    cafes = _load(trip_nodes, state, "cafe_places")
+    assert cafes and (anchor_distances(cafes, pinned) <= 300).all()
+    assert not {p.name for p in cafes} & set(shown_cafe)
+    assert {key: state[key] for key in before} == before
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import create_engine
+
+from database import Base, Node
+from db_logger import DatabaseLogger
+from db_writer import DatabaseWriter
+from state_patch import apply_patch, make_patch
+
+
+@pytest.mark.parametrize("old, new", [
+    ({}, {"a": 1}),
+    ({"a": [1, 2], "n": None}, {"a": [1, 2, 3], "n": None}),
+    ({"a": [1, 2, 3]}, {"a": [3]}),
+    ({"b": {"c": 1, "d/e": 2, "f~g": 3}}, {"b": {"c": 2, "d/e": 2}}),
+    ({"x": 1, "y": {"z": [{"k": 1}]}}, {"y": {"z": [{"k": 2}]}, "w": "new"}),
+])
+def test_patch_round_trip(old, new):
+    ops = make_patch(old, new)
+    assert apply_patch(old, ops) == new
+
+
+def test_no_change_is_empty_patch():
+    assert make_patch({"a": [1], "b": {"c": None}}, {"a": [1], "b": {"c": None}}) == []
+
+
+def test_apply_patch_does_not_mutate_input():
+    old = {"a": [1, 2], "b": {"c": 1}}
+    apply_patch(old, make_patch(old, {"a": [1, 2, 3], "b": {"c": 2}}))
+    assert old == {"a": [1, 2], "b": {"c": 1}}
+
+
+class DroppingWriter(DatabaseWriter):
+    """큐가 가득 찬 것처럼 다음 노드 행 하나를 버리는 writer"""
+    drop_next_node = False
+
+    def insert(self, model, values, critical=False):
+        if self.drop_next_node and model is Node and not critical:
+            self.drop_next_node = False
+            self.dropped += 1
+            return False
+        return super().insert(model, values, critical)
+
+
+STATES = [
+    {"user_input": "성수 데이트", "step": "intent"},
+    {"user_input": "성수 데이트", "step": "activity", "places": {"activity": [{"name": "전시"}]}},
+    {"user_input": "성수 데이트", "step": "cafe", "places": {"activity": [{"name": "전시"}], "cafe": [{"name": "카페1"}]}},
+    {"user_input": "성수 데이트", "step": "cafe", "places": {"activity": [{"name": "전시"}], "cafe": [{"name": "카페1"}, {"name": "카페2"}]}},
+]
+
+
+@pytest.fixture
+def logger(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'replay.db'}")
+    Base.metadata.create_all(engine)
+    logger = DatabaseLogger(engine, writer=DroppingWriter(engine, background=False))
+    user = logger.get_or_create_user("tester")
+    logger.start_workflow(user.id, {"user_input": STATES[0]["user_input"]})
+    yield logger
+    logger.close()
+    engine.dispose()
+
+
+def _run_nodes(logger, drop_order=None):
+    node_ids = []
+    for order, state in enumerate(STATES, start=1):
+        logger.writer.drop_next_node = order == drop_order
+        node = logger.log_node_start(f"node_{order}", "test", input_data=state)
+        logger.log_node_complete(node.id, state)
+        node_ids.append(node.id)
+    return node_ids
+
+
+def test_query_replay_restores_each_node(logger):
+    node_ids = _run_nodes(logger)
+    for node_id, state in zip(node_ids, STATES):
+        assert logger.get_node_state(node_id) == state
+    assert logger._query_replay(logger.session, logger.current_workflow_id) == STATES[-1]
+    assert logger._query_replay(logger.session, logger.current_workflow_id, until_order=2) == STATES[1]
+
+
+def test_replay_after_dropped_node_row(logger):
+    node_ids = _run_nodes(logger, drop_order=2)
+    assert logger.writer.dropped == 1
+    assert logger.get_node_state(node_ids[1]) is None
+    # 버려진 행 다음 기록은 전체 스냅샷이므로 이후 노드는 그대로 복원됨
+    assert logger.get_node_state(node_ids[2]) == STATES[2]
+    assert logger.get_node_state(node_ids[3]) == STATES[3]
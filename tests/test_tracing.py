@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from tracing import TRACE_FULL, TRACE_NODES, TRACE_OFF, TRACE_WORKFLOW, TraceSampler, parse_trace_level
+
+
+@pytest.mark.parametrize("header", ["off", "0", "false", "workflow", None, "garbage"])
+def test_header_cannot_lower_sampled_level(header):
+    sampler = TraceSampler({TRACE_FULL: 1.0}, rng=random.Random(0))
+    assert sampler.choose(header) == TRACE_FULL
+    assert sampler.forced == 0
+
+
+@pytest.mark.parametrize("header, level", [("nodes", TRACE_NODES), ("1", TRACE_FULL), ("workflow", TRACE_WORKFLOW)])
+def test_header_raises_sampled_level(header, level):
+    sampler = TraceSampler({}, rng=random.Random(0))
+    assert sampler.choose(header) == level
+    assert sampler.forced == 1
+    assert sampler.counts[level] == 1
+
+
+def test_sampling_without_header():
+    sampler = TraceSampler({TRACE_NODES: 0.5}, rng=random.Random(1))
+    levels = [sampler.choose() for _ in range(200)]
+    assert set(levels) == {TRACE_NODES, TRACE_OFF}
+    assert 60 < levels.count(TRACE_NODES) < 140
+
+
+def test_parse_trace_level():
+    assert parse_trace_level(" FULL ") == TRACE_FULL
+    assert parse_trace_level("0") == TRACE_OFF
+    assert parse_trace_level("verbose") is None